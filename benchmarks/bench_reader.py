@@ -0,0 +1,236 @@
+"""
+Benchmark GetDPReader on synthetic meshes and solutions.
+
+Each case (size, dimension, number of solution blocks) is generated once
+into --data-dir. Then read_msh_file, read_pre_file, read_res_file,
+create_pyvista_mesh and export_to_vtk are each timed (best of --repeat
+runs) and run once more under tracemalloc for their peak memory.
+
+Usage:
+    python -m benchmarks.bench_reader --sizes 10k 100k 1M --dims 2 3
+    python -m benchmarks.bench_reader --save-baseline benchmarks/baseline.json
+    python -m benchmarks.bench_reader --baseline benchmarks/baseline.json
+
+With --baseline, the results are compared with a stored run and the
+script exits with status 1 if an operation got slower or used more memory
+than the tolerances allow.
+"""
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from benchmarks.synthetic import SyntheticCase, generate_case
+from src.getdp.getdp import GetDPReader
+
+OPERATIONS = (
+    "read_msh_file",
+    "read_pre_file",
+    "read_res_file",
+    "create_pyvista_mesh",
+    "export_to_vtk",
+)
+
+DEFAULT_SIZES = ("10k", "100k", "1M", "10M")
+
+
+def parse_size(text: str) -> int:
+    """Parse a node count such as "10k" or "1M"."""
+    factors = {"k": 10**3, "m": 10**6}
+    text = text.strip().lower()
+    if text and text[-1] in factors:
+        return int(float(text[:-1]) * factors[text[-1]])
+    return int(text)
+
+
+def _prepare(
+    reader: GetDPReader, operation: str, msh: Path, pre: Path, res: Path
+) -> Callable[[], Any]:
+    """Bring reader to the state before operation and return the operation."""
+    steps = {
+        "read_msh_file": lambda: reader.read_msh_file(msh),
+        "read_pre_file": lambda: reader.read_pre_file(pre),
+        "read_res_file": lambda: reader.read_res_file(res),
+        "create_pyvista_mesh": lambda: reader.create_pyvista_mesh(),
+        "export_to_vtk": lambda: reader.export_to_vtk(res.with_suffix(".vtk")),
+    }
+    for previous in OPERATIONS[: OPERATIONS.index(operation)]:
+        steps[previous]()
+    return steps[operation]
+
+
+def measure(
+    operation: str, msh: Path, pre: Path, res: Path, repeat: int
+) -> Dict[str, float]:
+    """
+    Time one reader operation and measure its peak memory.
+
+    Every run starts from a fresh GetDPReader on which the preceding
+    operations have been done, so only the operation itself is measured.
+
+    Returns:
+        dict: seconds (best of repeat runs) and peak_bytes (tracemalloc)
+    """
+    times = []
+    for _ in range(repeat):
+        run = _prepare(GetDPReader(), operation, msh, pre, res)
+        gc.collect()
+        started = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - started)
+        del run
+
+    run = _prepare(GetDPReader(), operation, msh, pre, res)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": min(times), "peak_bytes": peak}
+
+
+def run_benchmarks(
+    cases: List[SyntheticCase], data_dir: Path, repeat: int
+) -> Dict[str, Any]:
+    """Run all operations on all cases."""
+    results: Dict[str, Any] = {
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cases": {},
+    }
+    for case in cases:
+        print(f"{case.name}:", flush=True)
+        msh, pre, res = generate_case(data_dir, case)
+        sizes = {p.suffix[1:] + "_bytes": p.stat().st_size for p in (msh, pre, res)}
+        entry = {"n_nodes": case.n_nodes, **sizes, "operations": {}}
+        for operation in OPERATIONS:
+            entry["operations"][operation] = measure(operation, msh, pre, res, repeat)
+            stats = entry["operations"][operation]
+            throughput = (
+                f", {sizes[operation[5:8] + '_bytes'] / stats['seconds'] / 1e6:.1f} MB/s"
+                if operation.startswith("read_")
+                else ""
+            )
+            print(
+                f"  {operation:<20} {stats['seconds']:>9.3f} s "
+                f"{stats['peak_bytes'] / 2**20:>10.1f} MiB peak{throughput}",
+                flush=True,
+            )
+        res.with_suffix(".vtk").unlink(missing_ok=True)
+        results["cases"][case.name] = entry
+    return results
+
+
+def compare(
+    results: Dict[str, Any],
+    baseline: Dict[str, Any],
+    time_tolerance: float,
+    memory_tolerance: float,
+    min_seconds: float = 0.05,
+) -> List[str]:
+    """
+    Compare results with a baseline run.
+
+    Args:
+        results: Output of run_benchmarks
+        baseline: Output of an earlier run_benchmarks
+        time_tolerance: Allowed relative slowdown, e.g. 0.2 for 20 %
+        memory_tolerance: Allowed relative growth of peak memory
+        min_seconds: Operations faster than this are too noisy to flag as slower
+
+    Returns:
+        list: One message per regression
+    """
+    regressions = []
+    print(f"\n{'case':<32}{'operation':<22}{'time':>10}{'memory':>10}")
+    for name, entry in results["cases"].items():
+        reference = baseline.get("cases", {}).get(name)
+        if reference is None:
+            continue
+        for operation, stats in entry["operations"].items():
+            before = reference["operations"].get(operation)
+            if before is None:
+                continue
+            time_ratio = stats["seconds"] / max(before["seconds"], 1e-9)
+            memory_ratio = stats["peak_bytes"] / max(before["peak_bytes"], 1)
+            flags = ""
+            if time_ratio > 1 + time_tolerance and stats["seconds"] >= min_seconds:
+                flags += " SLOWER"
+                regressions.append(f"{name} {operation}: {time_ratio:.2f}x time")
+            if memory_ratio > 1 + memory_tolerance:
+                flags += " MORE MEMORY"
+                regressions.append(f"{name} {operation}: {memory_ratio:.2f}x memory")
+            print(
+                f"{name:<32}{operation:<22}{time_ratio:>9.2f}x{memory_ratio:>9.2f}x{flags}"
+            )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--dims", nargs="+", type=int, default=[2, 3])
+    parser.add_argument("--blocks", type=int, default=2)
+    parser.add_argument("--binary", action="store_true", help="Binary .msh files")
+    parser.add_argument("--complex", action="store_true", help="Complex solutions")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--data-dir",
+        type=Path,
+        default=Path(tempfile.gettempdir()) / "getdp_reader_bench",
+        help="Where the synthetic files are generated (and reused)",
+    )
+    parser.add_argument("--output", type=Path, help="Write the results as JSON")
+    parser.add_argument("--save-baseline", type=Path)
+    parser.add_argument("--baseline", type=Path, help="Compare with a stored run")
+    parser.add_argument("--time-tolerance", type=float, default=0.2)
+    parser.add_argument("--memory-tolerance", type=float, default=0.1)
+    parser.add_argument("--min-seconds", type=float, default=0.05)
+    args = parser.parse_args(argv)
+
+    cases = [
+        SyntheticCase(parse_size(size), dim, args.blocks, args.binary, args.complex)
+        for dim in args.dims
+        for size in args.sizes
+    ]
+    results = run_benchmarks(cases, args.data_dir, args.repeat)
+
+    for path in (args.output, args.save_baseline):
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "w") as f:
+                json.dump(results, f, indent=2)
+
+    if args.baseline is not None:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        regressions = compare(
+            results,
+            baseline,
+            args.time_tolerance,
+            args.memory_tolerance,
+            args.min_seconds,
+        )
+        if regressions:
+            print("\nRegressions:")
+            for message in regressions:
+                print(f"  {message}")
+            return 1
+        print("\nNo regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""
+Synthetic GetDP files of controlled size for benchmarking GetDPReader.
+
+The mesh is a structured grid on the unit square (2D, triangles) or unit
+cube (3D, hexahedra) with about n_nodes nodes. The .pre file holds one DOF
+per node and DofData block, with the boundary nodes fixed and the others
+unknown; the .res file holds one solution block per DofData block.
+"""
+
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Tuple
+
+import numpy as np
+
+# Rows formatted per np.savetxt call
+WRITE_CHUNK = 1 << 18
+
+
+@dataclass
+class SyntheticCase:
+    n_nodes: int
+    dim: int = 2
+    n_blocks: int = 1
+    binary: bool = False
+    complex_values: bool = False
+
+    @property
+    def name(self) -> str:
+        kind = "bin" if self.binary else "ascii"
+        values = "complex" if self.complex_values else "real"
+        return f"{self.dim}d_{self.n_nodes}_{self.n_blocks}blk_{kind}_{values}"
+
+
+def grid_shape(n_nodes: int, dim: int) -> Tuple[int, ...]:
+    """Nodes per axis of a grid with about n_nodes nodes."""
+    per_axis = max(2, int(round(n_nodes ** (1.0 / dim))))
+    return (per_axis,) * dim
+
+
+def grid_nodes(shape: Tuple[int, ...]) -> np.ndarray:
+    """(N, 3) coordinates of a grid on the unit square/cube, x varying fastest."""
+    axes = [np.linspace(0.0, 1.0, n) for n in shape]
+    mesh = np.meshgrid(*axes, indexing="ij")
+    coords = np.zeros((mesh[0].size, 3))
+    for axis, values in enumerate(mesh):
+        # Fortran order puts the first axis fastest
+        coords[:, axis] = values.ravel(order="F")
+    return coords
+
+
+def grid_cells(shape: Tuple[int, ...]) -> Tuple[int, np.ndarray]:
+    """
+    Cells of the grid as (gmsh element type, (M, nodes per cell) node tags).
+
+    2D grids are split into two triangles per square, 3D grids use one
+    hexahedron per cube. Node tags are 1-based.
+    """
+    index = np.arange(int(np.prod(shape))).reshape(shape[::-1])
+    if len(shape) == 2:
+        a = index[:-1, :-1].ravel()
+        b = index[:-1, 1:].ravel()
+        c = index[1:, 1:].ravel()
+        d = index[1:, :-1].ravel()
+        cells = np.concatenate(
+            [np.stack([a, b, c], axis=1), np.stack([a, c, d], axis=1)]
+        )
+        return 2, cells + 1
+
+    corners = [
+        index[:-1, :-1, :-1],
+        index[:-1, :-1, 1:],
+        index[:-1, 1:, 1:],
+        index[:-1, 1:, :-1],
+        index[1:, :-1, :-1],
+        index[1:, :-1, 1:],
+        index[1:, 1:, 1:],
+        index[1:, 1:, :-1],
+    ]
+    return 5, np.stack([c.ravel() for c in corners], axis=1) + 1
+
+
+def boundary_mask(shape: Tuple[int, ...]) -> np.ndarray:
+    """(N,) True for nodes on the boundary of the grid, in node order."""
+    mask = np.zeros(shape[::-1], dtype=bool)
+    for axis in range(len(shape)):
+        index = [slice(None)] * len(shape)
+        index[axis] = 0
+        mask[tuple(index)] = True
+        index[axis] = -1
+        mask[tuple(index)] = True
+    return mask.ravel()
+
+
+def _write_rows(f: IO[str], rows: np.ndarray, fmt: str):
+    for start in range(0, len(rows), WRITE_CHUNK):
+        np.savetxt(f, rows[start : start + WRITE_CHUNK], fmt=fmt)
+
+
+def write_msh(path: Path, case: SyntheticCase) -> Path:
+    """Write the grid as an MSH 4.1 file (ASCII, or binary if case.binary)."""
+    shape = grid_shape(case.n_nodes, case.dim)
+    coords = grid_nodes(shape)
+    element_type, cells = grid_cells(shape)
+    n, m = len(coords), len(cells)
+    tags = np.arange(1, n + 1, dtype=np.int64)
+    element_tags = np.arange(1, m + 1, dtype=np.int64)
+    bbox = (0.0, 0.0, 0.0, 1.0, 1.0, 1.0 if case.dim == 3 else 0.0)
+    counts = (0, 0, 1, 0) if case.dim == 2 else (0, 0, 0, 1)
+
+    if case.binary:
+        with open(path, "wb") as f:
+            f.write(b"$MeshFormat\n4.1 1 8\n")
+            f.write(struct.pack("<i", 1))
+            f.write(b"\n$EndMeshFormat\n$PhysicalNames\n1\n")
+            f.write(f'{case.dim} 1 "Domain"\n'.encode())
+            f.write(b"$EndPhysicalNames\n$Entities\n")
+            f.write(struct.pack("<4Q", *counts))
+            f.write(struct.pack("<i6dQiQ", 1, *bbox, 1, 1, 0))
+            f.write(b"\n$EndEntities\n$Nodes\n")
+            f.write(struct.pack("<4Q", 1, n, 1, n))
+            f.write(struct.pack("<3iQ", case.dim, 1, 0, n))
+            f.write(tags.astype("<u8").tobytes())
+            f.write(coords.astype("<f8").tobytes())
+            f.write(b"\n$EndNodes\n$Elements\n")
+            f.write(struct.pack("<4Q", 1, m, 1, m))
+            f.write(struct.pack("<3iQ", case.dim, 1, element_type, m))
+            table = np.hstack([element_tags[:, None], cells]).astype("<u8")
+            f.write(table.tobytes())
+            f.write(b"\n$EndElements\n")
+        return path
+
+    with open(path, "w") as f:
+        f.write("$MeshFormat\n4.1 0 8\n$EndMeshFormat\n")
+        f.write(f'$PhysicalNames\n1\n{case.dim} 1 "Domain"\n$EndPhysicalNames\n')
+        f.write("$Entities\n" + " ".join(map(str, counts)) + "\n")
+        f.write("1 " + " ".join(map(str, bbox)) + " 1 1 0\n$EndEntities\n")
+        f.write(f"$Nodes\n1 {n} 1 {n}\n{case.dim} 1 0 {n}\n")
+        _write_rows(f, tags[:, None], "%d")
+        _write_rows(f, coords, "%.17g")
+        f.write("$EndNodes\n")
+        f.write(f"$Elements\n1 {m} 1 {m}\n{case.dim} 1 {element_type} {m}\n")
+        _write_rows(f, np.hstack([element_tags[:, None], cells]), "%d")
+        f.write("$EndElements\n")
+    return path
+
+
+def write_pre(path: Path, case: SyntheticCase) -> Path:
+    """
+    Write a .pre file with case.n_blocks DofData blocks of one DOF per node.
+
+    Boundary nodes are FIXED_VALUE DOFs (value = x coordinate), the others
+    UNKNOWN with consecutive equation numbers.
+    """
+    shape = grid_shape(case.n_nodes, case.dim)
+    n = int(np.prod(shape))
+    fixed = boundary_mask(shape)
+    n_unknown = int((~fixed).sum())
+
+    columns = np.zeros((n, 6))
+    columns[:, 0] = 1  # basis function
+    columns[:, 1] = np.arange(1, n + 1)  # entity (node tag)
+    columns[:, 3] = np.where(fixed, 2, 1)  # type
+    columns[~fixed, 4] = np.arange(1, n_unknown + 1)  # equation number
+    columns[~fixed, 5] = 9  # nnz
+    columns[fixed, 4] = grid_nodes(shape)[fixed, 0]  # value
+    columns[fixed, 5] = 0  # time function
+
+    with open(path, "w") as f:
+        f.write(f"$Resolution /* 'Synthetic' */\n0 {case.n_blocks}\n$EndResolution\n")
+        for block in range(case.n_blocks):
+            f.write(f"$DofData /* #{block} */\n0 {block}\n1 1\n1 0\n1 0\n")
+            f.write(f"{n} {n_unknown}\n")
+            _write_rows(f, columns, "%d %d %d %d %.17g %d")
+            f.write("$EndDofData\n")
+    return path
+
+
+def write_res(path: Path, case: SyntheticCase, seed: int = 0) -> Path:
+    """Write a .res file with one solution per DofData block of write_pre."""
+    shape = grid_shape(case.n_nodes, case.dim)
+    n_unknown = int((~boundary_mask(shape)).sum())
+    rng = np.random.default_rng(seed)
+
+    with open(path, "w") as f:
+        f.write("$ResFormat /* GetDP synthetic, ascii */\n1.1 0\n$EndResFormat\n")
+        for block in range(case.n_blocks):
+            values = rng.standard_normal((n_unknown, 2 if case.complex_values else 1))
+            f.write(f"$Solution  /* DofData #{block} */\n{block} 0 0 0\n")
+            _write_rows(f, values, "%.17g")
+            f.write("$EndSolution\n")
+    return path
+
+
+def generate_case(data_dir: Path, case: SyntheticCase) -> Tuple[Path, Path, Path]:
+    """
+    Write the .msh, .pre and .res files of case to data_dir/case.name,
+    unless they were generated before.
+
+    Returns:
+        (msh, pre, res) paths
+    """
+    case_dir = Path(data_dir) / case.name
+    case_dir.mkdir(parents=True, exist_ok=True)
+    paths = tuple(case_dir / f"synthetic.{ext}" for ext in ("msh", "pre", "res"))
+    done = case_dir / ".complete"
+    if not done.exists():
+        write_msh(paths[0], case)
+        write_pre(paths[1], case)
+        write_res(paths[2], case)
+        done.touch()
+    return paths
@@ -0,0 +1,254 @@
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from ..config.experiment_config import AdaptiveConfig, ExperimentConfig
+from ..experiments import experiment_registry
+from ..experiments.results import sample_meshes
+from ..run_experiments import iter_sample_jobs, run_pipeline
+from ..samplers import DesignSampler, Sobol, unit_to_params
+
+# Candidate points scored per proposed sample
+CANDIDATES_PER_SAMPLE = 64
+
+
+def scalar_outputs(exp_dir: Path) -> Dict[str, float]:
+    """
+    Default scalar outputs of a sample: the mean and maximum magnitude of
+    every field of its result meshes (see sample_meshes), i.e. of the
+    solution read from its .msh/.pre/.res files, or of the point data of its
+    VTK files if it has no solution.
+    """
+    outputs = {}
+    for stem, mesh, names in sample_meshes(exp_dir):
+        for name in names:
+            values = np.asarray(mesh.point_data[name], dtype=np.float64)
+            magnitude = (
+                np.abs(values) if values.ndim == 1 else np.linalg.norm(values, axis=1)
+            )
+            if len(magnitude):
+                outputs[f"{stem}/{name}/mean"] = float(magnitude.mean())
+                outputs[f"{stem}/{name}/max"] = float(magnitude.max())
+    return outputs
+
+
+class KNNCommittee:
+    """
+    Committee of k-nearest-neighbour regressors fitted on bootstrap resamples.
+
+    The spread of the members' predictions at a point is a cheap estimate of
+    how uncertain the outputs are there: it is large where neighbouring
+    samples disagree and where samples are sparse.
+    """
+
+    def __init__(self, n_neighbors: int = 3, n_committee: int = 8, seed: int = 0):
+        self.n_neighbors = n_neighbors
+        self.n_committee = n_committee
+        self.rng = np.random.default_rng(seed)
+
+    def fit(self, x: np.ndarray, y: np.ndarray) -> "KNNCommittee":
+        """
+        Args:
+            x: (n, dim) sample locations in the unit hypercube
+            y: (n, n_outputs) outputs
+        """
+        self.x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        # Standardize so that every output contributes equally
+        scale = y.std(axis=0)
+        self.y = (y - y.mean(axis=0)) / np.where(scale > 0, scale, 1.0)
+        self.members = [
+            self.rng.integers(0, len(self.x), len(self.x))
+            for _ in range(self.n_committee)
+        ]
+        return self
+
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        """Predictions of all members, (n_committee, m, n_outputs)."""
+        x = np.asarray(x, dtype=np.float64)
+        distances = np.linalg.norm(x[:, None, :] - self.x[None, :, :], axis=2)
+        predictions = []
+        for member in self.members:
+            k = min(self.n_neighbors, len(member))
+            nearest = np.argpartition(distances[:, member], k - 1, axis=1)[:, :k]
+            predictions.append(self.y[member[nearest]].mean(axis=1))
+        return np.stack(predictions)
+
+    def uncertainty(self, x: np.ndarray) -> np.ndarray:
+        """Committee disagreement at each point, averaged over outputs, (m,)."""
+        return self.predict(x).std(axis=0).mean(axis=1)
+
+
+def propose_batch(
+    committee: KNNCommittee,
+    candidates: np.ndarray,
+    batch_size: int,
+    exclusion_radius: float,
+) -> np.ndarray:
+    """
+    Pick the batch_size candidates with the highest uncertainty, greedily,
+    skipping candidates within exclusion_radius of an already picked one so
+    that a batch does not collapse onto one region.
+
+    Returns:
+        Indices into candidates
+    """
+    return pick_spread(
+        committee.uncertainty(candidates), candidates, batch_size, exclusion_radius
+    )
+
+
+def pick_spread(
+    score: np.ndarray,
+    candidates: np.ndarray,
+    batch_size: int,
+    exclusion_radius: float,
+) -> np.ndarray:
+    """
+    Pick the batch_size candidates with the highest score, greedily,
+    skipping candidates within exclusion_radius of an already picked one.
+
+    Returns:
+        Indices into candidates
+    """
+    chosen: List[int] = []
+    for index in np.argsort(-score, kind="stable"):
+        if len(chosen) == batch_size:
+            break
+        if chosen:
+            nearest = np.linalg.norm(candidates[chosen] - candidates[index], axis=1)
+            if nearest.min() < exclusion_radius:
+                continue
+        chosen.append(int(index))
+    return np.array(chosen, dtype=np.int64)
+
+
+def _load_state(state_file: Path) -> Dict[str, Any]:
+    try:
+        with open(state_file, "r") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {"samples": [], "design_offset": 0}
+
+
+def _save_state(state_file: Path, state: Dict[str, Any]):
+    fd, tmp_name = tempfile.mkstemp(dir=state_file.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_name, state_file)
+    finally:
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+
+
+def run_adaptive_campaign(
+    exp_cfg: ExperimentConfig,
+    adaptive: AdaptiveConfig,
+    output_dir: Path,
+    template_dir: Path,
+    outputs_fn: Callable[[Path], Dict[str, float]] = scalar_outputs,
+    **run_kwargs,
+) -> List[Dict[str, Any]]:
+    """
+    Sample, solve and resample where the outputs are most uncertain.
+
+    An initial batch is taken from the experiment's design (Sobol if none is
+    configured). After each solved batch a KNNCommittee is fitted on the
+    scalar outputs, and the next batch is proposed among fresh design points
+    where the committee disagrees most. This repeats until budget samples
+    have been run. Progress is kept in adaptive_state_<type>.json in
+    output_dir, so an interrupted campaign continues where it stopped.
+
+    Args:
+        exp_cfg: Experiment config; its parameter samplers define the marginals
+        adaptive: Campaign settings
+        output_dir: Output directory of the experiment directories
+        template_dir: Template root directory
+        outputs_fn: Scalar outputs of a solved experiment directory
+        **run_kwargs: Passed on to run_pipeline
+
+    Returns:
+        list: State records {"sample", "unit", "outputs"} of all samples
+
+    Raises:
+        RuntimeError: If samples solve but none of them gives any outputs
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    state_file = output_dir / f"adaptive_state_{exp_cfg.type}.json"
+    state = _load_state(state_file)
+    design: DesignSampler = exp_cfg.design or Sobol("sobol", seed=adaptive.seed)
+    params = exp_cfg.parameters
+    dim = len(params)
+    committee = KNNCommittee(
+        adaptive.n_neighbors, adaptive.n_committee, seed=adaptive.seed
+    )
+
+    while len(state["samples"]) < adaptive.budget:
+        remaining = adaptive.budget - len(state["samples"])
+        known = [s for s in state["samples"] if s["outputs"]]
+
+        if len(known) < max(adaptive.n_neighbors, 2):
+            # Initial (or refill) batch straight from the design
+            n_new = min(remaining, max(adaptive.initial_samples, adaptive.batch_size))
+            unit = design.sample_unit(n_new, dim, state["design_offset"])
+            state["design_offset"] += n_new
+        else:
+            n_new = min(remaining, adaptive.batch_size)
+            n_candidates = CANDIDATES_PER_SAMPLE * n_new
+            candidates = design.sample_unit(n_candidates, dim, state["design_offset"])
+            state["design_offset"] += n_candidates
+
+            names = sorted(known[0]["outputs"])
+            x = np.array([s["unit"] for s in known])
+            y = np.array([[s["outputs"].get(n, np.nan) for n in names] for s in known])
+            y = y[:, ~np.isnan(y).any(axis=0)]
+            committee.fit(x, y)
+            radius = 0.5 * (len(state["samples"]) + n_new) ** (-1.0 / dim)
+            unit = candidates[propose_batch(committee, candidates, n_new, radius)]
+
+        print(
+            f"Adaptive campaign: running {len(unit)} samples "
+            f"({len(state['samples'])}/{adaptive.budget} done)"
+        )
+        values = unit_to_params(unit, params)
+        exp_dirs = experiment_registry.run_experiment(
+            exp_cfg=exp_cfg,
+            sampled_params=values,
+            output_dir=str(output_dir),
+            template_dir=template_dir,
+        )
+        # Only the new samples are processed, without rescanning output_dir
+        jobs = iter_sample_jobs(exp_cfg.type, [exp_dirs], values)
+        results = run_pipeline(jobs, **run_kwargs)
+        status = {r["sample"]: r["status"] for r in results}
+        no_outputs = []
+        for exp_dir, point in zip(exp_dirs, unit):
+            exp_dir = Path(exp_dir)
+            outputs = outputs_fn(exp_dir) if status.get(exp_dir.name) == "ok" else None
+            if outputs == {}:
+                no_outputs.append(exp_dir.name)
+            state["samples"].append(
+                {"sample": exp_dir.name, "unit": point.tolist(), "outputs": outputs}
+            )
+        _save_state(state_file, state)
+
+        if no_outputs:
+            print(
+                f"Warning: {len(no_outputs)} solved samples gave no outputs "
+                f"({', '.join(no_outputs[:5])})"
+            )
+            if not any(s["outputs"] for s in state["samples"]):
+                # Without outputs the committee is never fitted and the
+                # campaign would only ever take design batches
+                raise RuntimeError(
+                    f"No solved {exp_cfg.type} sample gave any outputs, so the "
+                    "adaptive campaign cannot propose samples; check outputs_fn"
+                )
+
+    return state["samples"]
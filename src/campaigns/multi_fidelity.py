@@ -0,0 +1,286 @@
+import math
+import shutil
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ..config.experiment_config import ExperimentConfig, MultiFidelityConfig
+from ..experiments import experiment_registry
+from ..experiments.fidelity import FINE_SUFFIX, write_fidelity
+from ..experiments.manifest import rendered_inputs
+from ..run_experiments import (
+    EXPERIMENT_FILES,
+    SampleJob,
+    iter_sample_jobs,
+    run_pipeline,
+)
+from .adaptive import KNNCommittee, pick_spread, scalar_outputs
+
+SELECTIONS = ("uncertainty", "novelty", "fraction")
+
+# Points scored per step by select_uncertainty, which bounds the size of the
+# distance matrices
+SCORE_BLOCK = 256
+
+
+def parameter_matrix(params: Sequence[Dict[str, Any]]) -> np.ndarray:
+    """
+    Numeric parameters of samples scaled to [0, 1] per parameter, (n, dim).
+
+    Only parameters that are numeric in every sample are used; constant ones
+    map to 0.
+    """
+    names = sorted(
+        set.intersection(
+            *(
+                {k for k, v in p.items() if isinstance(v, (bool, int, float))}
+                for p in params
+            )
+        )
+    )
+    x = np.array([[float(p[name]) for name in names] for p in params])
+    x = x.reshape(len(params), len(names))
+    low, high = x.min(axis=0), x.max(axis=0)
+    span = np.where(high > low, high - low, 1.0)
+    return (x - low) / span
+
+
+def select_novelty(x: np.ndarray, n_select: int) -> np.ndarray:
+    """
+    Pick points spread out over the parameter space: starting from the point
+    farthest from the centroid, repeatedly take the point farthest from all
+    points picked so far.
+
+    Returns:
+        Indices into x
+    """
+    if n_select <= 0 or len(x) == 0:
+        return np.zeros(0, dtype=np.int64)
+    chosen = [int(np.argmax(np.linalg.norm(x - x.mean(axis=0), axis=1)))]
+    nearest = np.linalg.norm(x - x[chosen[0]], axis=1)
+    while len(chosen) < min(n_select, len(x)):
+        index = int(np.argmax(nearest))
+        chosen.append(index)
+        nearest = np.minimum(nearest, np.linalg.norm(x - x[index], axis=1))
+    return np.array(chosen, dtype=np.int64)
+
+
+def select_uncertainty(
+    x: np.ndarray,
+    y: np.ndarray,
+    n_select: int,
+    mf: MultiFidelityConfig,
+) -> np.ndarray:
+    """
+    Pick the points where a KNNCommittee fitted on the coarse outputs
+    disagrees most, keeping the picks apart (see pick_spread).
+
+    Args:
+        x: (n, dim) scaled parameters of the coarse samples
+        y: (n, n_outputs) coarse outputs
+        n_select: Number of points to pick
+        mf: Campaign settings
+
+    Returns:
+        Indices into x
+    """
+    committee = KNNCommittee(mf.n_neighbors, mf.n_committee, seed=mf.seed).fit(x, y)
+    score = np.concatenate(
+        [
+            committee.uncertainty(x[start : start + SCORE_BLOCK])
+            for start in range(0, len(x), SCORE_BLOCK)
+        ]
+    )
+    radius = 0.5 * max(n_select, 1) ** (-1.0 / max(x.shape[1], 1))
+    chosen = pick_spread(score, x, n_select, radius)
+    if len(chosen) < n_select:
+        # The exclusion radius left too few points; fill up by score
+        taken = set(chosen.tolist())
+        rest = [i for i in np.argsort(-score, kind="stable") if i not in taken]
+        chosen = np.concatenate([chosen, rest[: n_select - len(chosen)]])
+    return chosen.astype(np.int64)
+
+
+def select_fine(
+    jobs: List[SampleJob],
+    n_select: int,
+    mf: MultiFidelityConfig,
+    outputs_fn: Callable[[Path], Dict[str, float]] = scalar_outputs,
+) -> np.ndarray:
+    """
+    Pick the coarse samples to rerun at full fidelity.
+
+    Args:
+        jobs: Successfully solved coarse samples
+        n_select: Number of samples to pick
+        mf: Campaign settings; mf.selection is the criterion
+        outputs_fn: Scalar outputs of a solved experiment directory, used by
+            the "uncertainty" criterion (by default those of its GetDP
+            solution, see scalar_outputs)
+
+    Returns:
+        Indices into jobs
+    """
+    if mf.selection not in SELECTIONS:
+        raise ValueError(
+            f"Unknown selection '{mf.selection}', expected one of {SELECTIONS}"
+        )
+    n_select = min(n_select, len(jobs))
+    if n_select <= 0:
+        return np.zeros(0, dtype=np.int64)
+
+    if mf.selection == "fraction":
+        rng = np.random.default_rng(mf.seed)
+        return np.sort(rng.choice(len(jobs), n_select, replace=False))
+
+    x = parameter_matrix([job.params for job in jobs])
+    if mf.selection == "uncertainty":
+        outputs = [outputs_fn(Path(job.exp_dir)) for job in jobs]
+        names = sorted(set.intersection(*(set(o) for o in outputs)))
+        if names:
+            y = np.array([[o[name] for name in names] for o in outputs])
+            y = y[:, np.isfinite(y).all(axis=0)]
+            if y.shape[1]:
+                return select_uncertainty(x, y, n_select, mf)
+        print(
+            "Warning: the coarse samples have no common outputs, so the fine "
+            "samples are selected by novelty instead of uncertainty"
+        )
+    return select_novelty(x, n_select)
+
+
+def _mesh_nodes(result: Dict[str, Any]) -> Optional[int]:
+    return result.get("metrics", {}).get("meshed", {}).get("nodes")
+
+
+def check_coarser(
+    coarse_results: List[Dict[str, Any]], fine_results: List[Dict[str, Any]]
+) -> List[str]:
+    """
+    Compare the mesh sizes of linked coarse and fine samples.
+
+    Pairs whose meshes were not generated in this run (e.g. resumed) are
+    not compared.
+
+    Returns:
+        list: Names of the coarse samples whose mesh has at least as many
+            nodes as the mesh of their fine sample
+    """
+    coarse_nodes = {r["sample"]: _mesh_nodes(r) for r in coarse_results}
+    not_coarser = []
+    for result in fine_results:
+        sample = result["sample"][: -len(FINE_SUFFIX)]
+        coarse, fine = coarse_nodes.get(sample), _mesh_nodes(result)
+        if coarse is not None and fine is not None and coarse >= fine:
+            not_coarser.append(sample)
+    return not_coarser
+
+
+def make_fine_copy(job: SampleJob) -> Path:
+    """
+    Copy the rendered inputs of a sample into its full-fidelity directory,
+    <sample>-fine next to it.
+    """
+    exp_dir = Path(job.exp_dir)
+    file_config = EXPERIMENT_FILES[job.experiment_type]
+    fine_dir = exp_dir.with_name(exp_dir.name + FINE_SUFFIX)
+    for path in rendered_inputs(exp_dir, file_config["geo"], file_config["pro"]):
+        target = fine_dir / path.relative_to(exp_dir)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(path, target)
+    return fine_dir
+
+
+def run_multi_fidelity_campaign(
+    exp_cfg: ExperimentConfig,
+    mf: MultiFidelityConfig,
+    sampled_params: Dict[str, Any],
+    output_dir: Path,
+    template_dir: Path,
+    outputs_fn: Callable[[Path], Dict[str, float]] = scalar_outputs,
+    **run_kwargs,
+) -> List[Dict[str, Any]]:
+    """
+    Solve all samples on a coarse mesh and a selected subset at full fidelity.
+
+    Every sample is rendered and solved with the gmsh parser numbers
+    mf.coarse_mesh (e.g. a larger mesh size factor s). Of the samples that
+    solved, a share of mf.fine_fraction is then picked by mf.selection and
+    rerun unchanged in a <sample>-fine directory. Both directories get a
+    fidelity.json linking them; run_all_experiments_and_save_results meshes
+    each at its recorded fidelity.
+
+    Args:
+        exp_cfg: Experiment config
+        mf: Campaign settings
+        sampled_params: Parameter name -> sampled values
+        output_dir: Output directory of the experiment directories
+        template_dir: Template root directory
+        outputs_fn: Scalar outputs of a solved experiment directory, used by
+            the "uncertainty" selection
+        **run_kwargs: Passed on to run_pipeline
+
+    Returns:
+        list: Result records of the coarse and then the fine samples (see
+            process_sample)
+    """
+    coarse_mesh = {name: float(value) for name, value in mf.coarse_mesh.items()}
+    chunks = experiment_registry.iter_experiment(
+        exp_cfg=exp_cfg,
+        sampled_params=sampled_params,
+        output_dir=str(output_dir),
+        template_dir=template_dir,
+    )
+    jobs: List[SampleJob] = []
+
+    def coarse_jobs():
+        for job in iter_sample_jobs(exp_cfg.type, chunks, sampled_params):
+            job.mesh_parameters = dict(coarse_mesh)
+            write_fidelity(
+                job.exp_dir,
+                {"fidelity": "coarse", "mesh_parameters": coarse_mesh, "fine": None},
+            )
+            jobs.append(job)
+            yield job
+
+    print(f"Multi-fidelity campaign: coarse pass with {coarse_mesh}")
+    results = run_pipeline(coarse_jobs(), **run_kwargs)
+
+    solved = {r["sample"] for r in results if r["status"] == "ok"}
+    candidates = [job for job in jobs if Path(job.exp_dir).name in solved]
+    n_fine = math.ceil(mf.fine_fraction * len(jobs))
+    picked = select_fine(candidates, n_fine, mf, outputs_fn)
+
+    fine_jobs = []
+    for index in picked:
+        job = candidates[index]
+        fine_dir = make_fine_copy(job)
+        write_fidelity(
+            fine_dir,
+            {"fidelity": "fine", "mesh_parameters": {}, "coarse": job.exp_dir.name},
+        )
+        write_fidelity(
+            job.exp_dir,
+            {
+                "fidelity": "coarse",
+                "mesh_parameters": coarse_mesh,
+                "fine": fine_dir.name,
+            },
+        )
+        fine_jobs.append(SampleJob(fine_dir, job.experiment_type, job.params))
+
+    print(
+        f"Multi-fidelity campaign: fine pass on {len(fine_jobs)} of "
+        f"{len(jobs)} samples (by {mf.selection})"
+    )
+    fine_results = run_pipeline(fine_jobs, **run_kwargs)
+
+    not_coarser = check_coarser(results, fine_results)
+    if not_coarser:
+        print(
+            f"Warning: the coarse mesh of {len(not_coarser)} samples has no fewer "
+            f"nodes than the fine one; does the .geo file define {list(coarse_mesh)} "
+            f"with DefineConstant? ({', '.join(not_coarser[:5])})"
+        )
+    return results + fine_results
@@ -1,9 +1,57 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Dict, Optional, List
 
 from omegaconf import OmegaConf
-from src.samplers import Sampler, get_sampler
+from src.samplers import Sampler, get_design, get_sampler
+
+
+@dataclass
+class AdaptiveConfig:
+    """Settings of an adaptive campaign (see src.campaigns.adaptive)."""
+
+    budget: int  # Total number of samples, including the initial batch
+    batch_size: int = 8
+    initial_samples: int = 16
+    n_neighbors: int = 3
+    n_committee: int = 8
+    seed: int = 0
+
+
+@dataclass
+class MultiFidelityConfig:
+    """Settings of a multi-fidelity campaign (see src.campaigns.multi_fidelity)."""
+
+    # gmsh parser numbers of the coarse pass, e.g. the global mesh size
+    # factor s of microstrip.geo
+    coarse_mesh: Dict[str, float] = field(default_factory=lambda: {"s": 4.0})
+    # How the samples rerun at full fidelity are picked: "uncertainty",
+    # "novelty" or "fraction" (at random)
+    selection: str = "uncertainty"
+    # Share of the samples rerun at full fidelity
+    fine_fraction: float = 0.1
+    n_neighbors: int = 3
+    n_committee: int = 8
+    seed: int = 0
+
+
+@dataclass
+class PipelineConfig:
+    """Settings of the fused render-to-result pipeline (see run_pipeline)."""
+
+    n_workers: int = 1
+    getdp_path: str = "getdp"
+    gmsh_path: str = "gmsh"
+    mesh_cache_dir: Optional[str] = None
+    resume: bool = True
+    # Consolidated dataset the samples are added to as they finish
+    dataset_dir: Optional[str] = None
+    dataset_chunk_size: int = 256
+    # Limits of every getdp run; a sample that exceeds them fails
+    timeout: Optional[float] = None
+    memory_limit_mb: Optional[int] = None
+    # Runs of a failing sample before it is quarantined
+    max_attempts: int = 2
 
 
 @dataclass
@@ -12,6 +60,12 @@ class ExperimentConfig:
     n_samples: int
     parameters: Dict[str, Sampler]
     directory: Path
+    # Optional joint design (e.g. sobol) the parameters are sampled from
+    design: Optional[Sampler] = None
+    # Optional adaptive campaign; n_samples is then ignored
+    adaptive: Optional[AdaptiveConfig] = None
+    # Optional coarse pass over all samples and fine pass over a subset
+    multi_fidelity: Optional[MultiFidelityConfig] = None
 
 
 @dataclass
@@ -19,16 +73,32 @@ class MainConfig:
     experiments: List[ExperimentConfig]
     output_dir: str = "out"
     template_dir: Optional[Path] = Path("templates")
+    # SeedSequence entropy of the campaign; fresh (and recorded) if None
+    seed: Optional[int] = None
+    # Samples per independent random stream
+    shard_size: int = 1 << 16
+    # Processes drawing shards in parallel
+    n_sampling_workers: int = 1
+    # Solve rendered samples right away; only render them if None
+    pipeline: Optional[PipelineConfig] = None
 
 
 def dict_to_experiment_config(d: dict) -> ExperimentConfig:
     """Convert a dictionary to an ExperimentConfig object."""
     params = {k: get_sampler(v["sampler"])(**v) for k, v in d["parameters"].items()}
+    design = d.get("design")
     return ExperimentConfig(
         type=d["type"],
         n_samples=d["n_samples"],
         parameters=params,
         directory=Path(d["directory"]),
+        design=get_design(design["sampler"])(**design) if design else None,
+        adaptive=AdaptiveConfig(**d["adaptive"]) if d.get("adaptive") else None,
+        multi_fidelity=(
+            MultiFidelityConfig(**d["multi_fidelity"])
+            if d.get("multi_fidelity")
+            else None
+        ),
     )
 
 
@@ -63,4 +133,8 @@ def dict_to_main_config(d: dict, config_dir: Path) -> MainConfig:
         experiments=experiments,
         output_dir=d.get("output_dir", "out"),
         template_dir=Path(d.get("template_dir", "templates")),
+        seed=d.get("seed"),
+        shard_size=d.get("shard_size", 1 << 16),
+        n_sampling_workers=d.get("n_sampling_workers", 1),
+        pipeline=PipelineConfig(**d["pipeline"]) if d.get("pipeline") else None,
     )
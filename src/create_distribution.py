@@ -1,9 +1,56 @@
 from src.experiments import experiment_registry
-from src.samplers import sample_param
+from src.experiments.campaign_index import INDEX_NAME, CampaignIndex
+from src.experiments.dataset import DatasetWriter, remove_dataset
+from src.experiments.metrics import METRICS_NAME, MetricsWriter
+from src.run_experiments import iter_sample_jobs, run_pipeline
+from src.samplers import (
+    describe_params,
+    load_design_offset,
+    record_campaign_run,
+    sample_design,
+    sample_params,
+    save_design_offset,
+    start_campaign_run,
+)
 import hydra
 from omegaconf import DictConfig, OmegaConf
 from pathlib import Path
-from src.config.experiment_config import MainConfig, dict_to_main_config
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from src.config.experiment_config import (
+    MainConfig,
+    PipelineConfig,
+    dict_to_main_config,
+)
+from src.config.path import resolve_path
+
+
+def _report_rendered(
+    chunks: Iterable[Optional[List[Path]]], n_samples: int
+) -> Iterator[Optional[List[Path]]]:
+    n_rendered = 0
+    for chunk in chunks:
+        n_rendered += len(chunk or [])
+        print(f"  Rendered {n_rendered}/{n_samples} samples")
+        yield chunk
+
+
+def _pipeline_kwargs(pipeline: Optional[PipelineConfig]) -> Dict[str, Any]:
+    if pipeline is None:
+        return {}
+    return {
+        "getdp_path": pipeline.getdp_path,
+        "gmsh_path": pipeline.gmsh_path,
+        "n_workers": pipeline.n_workers,
+        "mesh_cache_dir": pipeline.mesh_cache_dir,
+        "resume": pipeline.resume,
+        "timeout": pipeline.timeout,
+        "memory_limit": (
+            pipeline.memory_limit_mb * 2**20
+            if pipeline.memory_limit_mb is not None
+            else None
+        ),
+        "max_attempts": pipeline.max_attempts,
+    }
 
 
 @hydra.main(version_base=None, config_path="../config", config_name="main")
@@ -22,37 +69,154 @@ def main(cfg: DictConfig) -> None:
 
     print(f"Running {len(experiments)} experiment(s)")
 
+    # Every run of the campaign draws from its own SeedSequence streams,
+    # recorded in campaign.json so any shard can be regenerated
+    entropy, run = start_campaign_run(resolve_path(output_dir), structured_cfg.seed)
+    record_campaign_run(
+        resolve_path(output_dir),
+        entropy,
+        run,
+        {
+            exp_cfg.type: {
+                "n_samples": exp_cfg.n_samples,
+                "shard_size": structured_cfg.shard_size,
+                "parameters": describe_params(exp_cfg.parameters),
+            }
+            for exp_cfg in experiments
+            if exp_cfg.design is None and exp_cfg.adaptive is None
+        },
+    )
+    print(f"Campaign entropy {entropy}, run {run}")
+
+    # Samples are registered in the campaign index as they are rendered
+    index = CampaignIndex(resolve_path(output_dir) / INDEX_NAME)
+    metrics = MetricsWriter(resolve_path(output_dir) / METRICS_NAME)
+
+    pipeline = structured_cfg.pipeline
+    dataset = None
+    if pipeline is not None and pipeline.dataset_dir is not None:
+        # Samples stream into the dataset as they finish, so the old dataset
+        # is removed up front; remove_dataset refuses anything else
+        dataset_dir = resolve_path(pipeline.dataset_dir)
+        remove_dataset(dataset_dir)
+        dataset = DatasetWriter(dataset_dir, pipeline.dataset_chunk_size)
+
     for i, exp_cfg in enumerate(experiments):
         print(
             f"\n--- Running Experiment {i + 1}/{len(experiments)}: {exp_cfg.type} ---"
         )
 
+        if exp_cfg.adaptive is not None:
+            # Sampling depends on solved outputs, so the campaign also solves
+            from src.campaigns.adaptive import run_adaptive_campaign
+
+            run_adaptive_campaign(
+                exp_cfg,
+                exp_cfg.adaptive,
+                resolve_path(output_dir),
+                template_dir,
+                dataset=dataset,
+                index=index,
+                metrics=metrics,
+                **_pipeline_kwargs(pipeline),
+            )
+            print(f"✓ Completed adaptive {exp_cfg.type} campaign")
+            continue
+
         n_samples = exp_cfg.n_samples
         params = exp_cfg.parameters
 
         print(f"Generating {n_samples} samples for {len(params)} parameters")
 
-        # Sample values for each parameter
-        sampled = {
-            param: sample_param(param_cfg, n_samples)
-            for param, param_cfg in params.items()
-        }
+        if exp_cfg.design is not None:
+            # Sample all parameters jointly, continuing the design of earlier
+            # runs into the same output directory
+            state_file = resolve_path(output_dir) / "design_state.json"
+            offset = load_design_offset(
+                state_file, exp_cfg.type, exp_cfg.design, params
+            )
+            print(
+                f"Using {exp_cfg.design.sampler} design, points {offset} to {offset + n_samples - 1}"
+            )
+            sampled = sample_design(exp_cfg.design, params, n_samples, offset)
+        else:
+            # Sample values for each parameter from reproducible streams
+            sampled = sample_params(
+                params,
+                n_samples,
+                entropy,
+                run,
+                exp_cfg.type,
+                shard_size=structured_cfg.shard_size,
+                n_workers=structured_cfg.n_sampling_workers,
+            )
 
         print(f"Sampled parameters: {list(sampled.keys())}")
 
         # Run experiment using the registry
         try:
-            experiment_registry.run_experiment(
-                exp_cfg=exp_cfg,
-                sampled_params=sampled,
-                output_dir=output_dir,
-                template_dir=template_dir,
-            )
+            if exp_cfg.multi_fidelity is not None:
+                # Coarse pass over all samples, fine pass over a subset
+                from src.campaigns.multi_fidelity import run_multi_fidelity_campaign
+
+                run_multi_fidelity_campaign(
+                    exp_cfg,
+                    exp_cfg.multi_fidelity,
+                    sampled,
+                    output_dir,
+                    template_dir,
+                    dataset=dataset,
+                    index=index,
+                    metrics=metrics,
+                    **_pipeline_kwargs(pipeline),
+                )
+            else:
+                # Contexts are created and rendered chunk by chunk
+                chunks = _report_rendered(
+                    experiment_registry.iter_experiment(
+                        exp_cfg=exp_cfg,
+                        sampled_params=sampled,
+                        output_dir=output_dir,
+                        template_dir=template_dir,
+                    ),
+                    n_samples,
+                )
+                jobs = iter_sample_jobs(exp_cfg.type, chunks, sampled)
+                if pipeline is None:
+                    for job in jobs:
+                        index.add_sample(
+                            job.exp_dir.name,
+                            job.experiment_type,
+                            job.exp_dir,
+                            job.params,
+                        )
+                else:
+                    # Every rendered sample goes straight on to be solved
+                    run_pipeline(
+                        jobs,
+                        dataset=dataset,
+                        index=index,
+                        metrics=metrics,
+                        **_pipeline_kwargs(pipeline),
+                    )
+            if exp_cfg.design is not None:
+                save_design_offset(
+                    state_file, exp_cfg.type, exp_cfg.design, params, offset + n_samples
+                )
             print(f"✓ Completed {exp_cfg.type} experiment")
         except Exception as e:
             print(f"✗ Error running {exp_cfg.type} experiment: {e}")
             raise
 
+    if dataset is not None:
+        dataset.close()
+        print(f"Wrote dataset with {dataset.index['n_samples']} samples")
+    print(f"Campaign index: {index.count_by_status()}")
+    index.close()
+    if metrics.values:
+        print(metrics.report())
+    metrics.close()
+
 
 if __name__ == "__main__":
     main()
@@ -1,7 +1,11 @@
-from typing import Dict, Callable, Sequence, Any, Optional
+from itertools import islice
+from typing import Dict, Callable, Iterator, List, Sequence, Any, Optional
 from pathlib import Path
 from ..config.experiment_config import ExperimentConfig
 
+# Contexts created and rendered per step of ExperimentRegistry.iter_experiment
+DEFAULT_CHUNK_SIZE = 64
+
 
 class ExperimentRegistry:
     """Registry for experiment types and their runners."""
@@ -27,21 +31,57 @@ class ExperimentRegistry:
         output_dir: str,
         template_dir: Path,
     ):
-        """Run an experiment based on its type."""
+        """
+        Run an experiment based on its type.
+
+        Returns:
+            The created experiment directories, as reported by the runner
+        """
+        experiment_dirs = None
+        for chunk in self.iter_experiment(
+            exp_cfg, sampled_params, output_dir, template_dir
+        ):
+            if chunk is not None:
+                experiment_dirs = (experiment_dirs or []) + list(chunk)
+        return experiment_dirs
+
+    def iter_experiment(
+        self,
+        exp_cfg: ExperimentConfig,
+        sampled_params: Dict[str, Sequence[Any]],
+        output_dir: str,
+        template_dir: Path,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> Iterator[Optional[List[Path]]]:
+        """
+        Run an experiment chunk by chunk.
+
+        Contexts are created lazily from the sampled arrays, chunk_size at a
+        time, and each chunk is rendered by the runner before the next one is
+        created. The directories of a chunk can thus be processed as soon as
+        they are yielded, and memory use does not grow with the sample count.
+
+        Yields:
+            The experiment directories of each chunk, as reported by the runner
+        """
         if exp_cfg.type not in self._experiments:
             raise ValueError(f"Unknown experiment type: {exp_cfg.type}")
 
         # Create contexts using the registered context creator
         context_creator = self._context_creators[exp_cfg.type]
-        contexts = context_creator(sampled_params)
+        contexts = iter(context_creator(sampled_params))
 
         # Run the experiment using the registered runner
         runner = self._experiments[exp_cfg.type]
-        runner(
-            contexts=contexts,
-            out_dir=output_dir,
-            template_dir=template_dir / exp_cfg.directory,
-        )
+        while True:
+            chunk = list(islice(contexts, chunk_size))
+            if not chunk:
+                return
+            yield runner(
+                contexts=chunk,
+                out_dir=output_dir,
+                template_dir=template_dir / exp_cfg.directory,
+            )
 
     def get_available_types(self):
         """Get list of available experiment types."""
@@ -67,9 +107,9 @@ def register_experiment(experiment_type: str):
 # Register available experiments
 @register_experiment("microstrip")
 def _register_microstrip():
-    from .microstrip import run_microstrip_experiments, create_contexts_from_arrays
+    from .microstrip import run_microstrip_experiments, iter_contexts_from_arrays
 
-    return run_microstrip_experiments, create_contexts_from_arrays
+    return run_microstrip_experiments, iter_contexts_from_arrays
 
 
 # Placeholder for magnetic_forces - can be implemented later
@@ -0,0 +1,374 @@
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from .manifest import STAGES
+
+INDEX_NAME = "campaign.sqlite"
+
+IDENTIFIER_PATTERN = re.compile(r"^[A-Za-z_]\w*$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    sample TEXT PRIMARY KEY,
+    experiment_type TEXT,
+    exp_dir TEXT NOT NULL,
+    status TEXT NOT NULL,
+    error TEXT,
+    mesh_ref TEXT,
+    nodes INTEGER,
+    created_at REAL,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS samples_type_status ON samples (experiment_type, status);
+CREATE TABLE IF NOT EXISTS stages (
+    sample TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    status TEXT NOT NULL,
+    input_hash TEXT,
+    seconds REAL,
+    completed_at REAL,
+    error TEXT,
+    PRIMARY KEY (sample, stage)
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    sample TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (sample, stage, name)
+);
+"""
+
+
+def _identifier(name: str) -> str:
+    if not IDENTIFIER_PATTERN.match(name):
+        raise ValueError(f"Not a valid column or table name: {name!r}")
+    return f'"{name}"'
+
+
+def _params_table(experiment_type: str) -> str:
+    return _identifier(f"params_{experiment_type}")
+
+
+class CampaignIndex:
+    """
+    SQLite index of the samples of a campaign.
+
+    The index lets samples be looked up by parameters and status without
+    opening every experiment directory. It holds:
+
+    - samples: experiment type, directory, status, error, mesh hash and
+      mesh node count of each sample
+    - params_<experiment type>: one row per sample and one column per
+      parameter, each column with its own index, so range queries on
+      parameters stay fast
+    - stages: status, input hash and run time of each pipeline stage
+    - artifacts: the files each stage produced, relative to the sample's
+      directory
+
+    Only one process should write to an index; the campaign runners write
+    from the main process. The database uses WAL mode, so it can be read
+    while a campaign is running.
+
+    Example:
+        with CampaignIndex("out/campaign.sqlite") as index:
+            index.select("microstrip", "w > ?", (7.2e-3,), status="ok")
+    """
+
+    def __init__(self, path: str | Path, read_only: bool = False):
+        """
+        Args:
+            path: Database file; created if missing, unless read_only
+            read_only: Open an existing index for queries only, without
+                creating or migrating its tables
+        """
+        self.path = Path(path)
+        self._columns: Dict[str, List[str]] = {}
+        if read_only:
+            self.connection = sqlite3.connect(
+                f"file:{self.path.resolve()}?mode=ro", uri=True
+            )
+            self.connection.row_factory = sqlite3.Row
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        # Indexes written before the node counts were recorded
+        columns = [
+            row["name"] for row in self.connection.execute("PRAGMA table_info(samples)")
+        ]
+        if "nodes" not in columns:
+            self.connection.execute("ALTER TABLE samples ADD COLUMN nodes INTEGER")
+
+    def _param_columns(self, experiment_type: str) -> List[str]:
+        if experiment_type not in self._columns:
+            rows = self.connection.execute(
+                f"PRAGMA table_info({_params_table(experiment_type)})"
+            ).fetchall()
+            self._columns[experiment_type] = [
+                row["name"] for row in rows if row["name"] != "sample"
+            ]
+        return self._columns[experiment_type]
+
+    def _ensure_params_table(self, experiment_type: str, names: Sequence[str]):
+        table = _params_table(experiment_type)
+        self.connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} (sample TEXT PRIMARY KEY)"
+        )
+        columns = self._param_columns(experiment_type)
+        for name in names:
+            if name in columns:
+                continue
+            column = _identifier(name)
+            self.connection.execute(f"ALTER TABLE {table} ADD COLUMN {column}")
+            self.connection.execute(
+                f"CREATE INDEX IF NOT EXISTS "
+                f"{_identifier(f'params_{experiment_type}_{name}')} "
+                f"ON {table} ({column})"
+            )
+            columns.append(name)
+
+    def add_sample(
+        self,
+        sample: str,
+        experiment_type: Optional[str],
+        exp_dir: str | Path,
+        params: Dict[str, Any],
+        status: str = "rendered",
+    ):
+        """
+        Register a sample and its parameters.
+
+        A sample that is already registered keeps its status; its directory
+        and parameters are updated.
+        """
+        now = time.time()
+        self.connection.execute(
+            "INSERT INTO samples (sample, experiment_type, exp_dir, status, "
+            "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (sample) DO UPDATE SET "
+            "experiment_type = excluded.experiment_type, exp_dir = excluded.exp_dir",
+            (sample, experiment_type, str(exp_dir), status, now, now),
+        )
+        params = {
+            name: value
+            for name, value in params.items()
+            if isinstance(value, (int, float, str)) or value is None
+        }
+        if experiment_type is not None and params:
+            self._ensure_params_table(experiment_type, list(params))
+            names = list(params)
+            self.connection.execute(
+                f"INSERT OR REPLACE INTO {_params_table(experiment_type)} "
+                f"(sample, {', '.join(_identifier(n) for n in names)}) "
+                f"VALUES (?{', ?' * len(names)})",
+                [sample] + [params[n] for n in names],
+            )
+        self.connection.commit()
+
+    def record_result(self, result: Dict[str, Any]):
+        """
+        Record the outcome of processing a sample.
+
+        Args:
+            result: Result record of process_sample. Its "stages" (the
+                manifest entries) and "timings" are stored per stage.
+        """
+        sample = result["sample"]
+        # A mesh that was up to date keeps the node count recorded when it was generated
+        nodes = result.get("metrics", {}).get("meshed", {}).get("nodes")
+        self.connection.execute(
+            "UPDATE samples SET status = ?, error = ?, mesh_ref = ?, "
+            "nodes = COALESCE(?, nodes), updated_at = ? WHERE sample = ?",
+            (
+                result["status"],
+                result.get("error"),
+                result.get("mesh_ref"),
+                nodes,
+                time.time(),
+                sample,
+            ),
+        )
+        stages = result.get("stages", {})
+        timings = result.get("timings", {})
+        # Stages skipped as up to date keep the run time recorded when they ran
+        previous = {
+            (row["stage"], row["completed_at"]): row["seconds"]
+            for row in self.connection.execute(
+                "SELECT stage, completed_at, seconds FROM stages WHERE sample = ?",
+                (sample,),
+            )
+        }
+        if stages:
+            self.connection.execute("DELETE FROM stages WHERE sample = ?", (sample,))
+            self.connection.execute("DELETE FROM artifacts WHERE sample = ?", (sample,))
+        for stage, entry in stages.items():
+            self.connection.execute(
+                "INSERT INTO stages VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    sample,
+                    stage,
+                    entry.get("status"),
+                    entry.get("input_hash"),
+                    timings.get(
+                        stage, previous.get((stage, entry.get("completed_at")))
+                    ),
+                    entry.get("completed_at"),
+                    entry.get("error"),
+                ),
+            )
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO artifacts VALUES (?, ?, ?)",
+                [(sample, stage, name) for name in entry.get("outputs", [])],
+            )
+        self.connection.commit()
+
+    def select(
+        self,
+        experiment_type: str,
+        where: str = "",
+        args: Sequence[Any] = (),
+        status: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Find samples of one experiment type.
+
+        Args:
+            experiment_type: Experiment type
+            where: SQL condition on the parameter columns, e.g. "w > ? AND h < ?"
+            args: Values of the placeholders in where
+            status: Only samples with this status (e.g. "ok")
+
+        Returns:
+            list: {"sample", "exp_dir", "status", <parameter>: value, ...} per sample
+        """
+        table = _params_table(experiment_type)
+        if not self._param_columns(experiment_type):
+            return []
+        conditions = ["s.experiment_type = ?"]
+        values = [experiment_type]
+        if status is not None:
+            conditions.append("s.status = ?")
+            values.append(status)
+        if where:
+            conditions.append(f"({where})")
+            values.extend(args)
+        rows = self.connection.execute(
+            f"SELECT s.sample, s.exp_dir, s.status, p.* FROM samples s "
+            f"JOIN {table} p ON p.sample = s.sample "
+            f"WHERE {' AND '.join(conditions)} ORDER BY s.sample",
+            values,
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def cost_history(self, experiment_type: str) -> List[Dict[str, Any]]:
+        """
+        Recorded run times of the samples of one experiment type.
+
+        Returns:
+            list: {"params": {<parameter>: value, ...}, "seconds": total run
+                time of the sample's recorded stages, "nodes": mesh node count
+                or None} per sample with at least one timed stage
+        """
+        table = _params_table(experiment_type)
+        if not self._param_columns(experiment_type):
+            return []
+        rows = self.connection.execute(
+            f"SELECT p.*, s.nodes AS _nodes, SUM(st.seconds) AS _seconds "
+            f"FROM samples s JOIN {table} p ON p.sample = s.sample "
+            f"JOIN stages st ON st.sample = s.sample "
+            f"WHERE s.experiment_type = ? AND st.seconds IS NOT NULL "
+            f"GROUP BY s.sample",
+            (experiment_type,),
+        ).fetchall()
+        history = []
+        for row in rows:
+            row = dict(row)
+            seconds, nodes = row.pop("_seconds"), row.pop("_nodes")
+            row.pop("sample")
+            history.append({"params": row, "seconds": seconds, "nodes": nodes})
+        return history
+
+    def samples(
+        self, experiment_type: Optional[str] = None, status: Optional[str] = None
+    ) -> List[str]:
+        """Names of the indexed samples, optionally of one type and status."""
+        conditions, values = [], []
+        if experiment_type is not None:
+            conditions.append("experiment_type = ?")
+            values.append(experiment_type)
+        if status is not None:
+            conditions.append("status = ?")
+            values.append(status)
+        query = "SELECT sample FROM samples"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        rows = self.connection.execute(query + " ORDER BY sample", values)
+        return [row["sample"] for row in rows]
+
+    def count_by_status(self, experiment_type: Optional[str] = None) -> Dict[str, int]:
+        """Number of samples per status, optionally of one experiment type."""
+        query = "SELECT status, COUNT(*) AS n FROM samples"
+        values: List[Any] = []
+        if experiment_type is not None:
+            query += " WHERE experiment_type = ?"
+            values.append(experiment_type)
+        rows = self.connection.execute(query + " GROUP BY status", values)
+        return {row["status"]: row["n"] for row in rows}
+
+    def exp_dir(self, sample: str) -> Optional[Path]:
+        """Directory of a sample, or None if it is not in the index."""
+        row = self.connection.execute(
+            "SELECT exp_dir FROM samples WHERE sample = ?", (sample,)
+        ).fetchone()
+        return Path(row["exp_dir"]) if row else None
+
+    def artifacts(
+        self, sample: str, stage: Optional[str] = None, suffix: Optional[str] = None
+    ) -> List[Path]:
+        """
+        Files produced for a sample.
+
+        Args:
+            sample: Sample name
+            stage: Only the outputs of this stage (one of STAGES)
+            suffix: Only files with this suffix, e.g. ".vtk"
+
+        Returns:
+            list: Paths of the files, in stage order
+        """
+        exp_dir = self.exp_dir(sample)
+        if exp_dir is None:
+            return []
+        query = "SELECT stage, name FROM artifacts WHERE sample = ?"
+        values: List[Any] = [sample]
+        if stage is not None:
+            query += " AND stage = ?"
+            values.append(stage)
+        rows = self.connection.execute(query, values).fetchall()
+        rows = sorted(
+            rows,
+            key=lambda row: (
+                STAGES.index(row["stage"]) if row["stage"] in STAGES else len(STAGES),
+                row["name"],
+            ),
+        )
+        return [
+            exp_dir / row["name"]
+            for row in rows
+            if suffix is None or row["name"].endswith(suffix)
+        ]
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
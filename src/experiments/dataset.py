@@ -0,0 +1,392 @@
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from .manifest import SampleManifest
+from .results import sample_meshes
+
+INDEX_NAME = "index.json"
+DATASET_VERSION = 1
+
+# Per-sample columns of a chunk: record key -> file stem
+COLUMNS = {
+    "sample_id": "sample_ids",
+    "experiment_type": "experiment_types",
+    "status": "status",
+    "mesh_ref": "mesh_refs",
+}
+
+
+def load_sample_fields(exp_dir: Path) -> Dict[str, np.ndarray]:
+    """
+    Read the point coordinates and fields of a sample's result meshes (see
+    sample_meshes): the solution GetDPReader reads from its .msh/.pre/.res
+    files, or the point data of its VTK files if it has no solution.
+
+    Arrays are keyed "<file stem>/points" and "<file stem>/<array name>",
+    e.g. "microstrip/solution_real". Scalar arrays are stored as
+    (n_points, 1).
+    """
+    fields = {}
+    for stem, mesh, names in sample_meshes(exp_dir):
+        fields[f"{stem}/points"] = np.asarray(mesh.points, dtype=np.float64)
+        for name in names:
+            values = np.asarray(mesh.point_data[name])
+            fields[f"{stem}/{name}"] = values.reshape(len(values), -1)
+    return fields
+
+
+def _field_file(field: str) -> str:
+    return field.replace("/", "__")
+
+
+class DatasetWriter:
+    """
+    Write samples to a consolidated, chunked on-disk dataset.
+
+    The dataset is a directory with an index.json and one sub-directory per
+    chunk of up to chunk_size samples. A chunk holds .npy arrays:
+
+    - sample_ids, experiment_types, status, mesh_refs: one entry per sample
+    - params: (n_samples, n_params) float64, NaN where a sample has no value;
+      column names are listed for the chunk in the index
+    - <field>.values / <field>.offsets: the rows of all samples concatenated,
+      sample i spanning values[offsets[i]:offsets[i + 1]]
+
+    Chunks are written to a temporary directory and renamed into place, and
+    the index is rewritten after every chunk, so a reader never sees a
+    partial chunk.
+    """
+
+    def __init__(self, root: str | Path, chunk_size: int = 256):
+        self.root = Path(root)
+        self.chunk_size = chunk_size
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.index = {"version": DATASET_VERSION, "n_samples": 0, "chunks": []}
+        self._pending: List[Dict[str, Any]] = []
+
+    def add(
+        self,
+        sample_id: str,
+        experiment_type: Optional[str],
+        status: str,
+        params: Dict[str, Any],
+        fields: Dict[str, np.ndarray],
+        mesh_ref: str = "",
+    ):
+        """Add one sample; a chunk is written once chunk_size samples are pending."""
+        self._pending.append(
+            {
+                "sample_id": sample_id,
+                "experiment_type": experiment_type or "",
+                "status": status,
+                "params": params,
+                "fields": fields,
+                "mesh_ref": mesh_ref,
+            }
+        )
+        if len(self._pending) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Write the pending samples as a new chunk."""
+        if not self._pending:
+            return
+
+        samples, self._pending = self._pending, []
+        name = f"chunk-{len(self.index['chunks']):05d}"
+        tmp_dir = Path(tempfile.mkdtemp(dir=self.root, prefix=f".{name}-"))
+        try:
+            param_names = sorted(
+                {k for s in samples for k, v in s["params"].items() if _is_number(v)}
+            )
+            params = np.full((len(samples), len(param_names)), np.nan)
+            for i, sample in enumerate(samples):
+                for j, key in enumerate(param_names):
+                    value = sample["params"].get(key)
+                    if _is_number(value):
+                        params[i, j] = value
+
+            np.save(tmp_dir / "params.npy", params)
+            for key, stem in COLUMNS.items():
+                np.save(
+                    tmp_dir / f"{stem}.npy",
+                    np.array([s[key] for s in samples], dtype=str),
+                )
+
+            field_names = sorted({f for s in samples for f in s["fields"]})
+            for field in field_names:
+                arrays = [s["fields"].get(field) for s in samples]
+                width = next(a.shape[1] for a in arrays if a is not None)
+                dtype = np.result_type(*[a.dtype for a in arrays if a is not None])
+                arrays = [
+                    a if a is not None else np.empty((0, width), dtype) for a in arrays
+                ]
+                if any(a.shape[1] != width for a in arrays):
+                    raise ValueError(f"Field {field} has inconsistent components")
+                offsets = np.zeros(len(arrays) + 1, dtype=np.int64)
+                np.cumsum([len(a) for a in arrays], out=offsets[1:])
+                np.save(
+                    tmp_dir / f"{_field_file(field)}.values.npy",
+                    np.concatenate(arrays).astype(dtype, copy=False),
+                )
+                np.save(tmp_dir / f"{_field_file(field)}.offsets.npy", offsets)
+
+            os.replace(tmp_dir, self.root / name)
+        finally:
+            if tmp_dir.exists():
+                shutil.rmtree(tmp_dir)
+
+        self.index["chunks"].append(
+            {
+                "name": name,
+                "n_samples": len(samples),
+                "params": param_names,
+                "fields": field_names,
+            }
+        )
+        self.index["n_samples"] += len(samples)
+        self._write_index()
+
+    def close(self):
+        self.flush()
+        self._write_index()
+
+    def _write_index(self):
+        fd, tmp_name = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(self.index, f, indent=2)
+            os.replace(tmp_name, self.root / INDEX_NAME)
+        finally:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float, np.number)) and not isinstance(value, bool)
+
+
+class Dataset:
+    """
+    Read a dataset written by DatasetWriter.
+
+    All arrays are opened memory-mapped, so reading a field of many samples
+    is a sequential read of one file per chunk.
+    """
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        with open(self.root / INDEX_NAME, "r") as f:
+            self.index = json.load(f)
+        self._chunk_starts = np.cumsum(
+            [0] + [c["n_samples"] for c in self.index["chunks"]]
+        )
+        self._arrays: Dict[tuple, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return int(self._chunk_starts[-1])
+
+    @property
+    def param_names(self) -> List[str]:
+        return sorted({p for c in self.index["chunks"] for p in c["params"]})
+
+    @property
+    def field_names(self) -> List[str]:
+        return sorted({f for c in self.index["chunks"] for f in c["fields"]})
+
+    def _load(self, chunk: int, file_name: str) -> np.ndarray:
+        key = (chunk, file_name)
+        if key not in self._arrays:
+            path = self.root / self.index["chunks"][chunk]["name"] / file_name
+            self._arrays[key] = np.load(path, mmap_mode="r")
+        return self._arrays[key]
+
+    def _column(self, file_name: str) -> np.ndarray:
+        if not self.index["chunks"]:
+            return np.array([], dtype=str)
+        return np.concatenate(
+            [self._load(c, file_name) for c in range(len(self.index["chunks"]))]
+        )
+
+    @property
+    def sample_ids(self) -> np.ndarray:
+        return self._column(f"{COLUMNS['sample_id']}.npy")
+
+    @property
+    def experiment_types(self) -> np.ndarray:
+        return self._column(f"{COLUMNS['experiment_type']}.npy")
+
+    @property
+    def status(self) -> np.ndarray:
+        return self._column(f"{COLUMNS['status']}.npy")
+
+    @property
+    def mesh_refs(self) -> np.ndarray:
+        return self._column(f"{COLUMNS['mesh_ref']}.npy")
+
+    def params(self, names: Optional[Sequence[str]] = None) -> np.ndarray:
+        """Parameter table (n_samples, len(names)), NaN where not set."""
+        names = list(names) if names is not None else self.param_names
+        table = np.full((len(self), len(names)), np.nan)
+        for c, chunk in enumerate(self.index["chunks"]):
+            chunk_params = self._load(c, "params.npy")
+            start = self._chunk_starts[c]
+            for j, name in enumerate(names):
+                if name in chunk["params"]:
+                    table[start : start + chunk["n_samples"], j] = chunk_params[
+                        :, chunk["params"].index(name)
+                    ]
+        return table
+
+    def field(self, name: str, sample: int) -> Optional[np.ndarray]:
+        """Rows of field name for one sample (by position), or None if absent."""
+        c = int(np.searchsorted(self._chunk_starts, sample, side="right") - 1)
+        if not 0 <= sample < len(self) or name not in self.index["chunks"][c]["fields"]:
+            return None
+        i = sample - self._chunk_starts[c]
+        values = self._load(c, f"{_field_file(name)}.values.npy")
+        offsets = self._load(c, f"{_field_file(name)}.offsets.npy")
+        return values[offsets[i] : offsets[i + 1]]
+
+    def iter_field(self, name: str) -> Iterator[np.ndarray]:
+        """Yield field name for every sample in order (empty if absent)."""
+        for sample in range(len(self)):
+            values = self.field(name, sample)
+            yield values if values is not None else np.empty((0, 0))
+
+
+def _mesh_ref(exp_dir: Path) -> str:
+    """Content hash of the sample's mesh (its mesh cache key), or "" if unknown."""
+    entry = SampleManifest(exp_dir).stages.get("meshed")
+    if entry and entry.get("status") == "done":
+        return entry["input_hash"]
+    # Samples derived by linear superposition share the mesh of their source
+    try:
+        with open(exp_dir / "provenance.json", "r") as f:
+            source = json.load(f)["derived_from"]
+    except (OSError, json.JSONDecodeError, KeyError):
+        return ""
+    return _mesh_ref(exp_dir.parent / source) if source != exp_dir.name else ""
+
+
+def check_replaceable(root: str | Path):
+    """
+    Check that a directory can be replaced by a new dataset: it does not
+    exist, is empty, or holds a dataset (has an index.json).
+
+    Raises:
+        ValueError: If root is anything else, e.g. a mistyped output directory
+    """
+    root = Path(root)
+    if not root.exists() or (root / INDEX_NAME).is_file():
+        return
+    if not root.is_dir() or any(root.iterdir()):
+        raise ValueError(f"Refusing to replace {root}: it is not a dataset")
+
+
+def remove_dataset(root: str | Path):
+    """
+    Delete the dataset in root, if there is one.
+
+    Raises:
+        ValueError: If root exists but is not a dataset (see check_replaceable)
+    """
+    root = Path(root)
+    check_replaceable(root)
+    if root.exists():
+        shutil.rmtree(root)
+
+
+def replace_dataset(built: str | Path, root: str | Path):
+    """
+    Move a written dataset into place as root, deleting the dataset that was
+    there only once the new one is in place.
+
+    Args:
+        built: Directory of the new dataset, on the same filesystem as root
+        root: Directory of the dataset
+
+    Raises:
+        ValueError: If root exists but is not a dataset (see check_replaceable)
+    """
+    root = Path(root)
+    check_replaceable(root)
+    if not root.exists():
+        os.replace(built, root)
+        return
+    old_dir = Path(tempfile.mkdtemp(dir=root.parent, prefix=f".{root.name}-old-"))
+    os.replace(root, old_dir)
+    os.replace(built, root)
+    shutil.rmtree(old_dir)
+
+
+def build_dataset(
+    dataset_dir: str | Path,
+    out_dir: str | Path,
+    results: Sequence[Dict[str, Any]],
+    chunk_size: int = 256,
+) -> Path:
+    """
+    Collect the outputs of a campaign into one dataset (see DatasetWriter).
+
+    Samples are read one at a time, so memory use is bounded by one chunk.
+
+    Args:
+        dataset_dir: Directory of the dataset; an existing dataset is only
+            replaced once the new one is complete
+        out_dir: Directory containing the experiment directories
+        results: Result records of run_all_experiments_and_save_results
+        chunk_size: Number of samples per chunk
+
+    Returns:
+        Path: The dataset directory
+
+    Raises:
+        ValueError: If dataset_dir exists but is not a dataset
+    """
+    dataset_dir = Path(dataset_dir)
+    out_dir = Path(out_dir)
+    check_replaceable(dataset_dir)
+
+    # Built next to the dataset, so a failed build leaves the old one intact
+    dataset_dir.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(
+        tempfile.mkdtemp(dir=dataset_dir.parent, prefix=f".{dataset_dir.name}-")
+    )
+    try:
+        with DatasetWriter(tmp_dir, chunk_size) as writer:
+            for result in sorted(results, key=lambda r: r["sample"]):
+                exp_dir = out_dir / result["sample"]
+                try:
+                    with open(exp_dir / "config.json", "r") as f:
+                        params = json.load(f)
+                except (OSError, json.JSONDecodeError):
+                    params = {}
+                fields = load_sample_fields(exp_dir) if result["status"] == "ok" else {}
+                writer.add(
+                    result["sample"],
+                    result.get("experiment_type"),
+                    result["status"],
+                    params,
+                    fields,
+                    _mesh_ref(exp_dir),
+                )
+        replace_dataset(tmp_dir, dataset_dir)
+    finally:
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir)
+
+    print(f"Wrote dataset with {writer.index['n_samples']} samples to {dataset_dir}")
+    return dataset_dir
@@ -0,0 +1,37 @@
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+FIDELITY_NAME = "fidelity.json"
+
+# Suffix of the directory a sample is rerun at full fidelity in
+FINE_SUFFIX = "-fine"
+
+
+def write_fidelity(exp_dir: Path, record: Dict[str, Any]):
+    """
+    Write the fidelity record of a sample directory.
+
+    Args:
+        exp_dir: Sample directory
+        record: {"fidelity": "coarse" or "fine", "mesh_parameters": gmsh
+            parser numbers the sample is meshed with, and the name of the
+            linked directory of the other fidelity under "fine" or "coarse"}
+    """
+    with open(Path(exp_dir) / FIDELITY_NAME, "w") as f:
+        json.dump(record, f, indent=2)
+
+
+def read_fidelity(exp_dir: Path) -> Optional[Dict[str, Any]]:
+    """The fidelity record of a sample directory, or None if it has none."""
+    try:
+        with open(Path(exp_dir) / FIDELITY_NAME, "r") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def mesh_parameters(exp_dir: Path) -> Dict[str, float]:
+    """gmsh parser numbers a sample directory is meshed with (none by default)."""
+    record = read_fidelity(exp_dir)
+    return dict(record.get("mesh_parameters", {})) if record else {}
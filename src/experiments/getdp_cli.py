@@ -1,21 +1,101 @@
-import subprocess
+import atexit
+import threading
 from pathlib import Path
+from typing import Dict, List, Optional, Sequence
 import pyvista as pv
 import gmsh
 
+from ..getdp.pro import post_operation_files
+from .mesh_cache import MeshCache, mesh_cache_key
+from .metrics import ResourceMonitor
+
+GMSH_VERSION = getattr(gmsh, "__version__", "unknown")
+
+
+def _is_up_to_date(output: Path, source: Path) -> bool:
+    """Check whether output exists and is not older than source."""
+    try:
+        return output.stat().st_mtime_ns >= source.stat().st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+
+class GmshSession:
+    """
+    Process-wide gmsh session that is initialized once and reused.
+
+    gmsh keeps global state and is not thread-safe, so jobs are serialized
+    through a lock. The model, options, ONELAB parameters and parser variables
+    are reset between jobs so nothing leaks from one sample into the next.
+    The session is finalized when the process exits.
+    """
+
+    _lock = threading.RLock()
+    _initialized = False
+
+    @classmethod
+    def start(cls):
+        with cls._lock:
+            if cls._initialized:
+                return
+            # Signal handlers can only be installed from the main thread
+            gmsh.initialize(
+                interruptible=threading.current_thread() is threading.main_thread()
+            )
+            cls._initialized = True
+            atexit.register(cls.shutdown)
+
+    @classmethod
+    def reset(cls):
+        gmsh.clear()
+        gmsh.option.restoreDefaults()
+        gmsh.onelab.clear()
+        gmsh.parser.clear()
+
+    @classmethod
+    def shutdown(cls):
+        with cls._lock:
+            if not cls._initialized:
+                return
+            try:
+                gmsh.finalize()
+            except:
+                pass
+            cls._initialized = False
+
 
 class GmshContext:
-    """Context manager for Gmsh initialization and cleanup."""
+    """
+    Context manager for Gmsh initialization and cleanup.
+
+    With persistent=True the shared GmshSession is reused instead of paying for
+    gmsh.initialize()/gmsh.finalize() on every call.
+    """
 
-    def __init__(self):
+    def __init__(self, persistent: bool = False):
+        self.persistent = persistent
         self.initialized = False
 
     def __enter__(self):
+        if self.persistent:
+            GmshSession._lock.acquire()
+            try:
+                GmshSession.start()
+                GmshSession.reset()
+            except:
+                GmshSession._lock.release()
+                raise
+            return gmsh
+
         gmsh.initialize()
         self.initialized = True
         return gmsh
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.persistent:
+            GmshSession._lock.release()
+            return
+
         if self.initialized:
             try:
                 gmsh.finalize()
@@ -24,80 +104,257 @@ class GmshContext:
 
 
 class GetDPCLI:
-    def __init__(self, getdp_path: str = "getdp", gmsh_path: str = "gmsh"):
+    def __init__(
+        self,
+        getdp_path: str = "getdp",
+        gmsh_path: str = "gmsh",
+        persistent_gmsh: bool = True,
+        mesh_cache: Optional[MeshCache] = None,
+        timeout: Optional[float] = None,
+        memory_limit: Optional[int] = None,
+    ):
         self.getdp_path = getdp_path
         self.gmsh_path = gmsh_path
+        # Reuse one gmsh session per process across samples
+        self.persistent_gmsh = persistent_gmsh
+        # Optional store of meshes shared by samples with identical geometry
+        self.mesh_cache = mesh_cache
+        # Resource usage of the gmsh and getdp work done by this instance
+        self.monitor = ResourceMonitor()
+        # Limits of every getdp process: seconds until it is killed, and
+        # address space in bytes
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+
+    def _run_getdp(self, pro_file: Path, arguments: List[str]):
+        self.monitor.run(
+            [self.getdp_path] + arguments,
+            cwd=pro_file.parent,
+            timeout=self.timeout,
+            memory_limit=self.memory_limit,
+        )
 
-    def generate_mesh(self, geo_file: Path, dim: int = 2) -> Path:
-        """Generate a mesh using gmsh from a .geo file."""
+    @staticmethod
+    def mesh_key(
+        geo_file: Path,
+        dim: int = 2,
+        binary: bool = False,
+        parameters: Optional[Dict[str, float]] = None,
+    ) -> str:
+        """Hash of everything that determines the mesh generated from geo_file."""
+        options = {"dim": dim, "binary": binary, "gmsh": GMSH_VERSION}
+        if parameters:
+            options["parameters"] = parameters
+        return mesh_cache_key(geo_file, options)
+
+    def generate_mesh(
+        self,
+        geo_file: Path,
+        dim: int = 2,
+        binary: bool = False,
+        parameters: Optional[Dict[str, float]] = None,
+    ) -> Path:
+        """
+        Generate a mesh using gmsh from a .geo file.
+
+        The mesh is written in MSH 4.1 format, binary if binary=True. Binary
+        files are smaller and are read by GetDPReader without text parsing.
+        If a mesh cache is configured and already holds a mesh for the same
+        rendered geometry and options, it is reused instead of meshing.
+
+        parameters are set as gmsh parser numbers before the .geo file is
+        merged, overriding its DefineConstant defaults (e.g. {"s": 4.0} for a
+        4x coarser microstrip mesh). gmsh.open would clear them again.
+        """
         msh_file = geo_file.with_suffix(".msh")
 
-        with GmshContext() as gmsh:
+        cache_key = None
+        if self.mesh_cache is not None:
+            cache_key = self.mesh_key(geo_file, dim, binary, parameters)
+            if self.mesh_cache.fetch(cache_key, msh_file):
+                print(f"Reused cached mesh: {msh_file.name}")
+                return msh_file
+
+        # Never write through a hard link into the cache
+        msh_file.unlink(missing_ok=True)
+
+        with self.monitor.in_process("mesh") as usage, GmshContext(
+            self.persistent_gmsh
+        ) as gmsh:
             # Clear any existing model
             gmsh.model.remove()
 
-            # Open the geometry file
-            gmsh.open(str(geo_file))
+            if parameters:
+                for name, value in parameters.items():
+                    gmsh.parser.setNumber(name, [float(value)])
+                # Unlike open, merge keeps the parser numbers just set
+                gmsh.merge(str(geo_file))
+            else:
+                # Open the geometry file
+                gmsh.open(str(geo_file))
 
             # Generate mesh
             gmsh.model.mesh.generate(dim)
+            usage["nodes"] = len(gmsh.model.mesh.getNodes()[0])
+            usage["elements"] = sum(
+                len(tags) for tags in gmsh.model.mesh.getElements()[1]
+            )
 
             # Write mesh file
+            gmsh.option.setNumber("Mesh.MshFileVersion", 4.1)
+            gmsh.option.setNumber("Mesh.Binary", 1 if binary else 0)
             gmsh.write(str(msh_file))
 
-            print(f"Generated mesh: {msh_file.name}")
-            return msh_file
+        if cache_key is not None:
+            self.mesh_cache.store(cache_key, msh_file)
+
+        print(f"Generated mesh: {msh_file.name}")
+        return msh_file
 
     def run_solver(self, pro_file: Path, case: str = "EleSta_v"):
         """Run getDP solver for the given .pro file and case."""
-        subprocess.run(
-            [self.getdp_path, str(pro_file.with_suffix("").name), "-solve", case],
-            cwd=pro_file.parent,
-            check=True,
+        self._run_getdp(pro_file, [str(pro_file.with_suffix("").name), "-solve", case])
+
+    def run_post(self, pro_file: Path, pos: str | Sequence[str] = "Map"):
+        """
+        Run getDP post-processing for the given .pro file and pos operation(s).
+
+        Several operations are run by a single getdp process.
+        """
+        operations = [pos] if isinstance(pos, str) else list(pos)
+        self._run_getdp(
+            pro_file, ["-v2", str(pro_file.with_suffix("").name), "-pos"] + operations
         )
 
-    def run_post(self, pro_file: Path, pos: str = "Map"):
-        """Run getDP post-processing for the given .pro file and pos operation."""
-        subprocess.run(
-            [self.getdp_path, "-v2", str(pro_file.with_suffix("").name), "-pos", pos],
-            cwd=pro_file.parent,
-            check=True,
+    def run_solve_and_post(
+        self,
+        pro_file: Path,
+        case: str = "EleSta_v",
+        post_operations: Sequence[str] = ("Map", "Cut"),
+    ) -> Dict[str, List[Path]]:
+        """
+        Solve and run all post-operations in one getdp process.
+
+        getdp then reads the mesh, pre-processes and keeps the solution in
+        memory once, instead of once per run_solver/run_post call.
+
+        Args:
+            pro_file: Path to the .pro file
+            case: Resolution to solve
+            post_operations: PostOperations to run after the solve
+
+        Returns:
+            dict: Post-operation name -> output files it wrote (see post_outputs)
+        """
+        self._run_getdp(
+            pro_file,
+            ["-v2", str(pro_file.with_suffix("").name), "-solve", case, "-pos"]
+            + list(post_operations),
         )
+        return self.post_outputs(pro_file, post_operations)
+
+    @staticmethod
+    def post_outputs(
+        pro_file: Path, post_operations: Sequence[str]
+    ) -> Dict[str, List[Path]]:
+        """
+        Output files of each post-operation, as declared in the .pro file.
+
+        Only files that exist are returned. Output names that are not literal
+        in the .pro file cannot be attributed and are left out.
+        """
+        declared = post_operation_files(pro_file)
+        return {
+            operation: [
+                pro_file.parent / name
+                for name in declared.get(operation, [])
+                if (pro_file.parent / name).exists()
+            ]
+            for operation in post_operations
+        }
 
     def run_post_vtk(
         self,
         pro_file: Path,
         mesh_file: Path,
-        pos: str = "Map",
-    ):
-        """Run getDP post-processing and convert output to VTK format."""
-        # First run the normal post-processing
+        pos: str | Sequence[str] = "Map",
+    ) -> List[Path]:
+        """
+        Run getDP post-processing and convert output to VTK format.
+
+        Args:
+            pro_file: Path to the .pro file
+            mesh_file: Mesh the .pos files refer to
+            pos: One PostOperation or several, run by one getdp process
+                before a single conversion pass
+
+        Returns:
+            list: VTK files written by the conversion
+        """
         self.run_post(pro_file, pos)
 
         # Convert .pos files to VTK format
-        pro_dir = pro_file.parent
-        for pos_file in pro_dir.glob("*.pos"):
-            self.convert_pos_to_vtk(pos_file, mesh_file)
+        return self.convert_pos_files(sorted(pro_file.parent.glob("*.pos")), mesh_file)
 
-    def convert_pos_to_vtk(self, pos_file: Path, mesh_file: Path):
-        vtk_file = pos_file.with_suffix(".vtk")
+    def convert_pos_files(
+        self, pos_files: Sequence[Path], mesh_file: Path, force: bool = False
+    ) -> List[Path]:
+        """
+        Convert .pos files to VTK in one gmsh session with the mesh opened once.
 
-        with GmshContext() as gmsh:
+        Only .pos files without a VTK file, or modified after it, are merged.
+        Each is merged as a view, written and removed again, so every VTK file
+        holds the data of its own .pos file only.
+
+        Args:
+            pos_files: .pos files to convert
+            mesh_file: Mesh the .pos files refer to
+            force: Convert all files, even if their VTK file is up to date
+
+        Returns:
+            list: VTK files written
+        """
+        stale = [
+            Path(pos_file)
+            for pos_file in pos_files
+            if force or not _is_up_to_date(pos_file.with_suffix(".vtk"), pos_file)
+        ]
+        if not stale:
+            return []
+
+        vtk_files = []
+        with self.monitor.in_process("convert"), GmshContext(
+            self.persistent_gmsh
+        ) as gmsh:
             # Clear any existing model
             gmsh.model.remove()
 
             # First open the mesh file to establish the geometry
             gmsh.open(str(mesh_file))
 
-            # Then merge the .pos file to add the solution data
-            gmsh.merge(str(pos_file))
+            for pos_file in stale:
+                vtk_file = pos_file.with_suffix(".vtk")
+                views_before = set(gmsh.view.getTags())
 
-            # Write as VTK with solution data
-            gmsh.write(str(vtk_file))
+                # Merge the .pos file to add the solution data and write as
+                # VTK with solution data
+                gmsh.merge(str(pos_file))
+                gmsh.write(str(vtk_file))
 
-            print(
-                f"Converted {pos_file.name} to {vtk_file.name} with solution data (Python API)"
-            )
+                for tag in set(gmsh.view.getTags()) - views_before:
+                    gmsh.view.remove(tag)
+
+                print(
+                    f"Converted {pos_file.name} to {vtk_file.name} with solution data (Python API)"
+                )
+                vtk_files.append(vtk_file)
+
+        return vtk_files
+
+    def convert_pos_to_vtk(self, pos_file: Path, mesh_file: Path) -> Path:
+        """Convert a single .pos file to VTK, regardless of its VTK file's age."""
+        self.convert_pos_files([pos_file], mesh_file, force=True)
+        return pos_file.with_suffix(".vtk")
 
     @staticmethod
     def load_vtk_file(vtk_file: Path):
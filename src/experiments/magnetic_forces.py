@@ -4,9 +4,10 @@ import uuid
 import json
 from jinja2 import Environment, FileSystemLoader
 from dataclasses import dataclass, asdict, fields
-from typing import Sequence, Optional, Dict, Any
+from typing import Sequence, Optional, Dict, Any, Iterable, Iterator, List
 import numpy as np
 from src.config.path import resolve_path
+from src.experiments.manifest import record_rendered
 
 TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "..", "templates")
 OUT_DIR = os.path.join(os.path.dirname(__file__), "..", "out")
@@ -37,12 +38,15 @@ class MagneticForcesContext:
 
 
 def run_magnetic_forces_experiments(
-    contexts: Sequence[MagneticForcesContext],
+    contexts: Iterable[MagneticForcesContext],
     out_dir: Optional[str] = None,
     template_dir: Optional[Path] = None,
-):
+) -> List[Path]:
     """
     Runs magnetic forces experiments for each MagneticForcesContext provided.
+
+    Returns:
+        List of the created experiment directories
     """
     resolved_out_dir = (
         resolve_path(out_dir) if out_dir is not None else resolve_path(OUT_DIR)
@@ -62,6 +66,7 @@ def run_magnetic_forces_experiments(
         variable_end_string="]]",
     )
 
+    experiment_dirs = []
     for ctx in contexts:
         experiment_id = str(uuid.uuid4())
         experiment_dir = os.path.join(resolved_out_dir, experiment_id)
@@ -88,20 +93,28 @@ def run_magnetic_forces_experiments(
         config_path = os.path.join(experiment_dir, "config.json")
         with open(config_path, "w") as f:
             json.dump(convert_numpy_types(asdict(ctx)), f, indent=2)
+        record_rendered(experiment_dir, "magnets.geo", "magnets.pro")
+        experiment_dirs.append(Path(experiment_dir))
 
+    return experiment_dirs
 
-def create_contexts_from_arrays(
+
+def iter_contexts_from_arrays(
     param_arrays: Dict[str, Sequence],
-) -> Sequence[MagneticForcesContext]:
+) -> Iterator[MagneticForcesContext]:
     """
-    Helper function to create MagneticForcesContext objects from parameter arrays.
+    Lazily create MagneticForcesContext objects from parameter arrays.
+
+    The arrays are validated right away; contexts are only created as the
+    returned iterator is consumed, so memory use does not grow with the
+    number of samples.
 
     Args:
         param_arrays: Dictionary mapping parameter names to sequences of values.
                      Keys should match MagneticForcesContext field names.
 
     Returns:
-        Sequence of MagneticForcesContext objects
+        Iterator over MagneticForcesContext objects
     """
     # Get the field names from the dataclass
     field_names = [field.name for field in fields(MagneticForcesContext)]
@@ -117,10 +130,25 @@ def create_contexts_from_arrays(
         raise ValueError("All parameter arrays must have the same length!")
 
     n = lengths[0]
-    contexts = []
+    return (
+        MagneticForcesContext(
+            **{field_name: param_arrays[field_name][i] for field_name in field_names}
+        )
+        for i in range(n)
+    )
+
+
+def create_contexts_from_arrays(
+    param_arrays: Dict[str, Sequence],
+) -> Sequence[MagneticForcesContext]:
+    """
+    Helper function to create MagneticForcesContext objects from parameter arrays.
 
-    for i in range(n):
-        kwargs = {field_name: param_arrays[field_name][i] for field_name in field_names}
-        contexts.append(MagneticForcesContext(**kwargs))
+    Args:
+        param_arrays: Dictionary mapping parameter names to sequences of values.
+                     Keys should match MagneticForcesContext field names.
 
-    return contexts
+    Returns:
+        Sequence of MagneticForcesContext objects
+    """
+    return list(iter_contexts_from_arrays(param_arrays))
@@ -0,0 +1,140 @@
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .mesh_cache import geo_dependencies, hash_files
+
+MANIFEST_NAME = "manifest.json"
+
+# Pipeline stages of a sample, in order. Completing a stage invalidates all
+# stages after it.
+STAGES = ("rendered", "meshed", "solved", "post_processed", "converted")
+
+
+def rendered_inputs(exp_dir: Path, geo_name: str, pro_name: str) -> List[Path]:
+    """Files written when a sample is rendered: config, .geo, .pro and their includes."""
+    exp_dir = Path(exp_dir)
+    geo_file = exp_dir / geo_name
+    pro_file = exp_dir / pro_name
+    return (
+        [exp_dir / "config.json", geo_file]
+        + geo_dependencies(geo_file)
+        + [pro_file]
+        + geo_dependencies(pro_file)
+    )
+
+
+def chain_hash(*parts: Any) -> str:
+    """Hash of JSON-serializable values, used to chain stage input hashes."""
+    return hash_files([], {"chain": list(parts)})
+
+
+class SampleManifest:
+    """
+    Record of the completed pipeline stages of one experiment directory.
+
+    Each stage entry stores its status, the hash of its inputs and the names
+    of the files it produced. A stage counts as done only if it completed
+    with the same input hash and all of its outputs still exist, so a rerun
+    skips completed work and redoes stale or failed stages. The manifest is
+    rewritten atomically after every change, so a killed run leaves it
+    consistent.
+    """
+
+    def __init__(self, exp_dir: str | Path):
+        self.exp_dir = Path(exp_dir)
+        self.path = self.exp_dir / MANIFEST_NAME
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        try:
+            with open(self.path, "r") as f:
+                self.stages = json.load(f).get("stages", {})
+        except (OSError, json.JSONDecodeError, AttributeError):
+            self.stages = {}
+
+    def is_done(self, stage: str, input_hash: str) -> bool:
+        """Check whether stage completed for input_hash and its outputs exist."""
+        entry = self.stages.get(stage)
+        if not entry or entry.get("status") != "done":
+            return False
+        if entry.get("input_hash") != input_hash:
+            return False
+        return all((self.exp_dir / name).exists() for name in entry.get("outputs", []))
+
+    def complete(
+        self,
+        stage: str,
+        input_hash: str,
+        outputs: List[str | Path] = (),
+        invalidate_later: bool = True,
+        details: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Mark stage as done.
+
+        Args:
+            stage: One of STAGES
+            input_hash: Hash of everything the stage depends on
+            outputs: Files produced by the stage
+            invalidate_later: Drop the entries of all later stages, because
+                they were produced from the previous outputs of this stage
+            details: Additional JSON-serializable information to record
+        """
+        if invalidate_later:
+            self._invalidate_after(stage)
+        self.stages[stage] = {
+            "status": "done",
+            "input_hash": input_hash,
+            "outputs": [Path(p).name for p in outputs],
+            "completed_at": time.time(),
+            **(details or {}),
+        }
+        self.save()
+
+    def fail(self, stage: str, input_hash: str, error: str):
+        """Mark stage as failed and invalidate all later stages."""
+        self._invalidate_after(stage)
+        self.stages[stage] = {
+            "status": "failed",
+            "input_hash": input_hash,
+            "error": error,
+            "completed_at": time.time(),
+        }
+        self.save()
+
+    def _invalidate_after(self, stage: str):
+        for later in STAGES[STAGES.index(stage) + 1 :]:
+            self.stages.pop(later, None)
+
+    def save(self):
+        fd, tmp_name = tempfile.mkstemp(dir=self.exp_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"stages": self.stages}, f, indent=2)
+            os.replace(tmp_name, self.path)
+        finally:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+
+
+def snapshot_files(exp_dir: Path) -> Dict[str, int]:
+    """Modification times of the files in exp_dir, to detect stage outputs."""
+    return {
+        entry.name: entry.stat().st_mtime_ns
+        for entry in os.scandir(exp_dir)
+        if entry.is_file() and entry.name != MANIFEST_NAME
+    }
+
+
+def changed_files(exp_dir: Path, before: Dict[str, int]) -> List[str]:
+    """Files in exp_dir that are new or modified since snapshot_files()."""
+    after = snapshot_files(exp_dir)
+    return sorted(name for name, mtime in after.items() if before.get(name) != mtime)
+
+
+def record_rendered(exp_dir: str | Path, geo_name: str, pro_name: str):
+    """Mark a freshly rendered experiment directory in its manifest."""
+    inputs = rendered_inputs(Path(exp_dir), geo_name, pro_name)
+    SampleManifest(exp_dir).complete("rendered", hash_files(inputs), inputs)
@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+INCLUDE_PATTERN = re.compile(r'^\s*Include\s+"([^"]+)"', re.MULTILINE)
+
+
+def geo_dependencies(geo_file: Path) -> List[Path]:
+    """
+    Find the files pulled in by Include statements, recursively.
+
+    Args:
+        geo_file: Path to the .geo file
+
+    Returns:
+        List of included files that exist, in the order they are first seen
+    """
+    seen = []
+    pending = [Path(geo_file)]
+    while pending:
+        current = pending.pop(0)
+        try:
+            text = current.read_text(errors="replace")
+        except OSError:
+            continue
+        for name in INCLUDE_PATTERN.findall(text):
+            included = current.parent / name
+            if included.exists() and included not in seen:
+                seen.append(included)
+                pending.append(included)
+    return seen
+
+
+def hash_files(paths: List[Path], extra: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Hash the names and contents of files, plus optional JSON-serializable data.
+
+    Args:
+        paths: Files to hash, in a fixed order
+        extra: Additional values (e.g. options) that affect the result
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(Path(path).name.encode())
+        digest.update(b"\0")
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        digest.update(b"\0")
+    if extra:
+        digest.update(json.dumps(extra, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def mesh_cache_key(geo_file: Path, options: Optional[Dict[str, Any]] = None) -> str:
+    """Key for a mesh: the rendered .geo, its includes and the mesh options."""
+    geo_file = Path(geo_file)
+    return hash_files([geo_file] + geo_dependencies(geo_file), options)
+
+
+class MeshCache:
+    """
+    Content-addressed store of generated .msh files with LRU eviction.
+
+    Entries are named by mesh_cache_key(). A hit hard-links (or copies, when
+    linking is not possible) the cached mesh into the experiment directory.
+    The modification time of an entry is refreshed on every hit, and the
+    least recently used entries are removed once the cache grows beyond
+    max_bytes. All writes go through a temporary file and os.replace, so
+    several worker processes can share one cache directory.
+    """
+
+    def __init__(self, cache_dir: str | Path, max_bytes: int = 10 * 1024**3):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.msh"
+
+    def fetch(self, key: str, dest: Path) -> bool:
+        """
+        Place the cached mesh for key at dest.
+
+        Returns:
+            bool: True on a cache hit, False otherwise
+        """
+        cached = self.path_for(key)
+        try:
+            os.utime(cached)
+        except FileNotFoundError:
+            return False
+
+        dest = Path(dest)
+        dest.unlink(missing_ok=True)
+        try:
+            os.link(cached, dest)
+        except FileNotFoundError:
+            # Evicted by another process in the meantime
+            return False
+        except OSError:
+            shutil.copyfile(cached, dest)
+        return True
+
+    def store(self, key: str, msh_file: Path):
+        """Add a generated mesh to the cache and evict old entries if needed."""
+        fd, tmp_name = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            shutil.copyfile(msh_file, tmp_name)
+            os.replace(tmp_name, self.path_for(key))
+        finally:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        for path in self.cache_dir.glob("*.msh"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
@@ -0,0 +1,343 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+METRICS_NAME = "metrics.jsonl"
+SUMMARY_NAME = "metrics_summary.json"
+
+# Percentiles reported per stage and metric by summarize()
+PERCENTILES = (50, 90, 99)
+
+# Metrics of a stage that summarize() aggregates
+SUMMARY_METRICS = (
+    "wall_seconds",
+    "cpu_seconds",
+    "child_peak_rss_bytes",
+    "process_peak_rss_bytes",
+    "nodes",
+    "elements",
+    "output_bytes",
+)
+
+
+# Longest pause between two samples of a child's peak RSS
+POLL_INTERVAL = 0.05
+
+
+def _rss_bytes(ru_maxrss: int) -> int:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return ru_maxrss if sys.platform == "darwin" else ru_maxrss * 1024
+
+
+def _vm_hwm_bytes(pid: int) -> int:
+    """Peak RSS of a running process from /proc (Linux), or 0 if unavailable."""
+    try:
+        with open(f"/proc/{pid}/status", "rb") as f:
+            for line in f:
+                if line.startswith(b"VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+
+def _wait_with_peak_rss(pid: int, deadline: Optional[float] = None):
+    """
+    Wait for a child with os.wait4 and sample its peak RSS meanwhile.
+
+    The ru_maxrss that wait4 reports for a child started from this process
+    includes the memory of this process at the time of the fork, so on Linux
+    the peak is instead sampled from /proc while the child runs, at
+    increasing intervals of up to POLL_INTERVAL.
+
+    Args:
+        pid: Process id of the child
+        deadline: time.perf_counter() value after which waiting stops
+
+    Returns:
+        (status, rusage, peak RSS in bytes or None if the child exited
+        before it could be sampled), or None if the deadline passed first
+    """
+    peak = 0
+    delay = 0.001
+    while True:
+        finished, status, usage = os.wait4(pid, os.WNOHANG)
+        if finished:
+            if not os.path.isdir("/proc"):
+                peak = _rss_bytes(usage.ru_maxrss)
+            return status, usage, peak or None
+        if deadline is not None and time.perf_counter() >= deadline:
+            return None
+        peak = max(peak, _vm_hwm_bytes(pid))
+        time.sleep(delay)
+        delay = min(2 * delay, POLL_INTERVAL)
+
+
+class ResourceMonitor:
+    """
+    Collects the resource usage of the work a GetDPCLI does.
+
+    Child processes (getdp) are started through run(), which reaps them with
+    os.wait4 to get their CPU time and samples their peak RSS. Work done inside the Python
+    process (gmsh meshing and conversion) is wrapped in in_process(); its
+    peak RSS is the high-water mark of the whole process, which includes
+    everything that ran in it before. Records accumulate until drain().
+    """
+
+    def __init__(self):
+        self.records: List[Dict[str, Any]] = []
+
+    def run(
+        self,
+        command: Sequence[str],
+        cwd: Optional[Path] = None,
+        timeout: Optional[float] = None,
+        memory_limit: Optional[int] = None,
+    ):
+        """
+        Run a command like subprocess.run(command, cwd=cwd, check=True) and
+        record its wall time, CPU time and peak RSS.
+
+        Args:
+            command: Program and arguments
+            cwd: Working directory of the child
+            timeout: Seconds after which the child is killed
+            memory_limit: Address space limit of the child in bytes
+                (RLIMIT_AS); allocations beyond it fail in the child
+
+        Raises:
+            subprocess.CalledProcessError: If the command exits with an error
+            subprocess.TimeoutExpired: If the command ran longer than timeout
+        """
+        command = [str(part) for part in command]
+        preexec_fn = None
+        if memory_limit is not None and resource is not None:
+
+            def preexec_fn():
+                resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+        started = time.perf_counter()
+        deadline = started + timeout if timeout is not None else None
+        process = subprocess.Popen(command, cwd=cwd, preexec_fn=preexec_fn)
+        record = {"kind": "child", "program": Path(command[0]).name}
+        try:
+            if hasattr(os, "wait4"):
+                waited = _wait_with_peak_rss(process.pid, deadline)
+                if waited is None:
+                    process.kill()
+                    waited = _wait_with_peak_rss(process.pid)
+                    record["timed_out"] = True
+                status, usage, peak = waited
+                process.returncode = os.waitstatus_to_exitcode(status)
+                record["cpu_seconds"] = usage.ru_utime + usage.ru_stime
+                if peak is not None:
+                    record["peak_rss_bytes"] = peak
+            else:
+                try:
+                    process.wait(timeout)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.wait()
+                    record["timed_out"] = True
+        except BaseException:
+            process.kill()
+            process.wait()
+            raise
+        record["wall_seconds"] = time.perf_counter() - started
+        record["returncode"] = process.returncode
+        self.records.append(record)
+
+        if record.get("timed_out"):
+            raise subprocess.TimeoutExpired(command, timeout)
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, command)
+
+    @contextmanager
+    def in_process(self, operation: str) -> Iterator[Dict[str, Any]]:
+        """
+        Measure work done in this process. The yielded record can be given
+        further entries (e.g. mesh sizes); it is kept even if the work fails.
+        """
+        record: Dict[str, Any] = {"kind": "in_process", "operation": operation}
+        started = time.perf_counter()
+        cpu_started = time.process_time()
+        try:
+            yield record
+        finally:
+            record["wall_seconds"] = time.perf_counter() - started
+            record["cpu_seconds"] = time.process_time() - cpu_started
+            if resource is not None:
+                record["peak_rss_bytes"] = _rss_bytes(
+                    resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                )
+            self.records.append(record)
+
+    def drain(self) -> List[Dict[str, Any]]:
+        """Return and forget the records collected so far."""
+        records, self.records = self.records, []
+        return records
+
+
+def stage_metrics(
+    usage: List[Dict[str, Any]], wall_seconds: float, outputs: Sequence[Path]
+) -> Dict[str, Any]:
+    """
+    Combine the usage records of one stage into its metrics.
+
+    Args:
+        usage: Records drained from a ResourceMonitor
+        wall_seconds: Wall time of the whole stage
+        outputs: Files the stage produced
+
+    Returns:
+        dict: wall_seconds, cpu_seconds (children plus in-process work),
+            child_peak_rss_bytes and process_peak_rss_bytes (None if nothing
+            of that kind ran), nodes and elements (if a mesh was generated),
+            output_bytes and the number of calls
+    """
+    children = [r for r in usage if r["kind"] == "child"]
+    in_process = [r for r in usage if r["kind"] == "in_process"]
+
+    def peak(records: List[Dict[str, Any]]) -> Optional[int]:
+        values = [r["peak_rss_bytes"] for r in records if "peak_rss_bytes" in r]
+        return max(values) if values else None
+
+    metrics = {
+        "wall_seconds": wall_seconds,
+        "cpu_seconds": sum(r.get("cpu_seconds", 0.0) for r in usage),
+        "child_peak_rss_bytes": peak(children),
+        "process_peak_rss_bytes": peak(in_process),
+        "output_bytes": sum(
+            Path(p).stat().st_size for p in outputs if Path(p).exists()
+        ),
+        "calls": len(usage),
+    }
+    for key in ("nodes", "elements"):
+        counts = [r[key] for r in usage if key in r]
+        if counts:
+            metrics[key] = sum(counts)
+    return metrics
+
+
+class MetricsWriter:
+    """
+    Append the stage metrics of processed samples to a JSON lines file.
+
+    Every line is one stage of one sample: {"sample", "experiment_type",
+    "status", "stage", <metrics>}. The values of the samples added through
+    this writer are also kept in memory, per stage and metric, for
+    summarize().
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(self.path, "a")
+        self.values: Dict[str, Dict[str, List[float]]] = {}
+
+    def add(self, result: Dict[str, Any]):
+        """Write the "metrics" of a result record of process_sample."""
+        for stage, metrics in result.get("metrics", {}).items():
+            line = {
+                "sample": result["sample"],
+                "experiment_type": result.get("experiment_type"),
+                "status": result["status"],
+                "stage": stage,
+                **metrics,
+            }
+            self.file.write(json.dumps(line) + "\n")
+            stage_values = self.values.setdefault(stage, {})
+            for key in SUMMARY_METRICS:
+                if metrics.get(key) is not None:
+                    stage_values.setdefault(key, []).append(metrics[key])
+        self.file.flush()
+
+    def summarize(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Percentiles of the metrics added so far (see summarize)."""
+        return summarize(self.values)
+
+    def report(self) -> str:
+        """
+        Write the summary of the metrics added so far to metrics_summary.json
+        next to the metrics file and return it as a table.
+        """
+        summary = self.summarize()
+        with open(self.path.with_name(SUMMARY_NAME), "w") as f:
+            json.dump(summary, f, indent=2)
+        return format_summary(summary)
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_metrics(path: str | Path) -> Dict[str, Dict[str, List[float]]]:
+    """Read a metrics file into stage -> metric -> values, for summarize()."""
+    values: Dict[str, Dict[str, List[float]]] = {}
+    with open(path, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            stage_values = values.setdefault(record["stage"], {})
+            for key in SUMMARY_METRICS:
+                if record.get(key) is not None:
+                    stage_values.setdefault(key, []).append(record[key])
+    return values
+
+
+def summarize(
+    values: Dict[str, Dict[str, List[float]]],
+) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """
+    Aggregate stage metrics.
+
+    Args:
+        values: Stage -> metric -> values, as kept by MetricsWriter or read
+            by read_metrics
+
+    Returns:
+        dict: Stage -> metric -> {"count", "total", "p50", "p90", "p99", "max"}
+    """
+    summary = {}
+    for stage, metrics in values.items():
+        summary[stage] = {}
+        for key, samples in metrics.items():
+            data = np.asarray(samples, dtype=np.float64)
+            summary[stage][key] = {
+                "count": int(len(data)),
+                "total": float(data.sum()),
+                **{f"p{q}": float(np.percentile(data, q)) for q in PERCENTILES},
+                "max": float(data.max()),
+            }
+    return summary
+
+
+def format_summary(summary: Dict[str, Dict[str, Dict[str, float]]]) -> str:
+    """Render a summary as a table with one row per stage and metric."""
+    columns = ["count", "total"] + [f"p{q}" for q in PERCENTILES] + ["max"]
+    lines = [f"{'stage':<16}{'metric':<24}" + "".join(f"{c:>12}" for c in columns)]
+    for stage, metrics in summary.items():
+        for key in SUMMARY_METRICS:
+            if key not in metrics:
+                continue
+            cells = "".join(f"{metrics[key][c]:>12.4g}" for c in columns)
+            lines.append(f"{stage:<16}{key:<24}{cells}")
+    return "\n".join(lines)
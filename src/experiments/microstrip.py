@@ -4,9 +4,10 @@ import uuid
 import json
 from jinja2 import Environment, FileSystemLoader
 from dataclasses import dataclass, asdict, fields
-from typing import Sequence, Optional, Dict, Any
+from typing import Sequence, Optional, Dict, Any, Iterable, Iterator, List
 import numpy as np
 from src.config.path import resolve_path
+from src.experiments.manifest import record_rendered
 
 TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "..", "templates")
 OUT_DIR = os.path.join(os.path.dirname(__file__), "..", "out")
@@ -40,12 +41,15 @@ class MicrostripContext:
 
 
 def run_microstrip_experiments(
-    contexts: Sequence[MicrostripContext],
+    contexts: Iterable[MicrostripContext],
     out_dir: Optional[str] = None,
     template_dir: Optional[Path] = None,
-):
+) -> List[Path]:
     """
     Runs microstrip experiments for each MicrostripContext provided.
+
+    Returns:
+        List of the created experiment directories
     """
     resolved_out_dir = (
         resolve_path(out_dir) if out_dir is not None else resolve_path(OUT_DIR)
@@ -61,6 +65,7 @@ def run_microstrip_experiments(
         variable_end_string="]]",
     )
 
+    experiment_dirs = []
     for ctx in contexts:
         experiment_id = str(uuid.uuid4())
         experiment_dir = os.path.join(resolved_out_dir, experiment_id)
@@ -77,20 +82,28 @@ def run_microstrip_experiments(
         config_path = os.path.join(experiment_dir, "config.json")
         with open(config_path, "w") as f:
             json.dump(convert_numpy_types(asdict(ctx)), f, indent=2)
+        record_rendered(experiment_dir, "microstrip.geo", "microstrip.pro")
+        experiment_dirs.append(Path(experiment_dir))
 
+    return experiment_dirs
 
-def create_contexts_from_arrays(
+
+def iter_contexts_from_arrays(
     param_arrays: Dict[str, Sequence[float]],
-) -> Sequence[MicrostripContext]:
+) -> Iterator[MicrostripContext]:
     """
-    Helper function to create MicrostripContext objects from parameter arrays.
+    Lazily create MicrostripContext objects from parameter arrays.
+
+    The arrays are validated right away; contexts are only created as the
+    returned iterator is consumed, so memory use does not grow with the
+    number of samples.
 
     Args:
         param_arrays: Dictionary mapping parameter names to sequences of values.
                      Keys should match MicrostripContext field names.
 
     Returns:
-        Sequence of MicrostripContext objects
+        Iterator over MicrostripContext objects
     """
     # Get the field names from the dataclass
     field_names = [field.name for field in fields(MicrostripContext)]
@@ -106,10 +119,25 @@ def create_contexts_from_arrays(
         raise ValueError("All parameter arrays must have the same length!")
 
     n = lengths[0]
-    contexts = []
+    return (
+        MicrostripContext(
+            **{field_name: param_arrays[field_name][i] for field_name in field_names}
+        )
+        for i in range(n)
+    )
+
+
+def create_contexts_from_arrays(
+    param_arrays: Dict[str, Sequence[float]],
+) -> Sequence[MicrostripContext]:
+    """
+    Helper function to create MicrostripContext objects from parameter arrays.
 
-    for i in range(n):
-        kwargs = {field_name: param_arrays[field_name][i] for field_name in field_names}
-        contexts.append(MicrostripContext(**kwargs))
+    Args:
+        param_arrays: Dictionary mapping parameter names to sequences of values.
+                     Keys should match MicrostripContext field names.
 
-    return contexts
+    Returns:
+        Sequence of MicrostripContext objects
+    """
+    return list(iter_contexts_from_arrays(param_arrays))
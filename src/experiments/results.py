@@ -0,0 +1,317 @@
+from collections import OrderedDict
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pyvista as pv
+
+from ..getdp.getdp import GetDPReader
+from .campaign_index import INDEX_NAME, CampaignIndex
+
+# Default memory budget of the meshes and arrays a CampaignResults keeps
+DEFAULT_CACHE_BYTES = 512 * 2**20
+
+# Point data of a solution mesh holding the solution itself (real, imag and
+# magnitude, with a block suffix for several DofData blocks)
+SOLUTION_PREFIX = "solution_"
+
+# CampaignResults shared by the callers of shared_results, per output directory
+_shared: Dict[Path, "CampaignResults"] = {}
+
+
+def solution_files(exp_dir: str | Path) -> List[Path]:
+    """
+    The .res files of the GetDP solutions of a sample: those written next to
+    a .pre file and a mesh of the same name (e.g. microstrip.msh, .pre and
+    .res). Post-operation outputs such as mStrip_v.res are not solutions.
+    """
+    return [
+        pre_file.with_suffix(".res")
+        for pre_file in sorted(Path(exp_dir).glob("*.pre"))
+        if pre_file.with_suffix(".res").exists()
+        and pre_file.with_suffix(".msh").exists()
+    ]
+
+
+def read_solution(res_file: str | Path) -> pv.UnstructuredGrid:
+    """
+    The mesh of a GetDP solution with the solution as point data (see
+    GetDPReader.create_pyvista_mesh), read from res_file and the .pre and
+    .msh files next to it.
+    """
+    res_file = Path(res_file)
+    reader = GetDPReader()
+    reader.read_msh_file(res_file.with_suffix(".msh"))
+    reader.read_pre_file(res_file.with_suffix(".pre"))
+    reader.read_res_file(res_file)
+    return reader.create_pyvista_mesh()
+
+
+def sample_meshes(exp_dir: str | Path) -> Iterator[Tuple[str, pv.DataSet, List[str]]]:
+    """
+    Yield the result meshes of a sample as (file stem, mesh, field names):
+    its solutions (see solution_files) with their solution arrays or, if it
+    has none, its VTK files with all their point data.
+    """
+    res_files = solution_files(exp_dir)
+    if res_files:
+        for res_file in res_files:
+            mesh = read_solution(res_file)
+            names = [n for n in mesh.point_data.keys() if n.startswith(SOLUTION_PREFIX)]
+            yield res_file.stem, mesh, names
+        return
+    for vtk_file in sorted(Path(exp_dir).glob("*.vtk")):
+        mesh = pv.read(str(vtk_file))
+        yield vtk_file.stem, mesh, list(mesh.point_data.keys())
+
+
+def _is_solution(path: Path) -> bool:
+    return path.suffix == ".res" and path.with_suffix(".pre").exists()
+
+
+def _nbytes(value: Any) -> int:
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    # actual_memory_size is in kibibytes
+    return int(value.actual_memory_size) * 1024
+
+
+class LRUCache:
+    """
+    Least-recently-used cache bounded by the memory of its values.
+
+    Values are numpy arrays or pyvista datasets. When adding a value would
+    exceed max_bytes, the least recently used values are dropped; a value
+    larger than max_bytes on its own is not cached at all.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: Hashable, value: Any):
+        self.discard(key)
+        size = _nbytes(value)
+        if size > self.max_bytes:
+            return
+        while self._entries and self.nbytes + size > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.nbytes -= evicted
+        self._entries[key] = (value, size)
+        self.nbytes += size
+
+    def discard(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.nbytes -= entry[1]
+
+    def clear(self):
+        self._entries.clear()
+        self.nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CampaignResults:
+    """
+    Lazy access to the results of the samples in an output directory.
+
+    The results of a sample are its GetDP solutions, served by their .res
+    file name (e.g. "microstrip.res", read with GetDPReader from the .msh,
+    .pre and .res files), and its VTK files converted from .pos outputs.
+
+    Samples are listed from the campaign index (or the directory names if
+    there is none) without opening any result file. A mesh is read on first
+    access to it; reading a single array keeps only that array. Both are
+    kept in a memory-bounded LRUCache, keyed by file paths and modification
+    times, so results rewritten by a later run are read again.
+
+    Example:
+        results = CampaignResults("out", cache_bytes=256 * 2**20)
+        for sample in results.samples(status="ok"):
+            values = results.array(sample, "microstrip.res", "solution_magnitude")
+    """
+
+    def __init__(
+        self, out_dir: str | Path = "out", cache_bytes: int = DEFAULT_CACHE_BYTES
+    ):
+        self.out_dir = Path(out_dir)
+        self.cache = LRUCache(cache_bytes)
+        # Only read, so browsing never writes to a running campaign's index
+        self.index = (
+            CampaignIndex(self.out_dir / INDEX_NAME, read_only=True)
+            if (self.out_dir / INDEX_NAME).exists()
+            else None
+        )
+
+    def samples(
+        self, experiment_type: Optional[str] = None, status: Optional[str] = None
+    ) -> List[str]:
+        """
+        Names of the samples, optionally of one experiment type and status.
+        Both filters need the campaign index.
+        """
+        if self.index is not None:
+            return self.index.samples(experiment_type, status)
+        if experiment_type is not None or status is not None:
+            raise ValueError(f"Filtering samples needs {self.out_dir / INDEX_NAME}")
+        return sorted(d.name for d in self.out_dir.iterdir() if d.is_dir())
+
+    def exp_dir(self, sample: str) -> Path:
+        """Directory of a sample."""
+        if self.index is not None:
+            exp_dir = self.index.exp_dir(sample)
+            if exp_dir is not None:
+                return exp_dir
+        return self.out_dir / sample
+
+    def files(self, sample: str) -> List[Path]:
+        """
+        Result files of a sample: its solutions (see solution_files), then
+        the converted VTK outputs recorded in the index, or the VTK files in
+        its directory if the index records none (e.g. samples derived by
+        linear superposition, which have no stages).
+        """
+        exp_dir = self.exp_dir(sample)
+        if self.index is not None:
+            files = self.index.artifacts(sample, stage="converted", suffix=".vtk")
+            if files:
+                return solution_files(exp_dir) + files
+        return solution_files(exp_dir) + sorted(exp_dir.glob("*.vtk"))
+
+    def _path(self, sample: str, file_name: str) -> Path:
+        return self.exp_dir(sample) / file_name
+
+    @staticmethod
+    def _key(path: Path, *parts: str) -> tuple:
+        # A solution is also read from the .pre and .msh files next to it
+        sources = (
+            [path, path.with_suffix(".pre"), path.with_suffix(".msh")]
+            if _is_solution(path)
+            else [path]
+        )
+        return (str(path),) + tuple(p.stat().st_mtime_ns for p in sources) + parts
+
+    @staticmethod
+    def _read(path: Path) -> pv.DataSet:
+        return read_solution(path) if _is_solution(path) else pv.read(str(path))
+
+    def mesh(self, sample: str, file_name: str) -> pv.DataSet:
+        """
+        The mesh of one result file of a sample, e.g. "microstrip.res".
+
+        Raises:
+            FileNotFoundError: If the sample has no such file
+        """
+        path = self._path(sample, file_name)
+        key = self._key(path)
+        mesh = self.cache.get(key)
+        if mesh is None:
+            mesh = self._read(path)
+            self.cache.put(key, mesh)
+        return mesh
+
+    def array(self, sample: str, file_name: str, name: str) -> np.ndarray:
+        """
+        One point or cell data array of a result file of a sample.
+
+        If the mesh is not cached, the file is read and only the array is
+        kept.
+
+        Raises:
+            FileNotFoundError: If the sample has no such file
+            KeyError: If the file has no such array
+        """
+        path = self._path(sample, file_name)
+        mesh = self.cache.get(self._key(path))
+        if mesh is not None:
+            return np.asarray(mesh[name])
+        key = self._key(path, name)
+        values = self.cache.get(key)
+        if values is None:
+            values = np.array(self._read(path)[name])
+            self.cache.put(key, values)
+        return values
+
+    def array_names(self, sample: str, file_name: str) -> List[str]:
+        """Names of the point and cell data arrays of a result file of a sample."""
+        return list(self.mesh(sample, file_name).array_names)
+
+    def meshes(self, sample: str) -> "SampleResults":
+        """Lazy mapping of a sample's result file names to their meshes."""
+        return SampleResults(self, sample)
+
+    def __getitem__(self, sample: str) -> "SampleResults":
+        return self.meshes(sample)
+
+    def close(self):
+        self.cache.clear()
+        if self.index is not None:
+            self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class SampleResults(Mapping):
+    """
+    The results of one sample as a read-only mapping of file names to
+    meshes. Listing the files reads none of them; each mesh is read on
+    access through the CampaignResults cache.
+    """
+
+    def __init__(self, results: CampaignResults, sample: str):
+        self.results = results
+        self.sample = sample
+        self._names: Optional[List[str]] = None
+
+    def _files(self) -> List[str]:
+        if self._names is None:
+            self._names = [path.name for path in self.results.files(self.sample)]
+        return self._names
+
+    def __getitem__(self, file_name: str) -> pv.DataSet:
+        if file_name not in self._files():
+            raise KeyError(file_name)
+        return self.results.mesh(self.sample, file_name)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._files())
+
+    def __len__(self) -> int:
+        return len(self._files())
+
+    def array(self, file_name: str, name: str) -> np.ndarray:
+        """One data array of one of the sample's result files."""
+        return self.results.array(self.sample, file_name, name)
+
+    def __repr__(self) -> str:
+        return f"SampleResults({self.sample!r}, files={self._files()})"
+
+
+def shared_results(out_dir: str | Path = "out") -> CampaignResults:
+    """
+    The CampaignResults of an output directory shared within this process,
+    so that repeated lookups reuse one index connection and one cache.
+    """
+    key = Path(out_dir).resolve()
+    results = _shared.get(key)
+    if results is None or (results.index is None and (key / INDEX_NAME).exists()):
+        # The index may have been written since the results were opened
+        if results is not None:
+            results.close()
+        results = _shared[key] = CampaignResults(key)
+    return results
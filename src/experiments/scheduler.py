@@ -0,0 +1,219 @@
+import heapq
+import json
+import math
+import time
+from itertools import count
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .campaign_index import CampaignIndex
+
+QUARANTINE_NAME = "quarantine.json"
+
+# Samples of an experiment type needed before its costs are fitted
+MIN_HISTORY = 8
+
+# Ridge penalty of the cost fit, relative to the number of samples
+RIDGE = 1e-2
+
+# Most recent samples the mesh size of a new sample is estimated from
+NEIGHBOUR_ROWS = 4096
+
+# Relative cost of a sample before enough history of its type exists. Types
+# that are not listed all cost the same.
+COST_PRIORS: Dict[str, Callable[[Dict[str, Any]], float]] = {
+    # Every magnet adds regions to mesh and solve; the infinite box adds a
+    # shell transformation around the whole domain
+    "magnetic_forces": lambda params: max(float(params.get("num_magnets", 1)), 1.0)
+    * (2.0 if params.get("infinite_box") else 1.0),
+}
+
+
+def _numeric(params: Dict[str, Any]) -> Dict[str, float]:
+    return {
+        name: float(value)
+        for name, value in params.items()
+        if isinstance(value, (bool, int, float)) and math.isfinite(value)
+    }
+
+
+class CostModel:
+    """
+    Predicts how long a sample takes from its parameters.
+
+    Per experiment type, the log of the recorded run time is fitted with a
+    ridge regression on the numeric parameters and, where the history has
+    node counts, the log of the mesh size. A new sample's mesh size is taken
+    from the most similar recorded sample. Until MIN_HISTORY samples of a
+    type are recorded, COST_PRIORS is used instead.
+
+    History comes from the campaign index and from the samples added while
+    a campaign runs, so predictions improve as it goes.
+    """
+
+    def __init__(self, index: Optional[CampaignIndex] = None):
+        self.index = index
+        self.history: Dict[str, List[Dict[str, Any]]] = {}
+        self._fits: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._fitted_rows: Dict[str, int] = {}
+
+    def _history(self, experiment_type: str) -> List[Dict[str, Any]]:
+        if experiment_type not in self.history:
+            self.history[experiment_type] = (
+                self.index.cost_history(experiment_type)
+                if self.index is not None and experiment_type is not None
+                else []
+            )
+        return self.history[experiment_type]
+
+    def add(
+        self,
+        experiment_type: str,
+        params: Dict[str, Any],
+        seconds: float,
+        nodes: Optional[int] = None,
+    ):
+        """Record the run time of a finished sample."""
+        self._history(experiment_type).append(
+            {"params": params, "seconds": seconds, "nodes": nodes}
+        )
+
+    def _fit(self, experiment_type: str) -> Optional[Dict[str, Any]]:
+        rows = self._history(experiment_type)
+        # Refit once the history has grown by a tenth
+        fitted = self._fitted_rows.get(experiment_type)
+        if fitted is not None and len(rows) < max(fitted + 1, 1.1 * fitted):
+            return self._fits[experiment_type]
+        self._fitted_rows[experiment_type] = len(rows)
+
+        rows = [row for row in rows if row["seconds"] and row["seconds"] > 0]
+        if len(rows) < MIN_HISTORY:
+            self._fits[experiment_type] = None
+            return None
+
+        params = [_numeric(row["params"]) for row in rows]
+        names = sorted(set.intersection(*(set(p) for p in params)))
+        X = np.array([[p[name] for name in names] for p in params]).reshape(
+            len(rows), len(names)
+        )
+        use_nodes = all(row["nodes"] for row in rows)
+        if use_nodes:
+            nodes = np.log([float(row["nodes"]) for row in rows])
+            X = np.hstack([X, nodes[:, None]])
+        mean = X.mean(axis=0)
+        std = X.std(axis=0)
+        std[std == 0] = 1.0
+        Z = (X - mean) / std
+        y = np.log([row["seconds"] for row in rows])
+        penalty = RIDGE * len(rows) * np.eye(Z.shape[1])
+        coef = np.linalg.solve(Z.T @ Z + penalty, Z.T @ (y - y.mean()))
+
+        fit = {
+            "names": names,
+            "mean": mean,
+            "std": std,
+            "coef": coef,
+            "intercept": y.mean(),
+            "use_nodes": use_nodes,
+        }
+        if use_nodes:
+            fit["neighbours"] = Z[-NEIGHBOUR_ROWS:, : len(names)]
+            fit["nodes"] = X[-NEIGHBOUR_ROWS:, -1]
+        self._fits[experiment_type] = fit
+        return fit
+
+    def predict(self, experiment_type: str, params: Dict[str, Any]) -> float:
+        """
+        Predicted run time of a sample in seconds, or a relative cost from
+        COST_PRIORS while there is too little history of its type.
+        """
+        fit = self._fit(experiment_type)
+        if fit is None:
+            prior = COST_PRIORS.get(experiment_type)
+            return prior(params) if prior is not None else 1.0
+
+        values = _numeric(params)
+        n = len(fit["names"])
+        x = np.array(
+            [values.get(name, fit["mean"][i]) for i, name in enumerate(fit["names"])]
+        )
+        z = (x - fit["mean"][:n]) / fit["std"][:n]
+        if fit["use_nodes"]:
+            nearest = np.argmin(((fit["neighbours"] - z) ** 2).sum(axis=1))
+            log_nodes = fit["nodes"][nearest]
+            z = np.append(z, (log_nodes - fit["mean"][n]) / fit["std"][n])
+        return float(np.exp(fit["intercept"] + z @ fit["coef"]))
+
+
+class JobQueue:
+    """
+    Dispatches jobs longest first.
+
+    Jobs (anything with experiment_type and params, e.g. SampleJob) are read
+    lazily from an iterable, keeping up to window of them buffered, and the
+    one with the highest predicted cost is dispatched next. Starting the long
+    jobs early keeps them from being the last ones running. Jobs of equal
+    cost keep their order.
+    """
+
+    def __init__(
+        self,
+        jobs: Iterable[Any],
+        cost_model: CostModel,
+        window: int,
+        on_read: Optional[Callable[[Any], None]] = None,
+    ):
+        """
+        Args:
+            jobs: Jobs to dispatch
+            cost_model: Predicts the cost of each job
+            window: Number of jobs read ahead of dispatching
+            on_read: Called with every job read from jobs
+        """
+        self.jobs = iter(jobs)
+        self.cost_model = cost_model
+        self.window = max(window, 1)
+        self.on_read = on_read
+        self._heap: List = []
+        self._order = count()
+        self._exhausted = False
+
+    def push(self, job: Any):
+        """Queue a job, e.g. one to retry."""
+        cost = self.cost_model.predict(job.experiment_type, job.params)
+        heapq.heappush(self._heap, (-cost, next(self._order), job))
+
+    def pop(self) -> Optional[Any]:
+        """The queued job with the highest cost, or None if there are none left."""
+        while not self._exhausted and len(self._heap) < self.window:
+            job = next(self.jobs, None)
+            if job is None:
+                self._exhausted = True
+                break
+            if self.on_read is not None:
+                self.on_read(job)
+            self.push(job)
+        if not self._heap:
+            return None
+        return heapq.heappop(self._heap)[2]
+
+
+def quarantine(exp_dir: Path, errors: List[str]):
+    """Record that a sample failed every attempt, so later runs skip it."""
+    with open(Path(exp_dir) / QUARANTINE_NAME, "w") as f:
+        json.dump(
+            {"attempts": len(errors), "errors": errors, "quarantined_at": time.time()},
+            f,
+            indent=2,
+        )
+
+
+def read_quarantine(exp_dir: Path) -> Optional[Dict[str, Any]]:
+    """The quarantine record of a sample, or None if it is not quarantined."""
+    try:
+        with open(Path(exp_dir) / QUARANTINE_NAME, "r") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
@@ -0,0 +1,180 @@
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ..getdp.scaling import scale_pre_file, scale_res_file
+from .fidelity import mesh_parameters
+from .getdp_cli import GetDPCLI
+from .manifest import SampleManifest, chain_hash, changed_files, snapshot_files
+from .mesh_cache import hash_files
+
+
+def load_config(exp_dir: Path) -> Optional[Dict[str, Any]]:
+    """Load the config.json of an experiment directory, or None."""
+    try:
+        with open(exp_dir / "config.json", "r") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _group_key(config: Dict[str, Any], linear: Sequence[str]) -> Tuple:
+    fixed = tuple(sorted((k, v) for k, v in config.items() if k not in linear))
+    # With several linear parameters the fields only scale together if the
+    # parameters keep their ratios
+    reference = config[linear[0]]
+    if reference == 0:
+        return fixed + tuple(config[p] for p in linear[1:])
+    return fixed + tuple(round(config[p] / reference, 12) for p in linear[1:])
+
+
+def group_linear_samples(
+    samples: Sequence[Tuple[Path, str]],
+    linear_parameters: Dict[str, Sequence[str]],
+) -> Tuple[List[Path], List[Tuple[Path, Path, float]]]:
+    """
+    Split samples into those that need a solve and those derivable by scaling.
+
+    Samples of the same experiment type and mesh parameters (fidelity) whose
+    parameters only differ in the declared linear-scale parameters form a
+    group. The member with the
+    largest linear parameter (in magnitude) is solved; all other members are
+    derived from it by scaling with the ratio of their linear parameter.
+
+    Args:
+        samples: (experiment directory, experiment type) pairs
+        linear_parameters: Experiment type -> names of parameters the solution
+            is linear in (e.g. a Dirichlet value)
+
+    Returns:
+        tuple: (directories to solve, [(directory, source directory, factor)])
+    """
+    to_solve = []
+    groups: Dict[Tuple, List[Tuple[Path, Dict[str, Any]]]] = {}
+
+    for exp_dir, exp_type in samples:
+        linear = list(linear_parameters.get(exp_type, []))
+        config = load_config(exp_dir) if linear else None
+        if config is None or not all(p in config for p in linear):
+            to_solve.append(exp_dir)
+            continue
+        mesh = tuple(sorted(mesh_parameters(exp_dir).items()))
+        key = (exp_type, mesh) + _group_key(config, linear)
+        groups.setdefault(key, []).append((exp_dir, config))
+
+    derived = []
+    for key, members in groups.items():
+        linear = list(linear_parameters[key[0]])
+        source_dir, source_config = max(
+            members, key=lambda member: abs(member[1][linear[0]])
+        )
+        reference = source_config[linear[0]]
+        to_solve.append(source_dir)
+
+        for exp_dir, config in members:
+            if exp_dir == source_dir:
+                continue
+            if reference == 0:
+                # All members have a zero source; nothing to scale from
+                to_solve.append(exp_dir)
+            else:
+                derived.append((exp_dir, source_dir, config[linear[0]] / reference))
+
+    return to_solve, derived
+
+
+def derive_scaled_experiment(
+    exp_dir: Path,
+    source_dir: Path,
+    factor: float,
+    file_config: Dict[str, str],
+    getdp: GetDPCLI,
+    post_operations: Sequence[str] = ("Map", "Cut"),
+    resume: bool = False,
+) -> Dict[str, Any]:
+    """
+    Produce the results of exp_dir by scaling the solved source_dir.
+
+    The mesh is linked from the source, the .pre/.res files are written with
+    their values scaled by factor, and the post-operations are run on the
+    scaled solution (no solve). A provenance.json records the derivation.
+
+    The manifest of exp_dir records the mesh under the source's mesh hash,
+    and the scaled solution and its post-processing under hashes chained on
+    the source's solve hash and factor, so a rerun only derives again if
+    the source was solved again or the factor changed.
+
+    Args:
+        exp_dir: Experiment directory to fill
+        source_dir: Solved experiment directory with identical geometry
+        factor: Ratio of the linear parameter of exp_dir to that of source_dir
+        file_config: {"geo": ..., "pro": ...} file names of the experiment type
+        getdp: GetDPCLI instance used for post-processing
+        post_operations: PostOperations to run on the scaled solution
+        resume: Skip the derivation if the manifest records it as done
+
+    Returns:
+        dict: Result record, as returned by process_experiment_dir, with
+            the mesh_ref of the source
+    """
+    pro_file = exp_dir / file_config["pro"]
+    mesh_name = Path(file_config["geo"]).with_suffix(".msh").name
+    stem = pro_file.stem
+
+    source = SampleManifest(source_dir).stages
+    mesh_hash = source.get("meshed", {}).get("input_hash", "")
+    source_hash = source.get("solved", {}).get("input_hash") or hash_files(
+        [source_dir / f"{stem}.pre", source_dir / f"{stem}.res"]
+    )
+    solve_hash = chain_hash(source_hash, factor)
+    post_hash = chain_hash(solve_hash, list(post_operations))
+    result = {
+        "sample": exp_dir.name,
+        "status": "ok",
+        "derived_from": source_dir.name,
+        "mesh_ref": mesh_hash,
+    }
+
+    manifest = SampleManifest(exp_dir)
+    if (
+        resume
+        and manifest.is_done("solved", solve_hash)
+        and manifest.is_done("post_processed", post_hash)
+    ):
+        print(f"Derived {exp_dir.name}: up to date")
+        return result
+
+    print(f"Deriving {exp_dir.name} from {source_dir.name} (x{factor:g})")
+
+    mesh_file = exp_dir / mesh_name
+    mesh_file.unlink(missing_ok=True)
+    try:
+        os.link(source_dir / mesh_name, mesh_file)
+    except OSError:
+        shutil.copyfile(source_dir / mesh_name, mesh_file)
+
+    if mesh_hash:
+        manifest.complete("meshed", mesh_hash, [mesh_file])
+
+    scale_pre_file(source_dir / f"{stem}.pre", exp_dir / f"{stem}.pre", factor)
+    scale_res_file(source_dir / f"{stem}.res", exp_dir / f"{stem}.res", factor)
+    manifest.complete("solved", solve_hash, [f"{stem}.pre", f"{stem}.res"])
+
+    before = snapshot_files(exp_dir)
+    getdp.run_post_vtk(pro_file, mesh_file, post_operations)
+    manifest.complete("post_processed", post_hash, changed_files(exp_dir, before))
+
+    with open(exp_dir / "provenance.json", "w") as f:
+        json.dump(
+            {
+                "method": "linear_superposition",
+                "derived_from": source_dir.name,
+                "scale_factor": factor,
+            },
+            f,
+            indent=2,
+        )
+
+    return result
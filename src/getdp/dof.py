@@ -0,0 +1,167 @@
+from itertools import islice
+from typing import IO, Optional
+
+import numpy as np
+
+from .stream import CHUNK_LINES
+
+# DOF types written by GetDP in .pre files
+DOF_UNKNOWN = 1
+DOF_FIXED_VALUE = 2
+DOF_ASSOCIATED = 3
+DOF_INITIAL_VALUE = 5
+
+DOF_TYPE_NAMES = {
+    DOF_UNKNOWN: "UNKNOWN",
+    DOF_FIXED_VALUE: "FIXED_VALUE",
+    DOF_ASSOCIATED: "ASSOCIATED_DOF",
+    DOF_INITIAL_VALUE: "INITIAL_VALUE",
+}
+
+# Columns of a DOF line used by any DOF type: 4 common ones and up to 3 more
+DOF_COLUMNS = 7
+
+# One record per DOF. Fields that do not apply to a DOF type are 0:
+# - equation_number: UNKNOWN and INITIAL_VALUE
+# - value: FIXED_VALUE, ASSOCIATED_DOF and INITIAL_VALUE
+# - time_function: FIXED_VALUE and ASSOCIATED_DOF
+# - associate_dof: ASSOCIATED_DOF
+DOF_DTYPE = np.dtype(
+    [
+        ("basis_function", np.int32),
+        ("entity", np.int64),
+        ("harmonic", np.int32),
+        ("type", np.int8),
+        ("equation_number", np.int64),
+        ("value", np.float64),
+        ("time_function", np.int32),
+        ("associate_dof", np.int64),
+    ]
+)
+
+
+def read_dof_table(
+    f: IO[str], end_marker: str, expected_rows: Optional[int] = None
+) -> np.ndarray:
+    """
+    Read the DOF lines of a $DofData block into a DOF_DTYPE structured array.
+
+    Lines are converted in chunks of CHUNK_LINES, each with one numeric pass
+    over its text (see _dof_columns), and written into an array preallocated
+    from expected_rows (the NumAnyDof count of the block header) when given.
+
+    Args:
+        f: Open text file positioned at the first DOF line
+        end_marker: Line prefix that terminates the block ("$EndDofData")
+        expected_rows: Number of DOFs, if known in advance
+
+    Returns:
+        Structured array with one record per DOF
+    """
+    table = np.zeros(expected_rows or 0, dtype=DOF_DTYPE)
+    rows = 0
+    done = False
+
+    while not done:
+        chunk = []
+        n_read = 0
+        for line in islice(f, CHUNK_LINES):
+            n_read += 1
+            if line.startswith(end_marker):
+                done = True
+                break
+            chunk.append(line)
+        if n_read < CHUNK_LINES:
+            # End marker found or end of file reached
+            done = True
+
+        if not chunk:
+            continue
+
+        text = "".join(chunk)
+        del chunk
+        columns = _dof_columns(text)
+        del text
+        if rows + len(columns) > len(table):
+            table.resize(max(2 * len(table), rows + len(columns)), refcheck=False)
+        _fill_dof_records(table[rows : rows + len(columns)], columns)
+        rows += len(columns)
+
+    if rows < len(table):
+        table.resize(rows, refcheck=False)
+    return table
+
+
+def _dof_columns(text: str) -> np.ndarray:
+    """
+    Convert DOF lines into a (lines, DOF_COLUMNS) array, short lines padded
+    with 0 and lines of fewer than 5 values (e.g. blank ones) dropped.
+
+    The numbers are parsed with a single np.fromstring call. The lines have
+    different lengths per DOF type, so the number of values on each line is
+    counted on the raw bytes to lay the values out in rows.
+    """
+    if not text.endswith("\n"):
+        text += "\n"
+
+    # Values per line; a value starts at a non-whitespace byte after whitespace
+    buffer = np.frombuffer(text.encode("ascii"), dtype=np.uint8)
+    is_space = buffer <= ord(" ")
+    starts = ~is_space
+    starts[1:] &= is_space[:-1]
+    del is_space
+    line_starts = np.flatnonzero(buffer == ord("\n"))[:-1] + 1
+    del buffer
+    counts = np.add.reduceat(starts, np.concatenate([[0], line_starts]), dtype=np.int64)
+    del starts, line_starts
+    if not counts.any():
+        return np.zeros((0, DOF_COLUMNS))
+
+    values = np.fromstring(text, dtype=np.float64, sep=" ")
+    if len(values) != counts.sum():
+        raise ValueError("Malformed DOF line in $DofData block")
+
+    columns = np.zeros((len(counts), DOF_COLUMNS))
+    width = min(int(counts.max()), DOF_COLUMNS)
+    if (counts == counts[0]).all():
+        # Every line has the same number of values
+        columns[:, :width] = values.reshape(len(counts), -1)[:, :width]
+    else:
+        offsets = np.cumsum(counts) - counts
+        for j in range(width):
+            has_column = counts > j
+            columns[has_column, j] = values[offsets[has_column] + j]
+    del values
+    return columns if (counts >= 5).all() else columns[counts >= 5]
+
+
+def _fill_dof_records(records: np.ndarray, columns: np.ndarray):
+    """Convert DOF lines (see _dof_columns) into records, by the DOF type column."""
+    dof_type = columns[:, 3].astype(np.int64)
+    records["basis_function"] = columns[:, 0]
+    records["entity"] = columns[:, 1]
+    records["harmonic"] = columns[:, 2]
+    records["type"] = dof_type
+
+    # UNKNOWN: equation-number nnz
+    # INITIAL_VALUE: equation-number value
+    has_equation = (dof_type == DOF_UNKNOWN) | (dof_type == DOF_INITIAL_VALUE)
+    records["equation_number"][has_equation] = columns[has_equation, 4]
+    is_initial = dof_type == DOF_INITIAL_VALUE
+    records["value"][is_initial] = columns[is_initial, 5]
+
+    # FIXED_VALUE: value time-function
+    is_fixed = dof_type == DOF_FIXED_VALUE
+    records["value"][is_fixed] = columns[is_fixed, 4]
+    records["time_function"][is_fixed] = columns[is_fixed, 5]
+
+    # ASSOCIATED_DOF: associate-dof value time-function
+    is_associated = dof_type == DOF_ASSOCIATED
+    records["associate_dof"][is_associated] = columns[is_associated, 4]
+    records["value"][is_associated] = columns[is_associated, 5]
+    records["time_function"][is_associated] = columns[is_associated, 6]
+
+
+def dof_type_name(dof_type: int) -> str:
+    """Get human-readable name for DOF type"""
+    return DOF_TYPE_NAMES.get(int(dof_type), f"TYPE_{dof_type}")
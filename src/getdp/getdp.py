@@ -4,6 +4,10 @@ from pathlib import Path
 from typing import Dict, List, Tuple, Optional, Union
 import re
 
+from .dof import dof_type_name, read_dof_table
+from .msh import LazyDict, MshData, read_msh
+from .stream import header_comment, read_value_block, skip_to_end
+
 
 class GetDPReader:
     """
@@ -19,6 +23,7 @@ class GetDPReader:
 
     def __init__(self):
         self.mesh_data = {}
+        self.msh: Optional[MshData] = None
         self.dof_data = {}
         self.solution_data = {}
         self.mesh = None
@@ -27,191 +32,30 @@ class GetDPReader:
         """
         Read a Gmsh .msh file and extract mesh information.
 
+        The mesh is parsed into numpy arrays (see MshData), available as
+        self.msh and mesh_data["arrays"]. The "nodes" and "elements" entries
+        are dict views that are only built when first accessed.
+
         Args:
             filepath: Path to the .msh file
 
         Returns:
             Dictionary containing nodes and elements data
         """
-        filepath = Path(filepath)
-        if not filepath.exists():
-            raise FileNotFoundError(f"MSH file not found: {filepath}")
+        msh = read_msh(filepath)
 
         mesh_data = {
-            "nodes": {},
-            "elements": {},
-            "physical_names": {},
-            "format_info": {},
+            "nodes": LazyDict(msh.nodes_dict, msh.num_nodes),
+            "elements": LazyDict(msh.elements_dict, msh.num_elements),
+            "physical_names": msh.physical_names,
+            "format_info": msh.format_info,
+            "arrays": msh,
         }
 
-        with open(filepath, "r") as f:
-            content = f.read()
-
-        # Parse mesh format
-        format_match = re.search(
-            r"\$MeshFormat\n(.*?)\n\$EndMeshFormat", content, re.DOTALL
-        )
-        if format_match:
-            format_line = format_match.group(1).strip()
-            parts = format_line.split()
-            mesh_data["format_info"] = {
-                "version": parts[0],
-                "file_type": int(parts[1]),
-                "data_size": int(parts[2]),
-            }
-
-        # Parse physical names
-        phys_match = re.search(
-            r"\$PhysicalNames\n(.*?)\n\$EndPhysicalNames", content, re.DOTALL
-        )
-        if phys_match:
-            phys_content = phys_match.group(1).strip().split("\n")
-            num_phys = int(phys_content[0])
-            for i in range(1, num_phys + 1):
-                if i < len(phys_content):
-                    parts = phys_content[i].split()
-                    dim = int(parts[0])
-                    tag = int(parts[1])
-                    name = parts[2].strip('"')
-                    mesh_data["physical_names"][tag] = {"dimension": dim, "name": name}
-
-        # Parse nodes
-        nodes_match = re.search(r"\$Nodes\n(.*?)\n\$EndNodes", content, re.DOTALL)
-        if nodes_match:
-            nodes_content = nodes_match.group(1).strip().split("\n")
-
-            # Handle different mesh format versions
-            if mesh_data["format_info"].get("version", "").startswith("4"):
-                # Version 4.x format
-                self._parse_nodes_v4(nodes_content, mesh_data)
-            else:
-                # Legacy format
-                self._parse_nodes_legacy(nodes_content, mesh_data)
-
-        # Parse elements
-        elements_match = re.search(
-            r"\$Elements\n(.*?)\n\$EndElements", content, re.DOTALL
-        )
-        if elements_match:
-            elements_content = elements_match.group(1).strip().split("\n")
-
-            if mesh_data["format_info"].get("version", "").startswith("4"):
-                # Version 4.x format
-                self._parse_elements_v4(elements_content, mesh_data)
-            else:
-                # Legacy format
-                self._parse_elements_legacy(elements_content, mesh_data)
-
+        self.msh = msh
         self.mesh_data = mesh_data
         return mesh_data
 
-    def _parse_nodes_v4(self, nodes_content: List[str], mesh_data: Dict):
-        """Parse nodes in Gmsh format version 4.x"""
-        lines = nodes_content
-        line_idx = 0
-
-        # First line: numEntityBlocks numNodes minNodeTag maxNodeTag
-        header = lines[line_idx].split()
-        num_entity_blocks = int(header[0])
-        num_nodes = int(header[1])
-        line_idx += 1
-
-        nodes = {}
-
-        for block in range(num_entity_blocks):
-            # Entity block header: entityDim entityTag parametric numNodesInBlock
-            block_header = lines[line_idx].split()
-            entity_dim = int(block_header[0])
-            entity_tag = int(block_header[1])
-            parametric = int(block_header[2])
-            num_nodes_in_block = int(block_header[3])
-            line_idx += 1
-
-            # Node tags
-            node_tags = []
-            for i in range(num_nodes_in_block):
-                node_tags.append(int(lines[line_idx]))
-                line_idx += 1
-
-            # Node coordinates
-            for i, tag in enumerate(node_tags):
-                coords = lines[line_idx].split()
-                nodes[tag] = [float(coords[0]), float(coords[1]), float(coords[2])]
-                line_idx += 1
-
-        mesh_data["nodes"] = nodes
-
-    def _parse_nodes_legacy(self, nodes_content: List[str], mesh_data: Dict):
-        """Parse nodes in legacy Gmsh format"""
-        num_nodes = int(nodes_content[0])
-        nodes = {}
-
-        for i in range(1, num_nodes + 1):
-            parts = nodes_content[i].split()
-            tag = int(parts[0])
-            coords = [float(parts[1]), float(parts[2]), float(parts[3])]
-            nodes[tag] = coords
-
-        mesh_data["nodes"] = nodes
-
-    def _parse_elements_v4(self, elements_content: List[str], mesh_data: Dict):
-        """Parse elements in Gmsh format version 4.x"""
-        lines = elements_content
-        line_idx = 0
-
-        # First line: numEntityBlocks numElements minElementTag maxElementTag
-        header = lines[line_idx].split()
-        num_entity_blocks = int(header[0])
-        num_elements = int(header[1])
-        line_idx += 1
-
-        elements = {}
-
-        for block in range(num_entity_blocks):
-            # Entity block header: entityDim entityTag elementType numElementsInBlock
-            block_header = lines[line_idx].split()
-            entity_dim = int(block_header[0])
-            entity_tag = int(block_header[1])
-            element_type = int(block_header[2])
-            num_elements_in_block = int(block_header[3])
-            line_idx += 1
-
-            for i in range(num_elements_in_block):
-                parts = lines[line_idx].split()
-                elem_tag = int(parts[0])
-                node_tags = [int(x) for x in parts[1:]]
-
-                elements[elem_tag] = {
-                    "type": element_type,
-                    "entity_tag": entity_tag,
-                    "nodes": node_tags,
-                }
-                line_idx += 1
-
-        mesh_data["elements"] = elements
-
-    def _parse_elements_legacy(self, elements_content: List[str], mesh_data: Dict):
-        """Parse elements in legacy Gmsh format"""
-        num_elements = int(elements_content[0])
-        elements = {}
-
-        for i in range(1, num_elements + 1):
-            parts = elements_content[i].split()
-            elem_tag = int(parts[0])
-            elem_type = int(parts[1])
-            elem_region = int(parts[2])
-            # Skip unused field
-            num_nodes = int(parts[4])
-            node_tags = [int(x) for x in parts[5 : 5 + num_nodes]]
-
-            elements[elem_tag] = {
-                "type": elem_type,
-                "region": elem_region,
-                "nodes": node_tags,
-            }
-
-        mesh_data["elements"] = elements
-
     def read_pre_file(self, filepath: Union[str, Path]) -> Dict:
         """
         Read a GetDP .pre file and extract DOF information.
@@ -228,154 +72,103 @@ class GetDPReader:
 
         dof_data = {"resolution": {}, "dof_data_blocks": []}
 
+        # Single pass over the file; only the current line is held in memory
         with open(filepath, "r") as f:
-            content = f.read()
-
-        # Parse resolution information
-        res_match = re.search(
-            r"\$Resolution /\* \'(.*?)\' \*/\n(.*?)\n\$EndResolution",
-            content,
-            re.DOTALL,
-        )
-        if res_match:
-            resolution_name = res_match.group(1)
-            resolution_lines = res_match.group(2).strip().split("\n")
-            if len(resolution_lines) >= 1:
-                res_parts = resolution_lines[0].split()
-                dof_data["resolution"] = {
-                    "name": resolution_name,
-                    "main_resolution_number": int(res_parts[0]),
-                    "number_of_dofdata": int(res_parts[1]) if len(res_parts) > 1 else 0,
-                }
-
-        # Parse all DofData blocks
-        dof_blocks = re.finditer(
-            r"\$DofData /\* #(\d+) \*/\n(.*?)\n\$EndDofData", content, re.DOTALL
-        )
-
-        for dof_match in dof_blocks:
-            dof_number = int(dof_match.group(1))
-            dof_content = dof_match.group(2).strip().split("\n")
-
-            if len(dof_content) < 5:
-                continue
-
-            # Parse header information
-            resolution_number, system_number = map(int, dof_content[0].split())
-
-            # Function spaces
-            fs_line = dof_content[1].split()
-            num_function_spaces = int(fs_line[0])
-            function_spaces = [int(x) for x in fs_line[1 : num_function_spaces + 1]]
-
-            # Time functions
-            tf_line = dof_content[2].split()
-            num_time_functions = int(tf_line[0])
-            time_functions = [int(x) for x in tf_line[1 : num_time_functions + 1]]
-
-            # Partitions
-            part_line = dof_content[3].split()
-            num_partitions = int(part_line[0])
-            partitions = [int(x) for x in part_line[1 : num_partitions + 1]]
-
-            # DOF counts
-            dof_counts = dof_content[4].split()
-            num_any_dof = int(dof_counts[0])
-            num_dof = int(dof_counts[1])
-
-            # Parse individual DOFs
-            dofs = []
-            for line in dof_content[5:]:
-                if line.strip():
-                    parts = line.split()
-                    if len(parts) >= 5:
-                        dof_basis_function = int(parts[0])
-                        dof_entity = int(parts[1])
-                        dof_harmonic = int(parts[2])
-                        dof_type = int(parts[3])
-
-                        # Parse DOF data based on type
-                        dof_data_values = parts[4:]
-
-                        dof_entry = {
-                            "basis_function_number": dof_basis_function,
-                            "entity": dof_entity,
-                            "harmonic": dof_harmonic,
-                            "type": dof_type,
-                            "type_name": self._get_dof_type_name(dof_type),
-                            "data": self._parse_dof_data(dof_type, dof_data_values),
+            for line in f:
+                if line.startswith("$Resolution"):
+                    # Parse resolution information
+                    resolution_name = header_comment(line).strip("'")
+                    res_parts = f.readline().split()
+                    if res_parts:
+                        dof_data["resolution"] = {
+                            "name": resolution_name,
+                            "main_resolution_number": int(res_parts[0]),
+                            "number_of_dofdata": int(res_parts[1])
+                            if len(res_parts) > 1
+                            else 0,
                         }
-                        dofs.append(dof_entry)
-
-            # Store the complete DofData block
-            dof_block = {
-                "number": dof_number,
-                "resolution_number": resolution_number,
-                "system_number": system_number,
-                "function_spaces": function_spaces,
-                "time_functions": time_functions,
-                "partitions": partitions,
-                "num_any_dof": num_any_dof,
-                "num_dof": num_dof,
-                "dofs": dofs,
-            }
-            dof_data["dof_data_blocks"].append(dof_block)
+                    skip_to_end(f, "$EndResolution")
+                elif line.startswith("$DofData"):
+                    dof_block = self._parse_dof_data_block(f, line)
+                    if dof_block is not None:
+                        dof_data["dof_data_blocks"].append(dof_block)
 
         self.dof_data = dof_data
         return dof_data
 
+    def _parse_dof_data_block(self, f, header_line: str) -> Optional[Dict]:
+        """Parse one $DofData block, reading from the line after its header."""
+        dof_number = int(header_comment(header_line).lstrip("#") or 0)
+
+        dof_content = []
+        for line in f:
+            if line.startswith("$EndDofData"):
+                return None
+            dof_content.append(line)
+            if len(dof_content) == 5:
+                break
+
+        if len(dof_content) < 5:
+            return None
+
+        # Parse header information
+        resolution_number, system_number = map(int, dof_content[0].split())
+
+        # Function spaces
+        fs_line = dof_content[1].split()
+        num_function_spaces = int(fs_line[0])
+        function_spaces = [int(x) for x in fs_line[1 : num_function_spaces + 1]]
+
+        # Time functions
+        tf_line = dof_content[2].split()
+        num_time_functions = int(tf_line[0])
+        time_functions = [int(x) for x in tf_line[1 : num_time_functions + 1]]
+
+        # Partitions
+        part_line = dof_content[3].split()
+        num_partitions = int(part_line[0])
+        partitions = [int(x) for x in part_line[1 : num_partitions + 1]]
+
+        # DOF counts
+        dof_counts = dof_content[4].split()
+        num_any_dof = int(dof_counts[0])
+        num_dof = int(dof_counts[1])
+
+        # Parse individual DOFs into a compact structured array (see DOF_DTYPE)
+        dofs = read_dof_table(f, "$EndDofData", num_any_dof)
+
+        # Store the complete DofData block
+        return {
+            "number": dof_number,
+            "resolution_number": resolution_number,
+            "system_number": system_number,
+            "function_spaces": function_spaces,
+            "time_functions": time_functions,
+            "partitions": partitions,
+            "num_any_dof": num_any_dof,
+            "num_dof": num_dof,
+            "dofs": dofs,
+        }
+
     def _get_dof_type_name(self, dof_type: int) -> str:
         """Get human-readable name for DOF type"""
-        type_names = {
-            1: "UNKNOWN",
-            2: "FIXED_VALUE",
-            3: "ASSOCIATED_DOF",
-            5: "INITIAL_VALUE",
-        }
-        return type_names.get(dof_type, f"TYPE_{dof_type}")
-
-    def _parse_dof_data(self, dof_type: int, data_values: List[str]) -> Dict:
-        """Parse DOF data based on type"""
-        try:
-            if dof_type == 1:  # UNKNOWN
-                return {
-                    "equation_number": int(data_values[0])
-                    if len(data_values) > 0
-                    else 0,
-                    "nnz": int(data_values[1]) if len(data_values) > 1 else 0,
-                }
-            elif dof_type == 2:  # FIXED VALUE
-                return {
-                    "value": float(data_values[0]) if len(data_values) > 0 else 0.0,
-                    "time_function_number": int(data_values[1])
-                    if len(data_values) > 1
-                    else 0,
-                }
-            elif dof_type == 3:  # ASSOCIATED DOF
-                return {
-                    "associate_dof_number": int(data_values[0])
-                    if len(data_values) > 0
-                    else 0,
-                    "value": float(data_values[1]) if len(data_values) > 1 else 0.0,
-                    "time_function_number": int(data_values[2])
-                    if len(data_values) > 2
-                    else 0,
-                }
-            elif dof_type == 5:  # INITIAL VALUE
-                return {
-                    "equation_number": int(data_values[0])
-                    if len(data_values) > 0
-                    else 0,
-                    "value": float(data_values[1]) if len(data_values) > 1 else 0.0,
-                }
-            else:
-                # Unknown type, store raw data
-                return {
-                    "raw_data": [float(x) if "." in x else int(x) for x in data_values]
-                }
-        except (ValueError, IndexError):
-            # Fallback to raw string data if parsing fails
-            return {"raw_data": data_values}
+        return dof_type_name(dof_type)
+
+    def get_dof_table(self, dofdata_number: Optional[int] = None) -> np.ndarray:
+        """
+        Get the DOF table of a DofData block.
+
+        Args:
+            dofdata_number: DofData block number, or None for the first block
+
+        Returns:
+            Structured array with DOF_DTYPE fields (basis_function, entity,
+            harmonic, type, equation_number, value, time_function, associate_dof)
+        """
+        for dof_block in self.dof_data.get("dof_data_blocks", []):
+            if dofdata_number is None or dof_block["number"] == dofdata_number:
+                return dof_block["dofs"]
+        raise KeyError(f"No DofData block {dofdata_number} loaded")
 
     def read_res_file(self, filepath: Union[str, Path]) -> Dict:
         """
@@ -399,15 +192,15 @@ class GetDPReader:
         }
 
         with open(filepath, "r") as f:
-            content = f.read()
-
-        # Check if this is a mesh-format res file or a simple solution file
-        if "$MeshFormat" in content:
-            # This is a mesh format file with solution data
-            self._parse_res_with_mesh(content, solution_data)
-        else:
-            # This is a simple solution file
-            self._parse_simple_res(content, solution_data)
+            first_line = f.readline()
+            # Check if this is a mesh-format res file or a simple solution file
+            if first_line.startswith("$MeshFormat"):
+                # This is a mesh format file with solution data
+                self._parse_res_with_mesh(first_line + f.read(), solution_data)
+            else:
+                # This is a simple solution file, streamed section by section
+                f.seek(0)
+                self._parse_simple_res(f, solution_data)
 
         self.solution_data = solution_data
         return solution_data
@@ -476,69 +269,68 @@ class GetDPReader:
             nodedata_content = nodedata_match.group(1).strip().split("\n")
             self._parse_node_data(nodedata_content, solution_data)
 
-    def _parse_simple_res(self, content: str, solution_data: Dict):
-        """Parse simple .res file with just solution values"""
-
-        # Parse format information
-        format_match = re.search(
-            r"\$ResFormat /\* (.*?) \*/\n(.*?)\n\$EndResFormat", content, re.DOTALL
-        )
-        if format_match:
-            format_info = format_match.group(1)
-            format_data = format_match.group(2).strip()
-            solution_data["format_info"] = {
-                "description": format_info,
-                "version": format_data,
-            }
-
-        # Parse all solution blocks
-        solution_blocks = re.finditer(
-            r"\$Solution  /\* (.*?) \*/\n(.*?)\n\$EndSolution", content, re.DOTALL
-        )
+    def _parse_simple_res(self, f, solution_data: Dict):
+        """
+        Parse simple .res file with just solution values.
 
+        The file is read in a single pass. Solution values are written straight
+        into a complex array, preallocated from the matching DofData block of a
+        previously read .pre file when available.
+        """
         solution_data["solution_blocks"] = []
 
-        for solution_match in solution_blocks:
-            solution_info = solution_match.group(1)
-            solution_content = solution_match.group(2).strip().split("\n")
-
-            if len(solution_content) < 1:
-                continue
+        # Number of equations per DofData block, used to preallocate
+        expected_sizes = {
+            block["number"]: block["num_dof"]
+            for block in self.dof_data.get("dof_data_blocks", [])
+        }
 
-            # Parse header line: DOFDATA-NUMBER TIME-VALUE TIME-IMAG-VALUE TIME-STEP-NUMBER
-            header_parts = solution_content[0].split()
-            if len(header_parts) >= 4:
-                dofdata_number = int(header_parts[0])
-                time_value = float(header_parts[1])
-                time_imag_value = float(header_parts[2])
-                time_step_number = int(header_parts[3])
-            else:
-                # Fallback if header format is different
-                dofdata_number = 0
-                time_value = 0.0
-                time_imag_value = 0.0
-                time_step_number = 0
-
-            # Parse solution values (one per line after header)
-            solutions = []
-            for line in solution_content[1:]:
-                if line.strip():
-                    # Each line should contain one solution value (possibly complex)
-                    parts = line.split()
-                    if len(parts) >= 1:
-                        real_value = float(parts[0])
-                        imag_value = float(parts[1]) if len(parts) > 1 else 0.0
-                        solutions.append(complex(real_value, imag_value))
-
-            solution_block = {
-                "dofdata_number": dofdata_number,
-                "time_value": time_value,
-                "time_imag_value": time_imag_value,
-                "time_step_number": time_step_number,
-                "solution_info": solution_info,
-                "solutions": solutions,
-            }
-            solution_data["solution_blocks"].append(solution_block)
+        for line in f:
+            if line.startswith("$ResFormat"):
+                # Parse format information
+                solution_data["format_info"] = {
+                    "description": header_comment(line),
+                    "version": f.readline().strip(),
+                }
+                skip_to_end(f, "$EndResFormat")
+            elif line.startswith("$Solution"):
+                solution_info = header_comment(line)
+
+                # Parse header line: DOFDATA-NUMBER TIME-VALUE TIME-IMAG-VALUE TIME-STEP-NUMBER
+                header_line = f.readline()
+                if header_line.startswith("$EndSolution"):
+                    continue
+                header_parts = header_line.split()
+                if len(header_parts) >= 4:
+                    dofdata_number = int(header_parts[0])
+                    time_value = float(header_parts[1])
+                    time_imag_value = float(header_parts[2])
+                    time_step_number = int(header_parts[3])
+                else:
+                    # Fallback if header format is different
+                    dofdata_number = 0
+                    time_value = 0.0
+                    time_imag_value = 0.0
+                    time_step_number = 0
+
+                # Parse solution values (one per line after header, possibly complex)
+                values = read_value_block(
+                    f, "$EndSolution", expected_sizes.get(dofdata_number)
+                )
+                solutions = np.empty(len(values), dtype=np.complex128)
+                solutions.real = values[:, 0]
+                solutions.imag = values[:, 1] if values.shape[1] > 1 else 0.0
+                del values
+
+                solution_block = {
+                    "dofdata_number": dofdata_number,
+                    "time_value": time_value,
+                    "time_imag_value": time_imag_value,
+                    "time_step_number": time_step_number,
+                    "solution_info": solution_info,
+                    "solutions": solutions,
+                }
+                solution_data["solution_blocks"].append(solution_block)
 
         # For backward compatibility, keep the first solution block as "solutions"
         if solution_data["solution_blocks"]:
@@ -564,20 +356,27 @@ class GetDPReader:
         Returns:
             PyVista UnstructuredGrid object
         """
-        if not self.mesh_data or "nodes" not in self.mesh_data:
+        if not self.mesh_data or "arrays" not in self.mesh_data:
             raise ValueError("No mesh data loaded. Call read_msh_file() first.")
 
         # Load solution data if provided
         if res_filepath:
             self.read_res_file(res_filepath)
 
-        # Convert nodes to numpy array
-        nodes = self.mesh_data["nodes"]
-        points = np.array([nodes[i] for i in sorted(nodes.keys())])
+        msh: MshData = self.mesh_data["arrays"]
 
-        # Convert elements to VTK format
-        cells = []
-        cell_types = []
+        # Points ordered by node tag, and a lookup from node tag to point index
+        order = np.argsort(msh.node_tags, kind="stable")
+        points = msh.node_coords[order]
+        node_index = np.full(int(msh.node_tags.max(initial=0)) + 1, -1, dtype=np.int64)
+        node_index[msh.node_tags[order]] = np.arange(len(points))
+
+        def point_indices(tags: np.ndarray) -> np.ndarray:
+            tags = np.asarray(tags, dtype=np.int64)
+            indices = np.full(tags.shape, -1, dtype=np.int64)
+            valid = (tags >= 0) & (tags < len(node_index))
+            indices[valid] = node_index[tags[valid]]
+            return indices
 
         # Gmsh to VTK element type mapping
         gmsh_to_vtk = {
@@ -591,71 +390,79 @@ class GetDPReader:
             15: 1,  # Point -> VTK_VERTEX
         }
 
-        elements = self.mesh_data["elements"]
-        for elem_id in sorted(elements.keys()):
-            element = elements[elem_id]
-            gmsh_type = element["type"]
-            node_ids = element["nodes"]
-
-            if gmsh_type in gmsh_to_vtk:
-                vtk_type = gmsh_to_vtk[gmsh_type]
-                # Convert to 0-based indexing
-                vtk_nodes = [node_id - 1 for node_id in node_ids]
-                cells.extend([len(vtk_nodes)] + vtk_nodes)
-                cell_types.append(vtk_type)
+        # Convert elements to VTK format, one block per element type, blocks
+        # ordered by their first element tag and elements sorted by tag
+        blocks = sorted(
+            (
+                block
+                for block in msh.element_blocks.values()
+                if block.element_type in gmsh_to_vtk and len(block)
+            ),
+            key=lambda block: block.tags.min(),
+        )
+        cells = []
+        cell_types = []
+        for block in blocks:
+            connectivity = point_indices(block.connectivity[np.argsort(block.tags)])
+            connectivity = connectivity[(connectivity >= 0).all(axis=1)]
+            n_cells, n_nodes = connectivity.shape
+            cells.append(
+                np.hstack(
+                    [np.full((n_cells, 1), n_nodes, dtype=np.int64), connectivity]
+                ).ravel()
+            )
+            cell_types.append(
+                np.full(n_cells, gmsh_to_vtk[block.element_type], dtype=np.uint8)
+            )
 
         # Create PyVista mesh
-        mesh = pv.UnstructuredGrid(cells, cell_types, points)
+        mesh = pv.UnstructuredGrid(
+            np.concatenate(cells) if cells else np.empty(0, dtype=np.int64),
+            np.concatenate(cell_types) if cell_types else np.empty(0, dtype=np.uint8),
+            points,
+        )
+
+        dof_blocks = {
+            dof_block["number"]: dof_block
+            for dof_block in (self.dof_data or {}).get("dof_data_blocks", [])
+        }
 
         # Add solution data if available
         if self.solution_data and "solution_blocks" in self.solution_data:
             for sol_block in self.solution_data["solution_blocks"]:
-                solutions = sol_block["solutions"]
+                solutions = np.asarray(sol_block["solutions"])
                 dofdata_number = sol_block["dofdata_number"]
 
                 # Find corresponding DOF data block
-                corresponding_dof_block = None
-                if self.dof_data and "dof_data_blocks" in self.dof_data:
-                    for dof_block in self.dof_data["dof_data_blocks"]:
-                        if dof_block["number"] == dofdata_number:
-                            corresponding_dof_block = dof_block
-                            break
-
-                if corresponding_dof_block and solutions:
-                    # Create arrays for solution data mapped to mesh points
+                corresponding_dof_block = dof_blocks.get(dofdata_number)
+
+                if corresponding_dof_block and len(solutions):
+                    dofs = corresponding_dof_block["dofs"]
+                    entity_idx = point_indices(dofs["entity"])
+                    on_mesh = entity_idx >= 0
+
+                    # Unknowns take the solution at their equation number
+                    # (1-based row of the .res block), fixed DOFs their value
+                    eq_num = dofs["equation_number"]
+                    is_unknown = (
+                        np.isin(dofs["type"], (1, 5))  # UNKNOWN, INITIAL_VALUE
+                        & (eq_num > 0)
+                        & (eq_num <= len(solutions))
+                    )
+                    is_fixed = dofs["type"] == 2  # FIXED_VALUE
+
+                    values = np.zeros(len(entity_idx), dtype=np.complex128)
+                    values[is_unknown] = solutions[eq_num[is_unknown] - 1]
+                    values[is_fixed] = dofs["value"][is_fixed]
+
+                    # Later DOFs on the same node overwrite earlier ones
+                    assigned = on_mesh & (is_unknown | is_fixed)
                     solution_real = np.zeros(len(points))
                     solution_imag = np.zeros(len(points))
                     has_solution = np.zeros(len(points), dtype=bool)
-
-                    # Create mapping from equation number to solution value
-                    equation_to_solution = {}
-                    solution_idx = 0
-
-                    # Build equation number mapping for unknowns only
-                    for dof in corresponding_dof_block["dofs"]:
-                        if dof["type"] == 1:  # UNKNOWN
-                            eq_num = dof["data"].get("equation_number", 0)
-                            if eq_num > 0 and solution_idx < len(solutions):
-                                equation_to_solution[eq_num] = solutions[solution_idx]
-                                solution_idx += 1
-
-                    # Map solutions to mesh points
-                    for dof in corresponding_dof_block["dofs"]:
-                        entity_idx = dof["entity"] - 1  # Convert to 0-based indexing
-                        if 0 <= entity_idx < len(points):
-                            if dof["type"] == 1:  # UNKNOWN
-                                eq_num = dof["data"].get("equation_number", 0)
-                                if eq_num in equation_to_solution:
-                                    sol_value = equation_to_solution[eq_num]
-                                    solution_real[entity_idx] = sol_value.real
-                                    solution_imag[entity_idx] = sol_value.imag
-                                    has_solution[entity_idx] = True
-                            elif dof["type"] == 2:  # FIXED_VALUE
-                                # Use the prescribed value for fixed DOFs
-                                fixed_value = dof["data"].get("value", 0.0)
-                                solution_real[entity_idx] = fixed_value
-                                solution_imag[entity_idx] = 0.0
-                                has_solution[entity_idx] = True
+                    solution_real[entity_idx[assigned]] = values[assigned].real
+                    solution_imag[entity_idx[assigned]] = values[assigned].imag
+                    has_solution[entity_idx[assigned]] = True
 
                     # Add arrays to mesh
                     suffix = (
@@ -674,58 +481,39 @@ class GetDPReader:
 
         # Backward compatibility: if no solution_blocks but has solutions
         elif self.solution_data and "solutions" in self.solution_data:
-            solutions = self.solution_data["solutions"]
+            solutions = np.asarray(self.solution_data["solutions"])
             if len(solutions) == len(points):
                 # Add real and imaginary parts as separate arrays
-                real_parts = np.array([sol.real for sol in solutions])
-                imag_parts = np.array([sol.imag for sol in solutions])
-
-                mesh.point_data["solution_real"] = real_parts
-                mesh.point_data["solution_imag"] = imag_parts
+                mesh.point_data["solution_real"] = np.real(solutions)
+                mesh.point_data["solution_imag"] = np.imag(solutions)
                 mesh.point_data["solution_magnitude"] = np.abs(solutions)
 
         # Add DOF information if available
-        if self.dof_data and "dof_data_blocks" in self.dof_data:
-            # Process all DOF data blocks
-            for dof_block in self.dof_data["dof_data_blocks"]:
-                dofs = dof_block["dofs"]
-
-                # Create arrays for DOF data
-                constraint_types = np.zeros(len(points))
-                constraint_values = np.zeros(len(points))
-                equation_numbers = np.zeros(len(points))
-
-                for dof in dofs:
-                    entity_idx = dof["entity"] - 1  # Convert to 0-based indexing
-                    if 0 <= entity_idx < len(points):
-                        constraint_types[entity_idx] = dof["type"]
-
-                        # Extract value based on DOF type
-                        if dof["type"] == 2:  # FIXED_VALUE
-                            constraint_values[entity_idx] = dof["data"].get(
-                                "value", 0.0
-                            )
-                        elif dof["type"] == 1:  # UNKNOWN
-                            equation_numbers[entity_idx] = dof["data"].get(
-                                "equation_number", 0
-                            )
-                        elif dof["type"] == 5:  # INITIAL_VALUE
-                            constraint_values[entity_idx] = dof["data"].get(
-                                "value", 0.0
-                            )
-                            equation_numbers[entity_idx] = dof["data"].get(
-                                "equation_number", 0
-                            )
-
-                # Add arrays to mesh (with block number suffix if multiple blocks)
-                suffix = (
-                    f"_block{dof_block['number']}"
-                    if len(self.dof_data["dof_data_blocks"]) > 1
-                    else ""
-                )
-                mesh.point_data[f"dof_type{suffix}"] = constraint_types
-                mesh.point_data[f"dof_value{suffix}"] = constraint_values
-                mesh.point_data[f"equation_number{suffix}"] = equation_numbers
+        for dof_block in dof_blocks.values():
+            dofs = dof_block["dofs"]
+            entity_idx = point_indices(dofs["entity"])
+            on_mesh = entity_idx >= 0
+
+            # Create arrays for DOF data
+            constraint_types = np.zeros(len(points))
+            constraint_values = np.zeros(len(points))
+            equation_numbers = np.zeros(len(points))
+
+            constraint_types[entity_idx[on_mesh]] = dofs["type"][on_mesh]
+            # FIXED_VALUE and INITIAL_VALUE carry a value
+            has_value = on_mesh & np.isin(dofs["type"], (2, 5))
+            constraint_values[entity_idx[has_value]] = dofs["value"][has_value]
+            # UNKNOWN and INITIAL_VALUE carry an equation number
+            has_equation = on_mesh & np.isin(dofs["type"], (1, 5))
+            equation_numbers[entity_idx[has_equation]] = dofs["equation_number"][
+                has_equation
+            ]
+
+            # Add arrays to mesh (with block number suffix if multiple blocks)
+            suffix = f"_block{dof_block['number']}" if len(dof_blocks) > 1 else ""
+            mesh.point_data[f"dof_type{suffix}"] = constraint_types
+            mesh.point_data[f"dof_value{suffix}"] = constraint_values
+            mesh.point_data[f"equation_number{suffix}"] = equation_numbers
 
         self.mesh = mesh
         return mesh
@@ -0,0 +1,505 @@
+import mmap
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, IO, List, Tuple, Union
+
+import numpy as np
+
+from .stream import CHUNK_LINES, skip_to_end
+
+
+@dataclass
+class ElementBlock:
+    """All elements of one Gmsh element type, stored as contiguous arrays."""
+
+    element_type: int
+    tags: np.ndarray  # (M,) element tags
+    connectivity: np.ndarray  # (M, nodes_per_element) node tags
+    entity_tags: np.ndarray  # (M,) elementary entity tags
+    physical_tags: np.ndarray  # (M,) first physical tag of the entity, 0 if none
+
+    def __len__(self) -> int:
+        return len(self.tags)
+
+
+@dataclass
+class MshData:
+    """Array-backed contents of a Gmsh .msh file."""
+
+    format_info: Dict = field(default_factory=dict)
+    physical_names: Dict[int, Dict] = field(default_factory=dict)
+    node_tags: np.ndarray = field(default_factory=lambda: np.empty(0, np.int64))
+    node_coords: np.ndarray = field(default_factory=lambda: np.empty((0, 3)))
+    element_blocks: Dict[int, ElementBlock] = field(default_factory=dict)
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.node_tags)
+
+    @property
+    def num_elements(self) -> int:
+        return sum(len(block) for block in self.element_blocks.values())
+
+    def node_indices(self, tags: np.ndarray) -> np.ndarray:
+        """
+        Map node tags to row indices into node_coords.
+
+        Args:
+            tags: Array of node tags (any shape)
+
+        Returns:
+            Array of the same shape with row indices, -1 for unknown tags
+        """
+        tags = np.asarray(tags, dtype=np.int64)
+        if self.num_nodes == 0:
+            return np.full(tags.shape, -1, dtype=np.int64)
+
+        lookup = np.full(int(self.node_tags.max()) + 1, -1, dtype=np.int64)
+        lookup[self.node_tags] = np.arange(self.num_nodes)
+
+        valid = (tags >= 0) & (tags < len(lookup))
+        indices = np.full(tags.shape, -1, dtype=np.int64)
+        indices[valid] = lookup[tags[valid]]
+        return indices
+
+    def nodes_dict(self) -> Dict[int, List[float]]:
+        """Node tag -> [x, y, z], as returned by the original dict parser."""
+        return dict(zip(self.node_tags.tolist(), self.node_coords.tolist()))
+
+    def elements_dict(self) -> Dict[int, Dict]:
+        """Element tag -> {"type", "entity_tag", "region", "nodes"}."""
+        elements = {}
+        for element_type, block in self.element_blocks.items():
+            for tag, entity, physical, nodes in zip(
+                block.tags.tolist(),
+                block.entity_tags.tolist(),
+                block.physical_tags.tolist(),
+                block.connectivity.tolist(),
+            ):
+                elements[tag] = {
+                    "type": element_type,
+                    "entity_tag": entity,
+                    "region": physical,
+                    "nodes": nodes,
+                }
+        return elements
+
+
+class LazyDict(Mapping):
+    """Read-only mapping that is only built on first item access."""
+
+    def __init__(self, builder: Callable[[], Dict], length: int):
+        self._builder = builder
+        self._length = length
+        self._data = None
+
+    def _materialize(self) -> Dict:
+        if self._data is None:
+            self._data = self._builder()
+        return self._data
+
+    def __getitem__(self, key):
+        return self._materialize()[key]
+
+    def __iter__(self):
+        return iter(self._materialize())
+
+    def __len__(self) -> int:
+        return self._length
+
+
+def read_msh(filepath: Union[str, Path]) -> MshData:
+    """
+    Read a Gmsh .msh file into contiguous numpy arrays.
+
+    Supports ASCII and binary MSH 4.1 and the legacy ASCII MSH 2 format. Node
+    and element blocks are converted in bulk rather than line by line; binary
+    blocks are read with np.frombuffer directly from a memory map.
+
+    Args:
+        filepath: Path to the .msh file
+
+    Returns:
+        MshData with node tags/coordinates and elements grouped by type
+    """
+    filepath = Path(filepath)
+    if not filepath.exists():
+        raise FileNotFoundError(f"MSH file not found: {filepath}")
+
+    # $MeshFormat / version file-type data-size
+    with open(filepath, "rb") as f:
+        first_line = f.readline().strip()
+        format_parts = f.readline().split()
+    if (
+        first_line == b"$MeshFormat"
+        and len(format_parts) > 1
+        and format_parts[1] == b"1"
+    ):
+        return _read_msh_binary(filepath)
+    return _read_msh_ascii(filepath)
+
+
+def _read_msh_ascii(filepath: Path) -> MshData:
+    data = MshData()
+    # (entity dim, entity tag) -> first physical tag
+    entity_physicals: Dict[Tuple[int, int], int] = {}
+
+    with open(filepath, "r") as f:
+        for line in f:
+            section = line.strip()
+
+            if section == "$MeshFormat":
+                data.format_info = _parse_format_line(f.readline())
+            elif section == "$PhysicalNames":
+                data.physical_names = _parse_physical_names(f.readline)
+            elif section == "$Entities":
+                entity_physicals = _parse_entities_v4(f)
+            elif section == "$Nodes":
+                if _is_v4(data):
+                    _parse_nodes_v4(f, data)
+                else:
+                    _parse_nodes_legacy(f, data)
+            elif section == "$Elements":
+                if _is_v4(data):
+                    _parse_elements_v4(f, data, entity_physicals)
+                else:
+                    _parse_elements_legacy(f, data)
+            else:
+                continue
+
+            skip_to_end(f, "$End" + section[1:])
+
+    return data
+
+
+def _parse_format_line(line: str) -> Dict:
+    parts = line.split()
+    return {
+        "version": parts[0],
+        "file_type": int(parts[1]),
+        "data_size": int(parts[2]),
+    }
+
+
+def _parse_physical_names(readline: Callable[[], str]) -> Dict[int, Dict]:
+    physical_names = {}
+    num_phys = int(readline())
+    for _ in range(num_phys):
+        parts = readline().split(maxsplit=2)
+        physical_names[int(parts[1])] = {
+            "dimension": int(parts[0]),
+            "name": parts[2].strip().strip('"'),
+        }
+    return physical_names
+
+
+def _is_v4(data: MshData) -> bool:
+    return data.format_info.get("version", "").startswith("4")
+
+
+def _read_table(f: IO[str], n_rows: int, dtype) -> np.ndarray:
+    """Read n_rows whitespace separated lines with the same number of columns."""
+    if n_rows == 0:
+        return np.empty((0, 0), dtype=dtype)
+
+    first = np.fromstring(f.readline(), dtype=dtype, sep=" ")
+    table = np.empty((n_rows, len(first)), dtype=dtype)
+    table[0] = first
+
+    row = 1
+    while row < n_rows:
+        n = min(CHUNK_LINES, n_rows - row)
+        chunk = "".join(islice(f, n))
+        table[row : row + n] = np.fromstring(chunk, dtype=dtype, sep=" ").reshape(n, -1)
+        row += n
+    return table
+
+
+def _parse_entities_v4(f: IO[str]) -> Dict[Tuple[int, int], int]:
+    """Parse $Entities (MSH 4.1) into (dim, tag) -> first physical tag."""
+    counts = [int(x) for x in f.readline().split()]
+    physicals = {}
+    for dim, count in enumerate(counts):
+        # Points: tag x y z numPhysicalTags ...
+        # Others: tag minX minY minZ maxX maxY maxZ numPhysicalTags ...
+        num_phys_col = 4 if dim == 0 else 7
+        for _ in range(count):
+            parts = f.readline().split()
+            num_phys = int(parts[num_phys_col])
+            physicals[(dim, int(parts[0]))] = (
+                int(parts[num_phys_col + 1]) if num_phys > 0 else 0
+            )
+    return physicals
+
+
+def _parse_nodes_v4(f: IO[str], data: MshData):
+    """Parse nodes in Gmsh format version 4.1"""
+    # numEntityBlocks numNodes minNodeTag maxNodeTag
+    header = f.readline().split()
+    num_entity_blocks = int(header[0])
+    num_nodes = int(header[1])
+
+    node_tags = np.empty(num_nodes, dtype=np.int64)
+    node_coords = np.empty((num_nodes, 3), dtype=np.float64)
+
+    offset = 0
+    for _ in range(num_entity_blocks):
+        # entityDim entityTag parametric numNodesInBlock
+        block_header = f.readline().split()
+        n = int(block_header[3])
+        if n == 0:
+            continue
+
+        node_tags[offset : offset + n] = _read_table(f, n, np.int64)[:, 0]
+        # Parametric coordinates, if any, follow x y z on the same line
+        node_coords[offset : offset + n] = _read_table(f, n, np.float64)[:, :3]
+        offset += n
+
+    data.node_tags = node_tags[:offset]
+    data.node_coords = node_coords[:offset]
+
+
+def _parse_nodes_legacy(f: IO[str], data: MshData):
+    """Parse nodes in legacy Gmsh format"""
+    num_nodes = int(f.readline())
+    table = _read_table(f, num_nodes, np.float64)
+    data.node_tags = table[:, 0].astype(np.int64)
+    data.node_coords = np.ascontiguousarray(table[:, 1:4])
+
+
+def _parse_elements_v4(
+    f: IO[str], data: MshData, entity_physicals: Dict[Tuple[int, int], int]
+):
+    """Parse elements in Gmsh format version 4.1"""
+    # numEntityBlocks numElements minElementTag maxElementTag
+    header = f.readline().split()
+    num_entity_blocks = int(header[0])
+
+    blocks: Dict[int, List[Tuple[np.ndarray, int, int]]] = {}
+    for _ in range(num_entity_blocks):
+        # entityDim entityTag elementType numElementsInBlock
+        entity_dim, entity_tag, element_type, n = map(int, f.readline().split())
+        if n == 0:
+            continue
+
+        table = _read_table(f, n, np.int64)
+        physical = entity_physicals.get((entity_dim, entity_tag), 0)
+        blocks.setdefault(element_type, []).append((table, entity_tag, physical))
+
+    data.element_blocks = {
+        element_type: _merge_element_tables(element_type, parts)
+        for element_type, parts in blocks.items()
+    }
+
+
+def _merge_element_tables(
+    element_type: int, parts: List[Tuple[np.ndarray, int, int]]
+) -> ElementBlock:
+    """Concatenate (tag, nodes...) tables of one element type into an ElementBlock."""
+    tables = [table for table, _, _ in parts]
+    table = tables[0] if len(tables) == 1 else np.concatenate(tables)
+    sizes = [len(t) for t in tables]
+    return ElementBlock(
+        element_type=element_type,
+        tags=table[:, 0],
+        connectivity=table[:, 1:],
+        entity_tags=np.repeat([entity for _, entity, _ in parts], sizes).astype(
+            np.int32
+        ),
+        physical_tags=np.repeat([phys for _, _, phys in parts], sizes).astype(np.int32),
+    )
+
+
+def _parse_elements_legacy(f: IO[str], data: MshData):
+    """Parse elements in legacy (MSH 2) Gmsh format"""
+    num_elements = int(f.readline())
+
+    # elm-number elm-type number-of-tags <tags> node-number-list
+    # Rows of different element types have different lengths, so group by type
+    rows: Dict[int, List[List[int]]] = {}
+    for line in islice(f, num_elements):
+        parts = [int(x) for x in line.split()]
+        num_tags = parts[2]
+        physical = parts[3] if num_tags > 0 else 0
+        entity = parts[4] if num_tags > 1 else 0
+        rows.setdefault(parts[1], []).append(
+            [parts[0], entity, physical] + parts[3 + num_tags :]
+        )
+
+    element_blocks = {}
+    for element_type, type_rows in rows.items():
+        table = np.array(type_rows, dtype=np.int64)
+        element_blocks[element_type] = ElementBlock(
+            element_type=element_type,
+            tags=table[:, 0],
+            connectivity=table[:, 3:],
+            entity_tags=table[:, 1].astype(np.int32),
+            physical_tags=table[:, 2].astype(np.int32),
+        )
+    data.element_blocks = element_blocks
+
+
+# Number of nodes per element for the Gmsh element types, needed to size the
+# records of binary element blocks
+NODES_PER_ELEMENT = {
+    1: 2, 2: 3, 3: 4, 4: 4, 5: 8, 6: 6, 7: 5, 8: 3, 9: 6, 10: 9,
+    11: 10, 12: 27, 13: 18, 14: 14, 15: 1, 16: 8, 17: 20, 18: 15, 19: 13, 20: 9,
+    21: 10, 22: 12, 23: 15, 24: 15, 25: 21, 26: 4, 27: 5, 28: 6, 29: 20, 30: 35,
+    31: 56,
+}  # fmt: skip
+
+
+class _BinaryCursor:
+    """Sequential reader over a memory-mapped binary .msh file."""
+
+    def __init__(self, buffer: mmap.mmap):
+        self.buffer = buffer
+        self.pos = 0
+        self.byteorder = "<"
+        self.size_t = "u8"
+
+    def readline(self) -> str:
+        end = self.buffer.find(b"\n", self.pos)
+        if end < 0:
+            end = len(self.buffer)
+        line = self.buffer[self.pos : end].decode("ascii", errors="replace")
+        self.pos = end + 1
+        return line
+
+    def array(self, kind: str, count: int) -> np.ndarray:
+        """View count values of type kind ("i4", "f8" or "size_t") without copying."""
+        dtype = np.dtype(self.byteorder + (self.size_t if kind == "size_t" else kind))
+        values = np.frombuffer(self.buffer, dtype=dtype, count=count, offset=self.pos)
+        self.pos += dtype.itemsize * count
+        return values
+
+    def scalars(self, *kinds: str) -> List[int]:
+        return [self.array(kind, 1)[0].item() for kind in kinds]
+
+    def skip_to(self, marker: str):
+        """Move past the next line starting with marker."""
+        start = self.buffer.find(marker.encode("ascii"), self.pos)
+        self.pos = len(self.buffer) if start < 0 else start
+        self.readline()
+
+
+def _read_msh_binary(filepath: Path) -> MshData:
+    """Read a binary MSH 4.1 file."""
+    data = MshData()
+    entity_physicals: Dict[Tuple[int, int], int] = {}
+
+    with open(filepath, "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as buffer:
+        cursor = _BinaryCursor(buffer)
+        while cursor.pos < len(buffer):
+            section = cursor.readline().strip()
+
+            if section == "$MeshFormat":
+                data.format_info = _parse_format_line(cursor.readline())
+                if not data.format_info["version"].startswith("4.1"):
+                    raise ValueError(
+                        f"Unsupported binary MSH version: {data.format_info['version']}"
+                    )
+                cursor.size_t = "u8" if data.format_info["data_size"] == 8 else "u4"
+                # The integer 1 written in the file's byte order
+                one = np.frombuffer(buffer, dtype="<i4", count=1, offset=cursor.pos)
+                cursor.byteorder = "<" if one[0] == 1 else ">"
+                del one
+                cursor.pos += 4
+            elif section == "$PhysicalNames":
+                data.physical_names = _parse_physical_names(cursor.readline)
+            elif section == "$Entities":
+                entity_physicals = _parse_entities_binary(cursor)
+            elif section == "$Nodes":
+                _parse_nodes_binary(cursor, data)
+            elif section == "$Elements":
+                _parse_elements_binary(cursor, data, entity_physicals)
+            elif not section.startswith("$") or section.startswith("$End"):
+                continue
+
+            cursor.skip_to("$End" + section[1:])
+
+    return data
+
+
+def _parse_entities_binary(cursor: _BinaryCursor) -> Dict[Tuple[int, int], int]:
+    """Parse binary $Entities into (dim, tag) -> first physical tag."""
+    counts = cursor.scalars("size_t", "size_t", "size_t", "size_t")
+    physicals = {}
+    for dim, count in enumerate(counts):
+        for _ in range(count):
+            (tag,) = cursor.scalars("i4")
+            # Points store x y z, other entities their bounding box
+            cursor.pos += 8 * (3 if dim == 0 else 6)
+            (num_phys,) = cursor.scalars("size_t")
+            phys = cursor.array("i4", num_phys)
+            physicals[(dim, tag)] = int(phys[0]) if num_phys > 0 else 0
+            del phys
+            if dim > 0:
+                (num_bounding,) = cursor.scalars("size_t")
+                cursor.pos += 4 * num_bounding
+    return physicals
+
+
+def _parse_nodes_binary(cursor: _BinaryCursor, data: MshData):
+    """Parse binary nodes in Gmsh format version 4.1"""
+    num_entity_blocks, num_nodes, _, _ = cursor.scalars(
+        "size_t", "size_t", "size_t", "size_t"
+    )
+
+    node_tags = np.empty(num_nodes, dtype=np.int64)
+    node_coords = np.empty((num_nodes, 3), dtype=np.float64)
+
+    offset = 0
+    for _ in range(num_entity_blocks):
+        entity_dim, _, parametric, n = cursor.scalars("i4", "i4", "i4", "size_t")
+        if n == 0:
+            continue
+
+        # Copy out of the memory map; the views are released right after
+        node_tags[offset : offset + n] = cursor.array("size_t", n)
+        n_cols = 3 + (entity_dim if parametric else 0)
+        node_coords[offset : offset + n] = cursor.array("f8", n * n_cols).reshape(
+            n, n_cols
+        )[:, :3]
+        offset += n
+
+    data.node_tags = node_tags[:offset]
+    data.node_coords = node_coords[:offset]
+
+
+def _parse_elements_binary(
+    cursor: _BinaryCursor,
+    data: MshData,
+    entity_physicals: Dict[Tuple[int, int], int],
+):
+    """Parse binary elements in Gmsh format version 4.1"""
+    num_entity_blocks, _, _, _ = cursor.scalars("size_t", "size_t", "size_t", "size_t")
+
+    blocks: Dict[int, List[Tuple[np.ndarray, int, int]]] = {}
+    for _ in range(num_entity_blocks):
+        entity_dim, entity_tag, element_type, n = cursor.scalars(
+            "i4", "i4", "i4", "size_t"
+        )
+        if n == 0:
+            continue
+        if element_type not in NODES_PER_ELEMENT:
+            raise ValueError(
+                f"Unsupported element type {element_type} in binary MSH file"
+            )
+
+        n_cols = 1 + NODES_PER_ELEMENT[element_type]
+        table = cursor.array("size_t", n * n_cols).reshape(n, n_cols)
+        physical = entity_physicals.get((entity_dim, entity_tag), 0)
+        blocks.setdefault(element_type, []).append(
+            (table.astype(np.int64), entity_tag, physical)
+        )
+        del table
+
+    data.element_blocks = {
+        element_type: _merge_element_tables(element_type, parts)
+        for element_type, parts in blocks.items()
+    }
@@ -0,0 +1,66 @@
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+COMMENT_PATTERN = re.compile(r"//[^\n]*|/\*.*?\*/", re.DOTALL)
+NAME_PATTERN = re.compile(r"\bName\s+([A-Za-z_][\w~{}]*)")
+FILE_PATTERN = re.compile(r'\bFile\s*>{0,2}\s*"([^"]+)"')
+
+
+def _matching_brace(text: str, start: int) -> int:
+    """Index of the brace closing the one at text[start], or len(text)."""
+    depth = 0
+    for i in range(start, len(text)):
+        if text[i] == "{":
+            depth += 1
+        elif text[i] == "}":
+            depth -= 1
+            if depth == 0:
+                return i
+    return len(text)
+
+
+def _top_level_groups(text: str) -> List[str]:
+    """Contents of the {...} groups directly inside text."""
+    groups = []
+    i = text.find("{")
+    while i != -1:
+        end = _matching_brace(text, i)
+        groups.append(text[i + 1 : end])
+        i = text.find("{", end + 1)
+    return groups
+
+
+def post_operation_files(
+    pro_file: Union[str, Path], text: Optional[str] = None
+) -> Dict[str, List[str]]:
+    """
+    Find the output files written by each PostOperation of a .pro file.
+
+    Only literal file names (File "name", File > "name", File >> "name") are
+    found; names built at run time (e.g. with StrCat) are not.
+
+    Args:
+        pro_file: Path to the .pro file
+        text: Content of the .pro file, if already read
+
+    Returns:
+        dict: PostOperation name -> output file names, relative to the .pro file
+    """
+    if text is None:
+        text = Path(pro_file).read_text(errors="replace")
+    text = COMMENT_PATTERN.sub("", text)
+
+    outputs: Dict[str, List[str]] = {}
+    for block in re.finditer(r"\bPostOperation\s*\{", text):
+        start = block.end() - 1
+        body = text[start + 1 : _matching_brace(text, start)]
+        for group in _top_level_groups(body):
+            name = NAME_PATTERN.search(group)
+            if name is None:
+                continue
+            files = outputs.setdefault(name.group(1), [])
+            for file_name in FILE_PATTERN.findall(group):
+                if file_name not in files:
+                    files.append(file_name)
+    return outputs
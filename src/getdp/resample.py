@@ -0,0 +1,247 @@
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pyvista as pv
+
+# VTK cell types used for point location
+VTK_TRIANGLE = 5
+VTK_QUAD = 9
+VTK_TETRA = 10
+
+# Query points handled per vectorized batch in PointLocator.locate
+LOCATE_BATCH = 1 << 15
+
+
+@dataclass
+class RegularGrid:
+    """Regular nx x ny grid of points in the plane z = z."""
+
+    x_min: float
+    x_max: float
+    y_min: float
+    y_max: float
+    nx: int
+    ny: int
+    z: float = 0.0
+
+    @classmethod
+    def from_bounds(cls, bounds: Sequence[float], nx: int, ny: int) -> "RegularGrid":
+        """Grid covering PyVista bounds (x_min, x_max, y_min, y_max, z_min, z_max)."""
+        return cls(bounds[0], bounds[1], bounds[2], bounds[3], nx, ny, bounds[4])
+
+    def points(self) -> np.ndarray:
+        """Grid points (ny * nx, 3), x varying fastest."""
+        x = np.linspace(self.x_min, self.x_max, self.nx)
+        y = np.linspace(self.y_min, self.y_max, self.ny)
+        xx, yy = np.meshgrid(x, y)
+        return np.column_stack([xx.ravel(), yy.ravel(), np.full(xx.size, self.z)])
+
+
+def mesh_simplices(mesh: pv.UnstructuredGrid) -> np.ndarray:
+    """
+    Simplices used for point location: the tetrahedra of a mesh if it has
+    any, otherwise its triangles (quadrangles split in two).
+
+    Returns:
+        (n_simplices, 4) or (n_simplices, 3) array of point indices
+    """
+    cells = mesh.cells_dict
+    if VTK_TETRA in cells:
+        return np.asarray(cells[VTK_TETRA], dtype=np.int64)
+
+    triangles = [np.asarray(cells.get(VTK_TRIANGLE, np.empty((0, 3))), np.int64)]
+    if VTK_QUAD in cells:
+        quads = np.asarray(cells[VTK_QUAD], dtype=np.int64)
+        triangles += [quads[:, [0, 1, 2]], quads[:, [0, 2, 3]]]
+    return np.concatenate(triangles)
+
+
+class PointLocator:
+    """
+    Uniform-bin spatial index over the triangles or tetrahedra of a mesh.
+
+    The bounding box of the mesh is split into about one bin per simplex and
+    every simplex is registered in all bins its bounding box overlaps.
+    Locating a point then only tests the simplices of its bin. Building the
+    index and locating points are vectorized over all simplices and points.
+    """
+
+    def __init__(self, points: np.ndarray, simplices: np.ndarray):
+        self.simplices = np.asarray(simplices, dtype=np.int64)
+        self.dim = self.simplices.shape[1] - 1
+        coords = np.asarray(points, dtype=np.float64)[:, : self.dim]
+        corners = coords[self.simplices]  # (n, dim + 1, dim)
+
+        # Affine maps from physical to barycentric coordinates
+        self.origin = corners[:, 0]
+        edges = np.transpose(corners[:, 1:] - self.origin[:, None], (0, 2, 1))
+        det = np.linalg.det(edges)
+        self.valid = np.abs(det) > 1e-300
+        edges[~self.valid] = np.eye(self.dim)
+        self.inverse = np.linalg.inv(edges)
+
+        # Bins sized so that there is about one simplex per bin
+        low, high = corners.min(axis=1), corners.max(axis=1)
+        self.lower = coords.min(axis=0)
+        extent = np.maximum(coords.max(axis=0) - self.lower, 1e-12)
+        n_simplices = max(len(self.simplices), 1)
+        size = (np.prod(extent) / n_simplices) ** (1.0 / self.dim)
+        self.shape = np.maximum(np.ceil(extent / size).astype(np.int64), 1)
+        self.size = extent / self.shape
+
+        lo = self._bin_coords(low)
+        span = self._bin_coords(high) - lo + 1
+        counts = np.prod(span, axis=1)
+        owner = np.repeat(np.arange(len(self.simplices)), counts)
+        local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        bins = np.zeros(len(owner), dtype=np.int64)
+        for d in range(self.dim):
+            index = lo[owner, d] + local % span[owner, d]
+            local //= span[owner, d]
+            bins = bins * self.shape[d] + index
+
+        # CSR layout: simplices of bin b are bin_simplices[bin_start[b]:bin_start[b + 1]]
+        order = np.argsort(bins, kind="stable")
+        self.bin_simplices = owner[order]
+        self.bin_start = np.zeros(int(np.prod(self.shape)) + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(bins, minlength=int(np.prod(self.shape))),
+            out=self.bin_start[1:],
+        )
+
+    def _bin_coords(self, coords: np.ndarray) -> np.ndarray:
+        index = np.floor((coords - self.lower) / self.size).astype(np.int64)
+        return np.clip(index, 0, self.shape - 1)
+
+    def _bin_ids(self, coords: np.ndarray) -> np.ndarray:
+        index = self._bin_coords(coords)
+        ids = np.zeros(len(coords), dtype=np.int64)
+        for d in range(self.dim):
+            ids = ids * self.shape[d] + index[:, d]
+        return ids
+
+    def locate(
+        self, query: np.ndarray, tol: float = 1e-10
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the simplex containing each query point.
+
+        Args:
+            query: (m, 3) query points
+            tol: Tolerance on the barycentric coordinates, so points on
+                shared edges and faces are found
+
+        Returns:
+            tuple: (simplex index per point, -1 if outside the mesh;
+                barycentric coordinates (m, dim + 1))
+        """
+        query = np.asarray(query, dtype=np.float64)[:, : self.dim]
+        found = np.full(len(query), -1, dtype=np.int64)
+        weights = np.zeros((len(query), self.dim + 1))
+
+        for start in range(0, len(query), LOCATE_BATCH):
+            q = query[start : start + LOCATE_BATCH]
+            # Points outside the mesh fall into a border bin and fail the
+            # barycentric test below
+            bins = self._bin_ids(q)
+            counts = self.bin_start[bins + 1] - self.bin_start[bins]
+
+            # Candidate (point, simplex) pairs
+            point = np.repeat(np.arange(len(q)), counts)
+            offset = np.arange(counts.sum()) - np.repeat(
+                np.cumsum(counts) - counts, counts
+            )
+            simplex = self.bin_simplices[self.bin_start[bins[point]] + offset]
+
+            lam = np.einsum(
+                "nij,nj->ni", self.inverse[simplex], q[point] - self.origin[simplex]
+            )
+            bary = np.column_stack([1.0 - lam.sum(axis=1), lam])
+            hit = self.valid[simplex] & np.all(bary >= -tol, axis=1)
+
+            # First containing simplex per point
+            hit_pairs = np.flatnonzero(hit)
+            points_hit, first = np.unique(point[hit_pairs], return_index=True)
+            pairs = hit_pairs[first]
+            found[start + points_hit] = simplex[pairs]
+            weights[start + points_hit] = bary[pairs]
+
+        return found, weights
+
+
+def interpolate(
+    mesh: pv.UnstructuredGrid,
+    query: np.ndarray,
+    fields: Sequence[str],
+    fill_value: float = np.nan,
+    locator: Optional[PointLocator] = None,
+) -> np.ndarray:
+    """
+    Interpolate point data of a mesh linearly at query points.
+
+    Args:
+        mesh: Mesh with the fields as point data (e.g. from
+            GetDPReader.create_pyvista_mesh)
+        query: (m, 3) query points
+        fields: Point data names; vector fields contribute one channel per
+            component
+        fill_value: Value at points outside the mesh
+        locator: PointLocator of the mesh, to reuse it across calls
+
+    Returns:
+        (m, channels) array
+    """
+    if locator is None:
+        locator = PointLocator(mesh.points, mesh_simplices(mesh))
+    simplex, weights = locator.locate(query)
+    inside = simplex >= 0
+    corners = locator.simplices[simplex[inside]]
+
+    channels = []
+    for name in fields:
+        values = np.asarray(mesh.point_data[name], dtype=np.float64)
+        values = values.reshape(len(values), -1)
+        out = np.full((len(query), values.shape[1]), fill_value)
+        out[inside] = np.einsum("nk,nkc->nc", weights[inside], values[corners])
+        channels.append(out)
+    return np.hstack(channels)
+
+
+def resample_to_grid(
+    meshes: Iterable[pv.UnstructuredGrid],
+    grid: RegularGrid,
+    fields: Sequence[str],
+    fill_value: float = np.nan,
+) -> np.ndarray:
+    """
+    Resample fields of many samples onto the same regular grid.
+
+    Consecutive samples that share a mesh (the same point and cell arrays,
+    e.g. samples derived by linear superposition) reuse one spatial index.
+
+    Args:
+        meshes: One mesh per sample
+        grid: Target grid
+        fields: Point data names to resample
+        fill_value: Value at grid points outside a sample's mesh
+
+    Returns:
+        (n_samples, ny, nx, channels) array
+    """
+    query = grid.points()
+    locators = {}
+    samples: List[np.ndarray] = []
+
+    for mesh in meshes:
+        simplices = mesh_simplices(mesh)
+        key = (hash(np.asarray(mesh.points).tobytes()), hash(simplices.tobytes()))
+        if key not in locators:
+            # Keep only the latest index; samples sharing a mesh come in runs
+            locators = {key: PointLocator(mesh.points, simplices)}
+        values = interpolate(mesh, query, fields, fill_value, locators[key])
+        samples.append(values.reshape(grid.ny, grid.nx, -1))
+
+    if not samples:
+        return np.empty((0, grid.ny, grid.nx, 0))
+    return np.stack(samples)
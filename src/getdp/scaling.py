@@ -0,0 +1,79 @@
+from pathlib import Path
+from typing import Union
+
+from .dof import DOF_ASSOCIATED, DOF_FIXED_VALUE, DOF_INITIAL_VALUE
+
+# Column holding the value on a DOF line, per DOF type
+# (basis-function entity harmonic type ...)
+_DOF_VALUE_COLUMN = {
+    DOF_FIXED_VALUE: 4,
+    DOF_ASSOCIATED: 5,
+    DOF_INITIAL_VALUE: 5,
+}
+
+
+def _format(value: float) -> str:
+    return f"{value:.16g}"
+
+
+def scale_res_file(src: Union[str, Path], dst: Union[str, Path], factor: float) -> None:
+    """
+    Write a copy of a GetDP .res file with every solution value multiplied by factor.
+
+    The file is streamed line by line. Only the values inside $Solution blocks
+    are changed; block headers are copied as they are.
+
+    Args:
+        src: Path to the source .res file
+        dst: Path of the scaled .res file
+        factor: Scale factor applied to real and imaginary parts
+    """
+    with open(src, "r") as fin, open(dst, "w") as fout:
+        in_solution = False
+        header_pending = False
+        for line in fin:
+            if line.startswith("$Solution"):
+                in_solution = True
+                header_pending = True
+            elif line.startswith("$EndSolution"):
+                in_solution = False
+            elif in_solution and header_pending:
+                # DOFDATA-NUMBER TIME-VALUE TIME-IMAG-VALUE TIME-STEP-NUMBER
+                header_pending = False
+            elif in_solution and line.strip():
+                line = " ".join(_format(float(x) * factor) for x in line.split()) + "\n"
+            fout.write(line)
+
+
+def scale_pre_file(src: Union[str, Path], dst: Union[str, Path], factor: float) -> None:
+    """
+    Write a copy of a GetDP .pre file with constrained DOF values multiplied by factor.
+
+    FIXED_VALUE, ASSOCIATED_DOF and INITIAL_VALUE entries carry a prescribed
+    value (e.g. a Dirichlet potential); those values are scaled, everything
+    else is copied unchanged.
+
+    Args:
+        src: Path to the source .pre file
+        dst: Path of the scaled .pre file
+        factor: Scale factor applied to the prescribed values
+    """
+    with open(src, "r") as fin, open(dst, "w") as fout:
+        header_lines_left = None
+        for line in fin:
+            if line.startswith("$DofData"):
+                # Five header lines precede the DOF lines
+                header_lines_left = 5
+            elif line.startswith("$EndDofData"):
+                header_lines_left = None
+            elif header_lines_left:
+                header_lines_left -= 1
+            elif header_lines_left == 0:
+                parts = line.split()
+                column = (
+                    _DOF_VALUE_COLUMN.get(int(parts[3])) if len(parts) >= 5 else None
+                )
+                if column is not None and column < len(parts):
+                    parts[column] = _format(float(parts[column]) * factor)
+                    line = " ".join(parts) + "\n"
+            fout.write(line)
@@ -0,0 +1,81 @@
+import re
+from itertools import islice
+from typing import IO, Optional
+
+import numpy as np
+
+# Number of lines converted per call to np.fromstring when reading large blocks
+CHUNK_LINES = 1 << 16
+
+
+def skip_to_end(f: IO[str], end_marker: str):
+    """Advance the file past the line starting with end_marker (e.g. "$EndNodes")."""
+    for line in f:
+        if line.startswith(end_marker):
+            return
+
+
+def header_comment(line: str) -> str:
+    """Return the text inside /* ... */ on a section header line, or ""."""
+    match = re.search(r"/\*\s*(.*?)\s*\*/", line)
+    return match.group(1) if match else ""
+
+
+def read_value_block(
+    f: IO[str], end_marker: str, expected_rows: Optional[int] = None
+) -> np.ndarray:
+    """
+    Read numeric rows up to end_marker into a single preallocated array.
+
+    Lines are converted in chunks of CHUNK_LINES, so the file is never held in
+    memory. If expected_rows is known the output is allocated once; otherwise
+    it grows geometrically and is trimmed in place at the end.
+
+    Args:
+        f: Open text file positioned at the first data line
+        end_marker: Line prefix that terminates the block (e.g. "$EndSolution")
+        expected_rows: Number of rows, if known in advance
+
+    Returns:
+        Array of shape (rows, columns), columns taken from the first row
+    """
+    values = None
+    rows = 0
+    done = False
+
+    while not done:
+        chunk = []
+        n_read = 0
+        for line in islice(f, CHUNK_LINES):
+            n_read += 1
+            if line.startswith(end_marker):
+                done = True
+                break
+            if line.strip():
+                chunk.append(line)
+        if n_read < CHUNK_LINES:
+            # End marker found or end of file reached
+            done = True
+
+        if not chunk:
+            continue
+
+        block = np.fromstring("".join(chunk), dtype=np.float64, sep=" ").reshape(
+            len(chunk), -1
+        )
+        if values is None:
+            capacity = max(expected_rows or 0, len(block))
+            values = np.empty((capacity, block.shape[1]), dtype=np.float64)
+        if rows + len(block) > len(values):
+            values.resize(
+                (max(2 * len(values), rows + len(block)), values.shape[1]),
+                refcheck=False,
+            )
+        values[rows : rows + len(block)] = block
+        rows += len(block)
+
+    if values is None:
+        return np.empty((0, 1), dtype=np.float64)
+    if rows < len(values):
+        values.resize((rows, values.shape[1]), refcheck=False)
+    return values
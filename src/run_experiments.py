@@ -1,5 +1,37 @@
 from pathlib import Path
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    as_completed,
+    wait,
+)
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import multiprocessing
+import os
+import time
+from .experiments.campaign_index import INDEX_NAME, CampaignIndex
+from .experiments.dataset import DatasetWriter, build_dataset, load_sample_fields
+from .experiments.fidelity import mesh_parameters
 from .experiments.getdp_cli import GetDPCLI
+from .experiments.manifest import (
+    SampleManifest,
+    chain_hash,
+    changed_files,
+    rendered_inputs,
+    snapshot_files,
+)
+from .experiments.metrics import METRICS_NAME, MetricsWriter, stage_metrics
+from .experiments.mesh_cache import MeshCache, geo_dependencies, hash_files
+from .experiments.results import CampaignResults, SampleResults, shared_results
+from .experiments.scheduler import (
+    QUARANTINE_NAME,
+    CostModel,
+    JobQueue,
+    quarantine,
+    read_quarantine,
+)
+from .experiments.superposition import derive_scaled_experiment, group_linear_samples
 import subprocess
 import json
 
@@ -10,6 +42,17 @@ EXPERIMENT_FILES = {
     "magnetic_forces": {"geo": "magnets.geo", "pro": "magnets.pro"},
 }
 
+# Parameters each experiment type's solution is linear in. Scaling such a
+# parameter scales the fields by the same factor (e.g. the Dirichlet value
+# set on "Electrode" in microstrip.pro).
+LINEAR_PARAMETERS = {
+    "microstrip": ["initial_voltage"],
+}
+
+
+# PostOperations run for every sample
+POST_OPERATIONS = ("Map", "Cut")
+
 
 def get_experiment_type(exp_dir: Path) -> str:
     """
@@ -41,98 +84,793 @@ def get_experiment_type(exp_dir: Path) -> str:
         return None
 
 
-def run_all_experiments_and_save_results(
-    out_dir: str = "out",
-    getdp_path: str = "getdp",
-    gmsh_path: str = "gmsh",
-):
+def _names(files: Dict[str, List[Path]]) -> Dict[str, List[str]]:
+    return {key: [path.name for path in paths] for key, paths in files.items()}
+
+
+@dataclass
+class SampleJob:
     """
-    Run all experiments in out_dir, generate mesh with gmsh, process .pos files,
-    and save numpy arrays to simulations_dir. Optionally save VTK files for PyVista visualization.
+    One sample flowing through the pipeline: its rendered experiment
+    directory, together with the experiment type and parameters it was
+    rendered from, so that neither has to be recovered from the directory,
+    and the gmsh parser numbers it is meshed with (e.g. a coarser mesh size
+    factor, see src.campaigns.multi_fidelity).
     """
-    out_path = Path(out_dir)
-    getdp = GetDPCLI(getdp_path, gmsh_path)
 
-    for exp_dir in out_path.iterdir():
-        if not exp_dir.is_dir():
-            continue
+    exp_dir: Path
+    experiment_type: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    mesh_parameters: Dict[str, float] = field(default_factory=dict)
 
-        # Determine experiment type
-        exp_type = get_experiment_type(exp_dir)
-        if exp_type is None:
-            print(f"Skipping {exp_dir.name}: Unknown experiment type")
-            continue
 
-        if exp_type not in EXPERIMENT_FILES:
-            print(f"Skipping {exp_dir.name}: Unsupported experiment type '{exp_type}'")
-            continue
+def process_experiment_dir(
+    exp_dir: Path, resume: bool = True, getdp: Optional[GetDPCLI] = None
+) -> Dict[str, Any]:
+    """
+    Mesh, solve and post-process a single experiment directory whose
+    experiment type is determined from its files (see process_sample).
 
-        # Get the appropriate file names for this experiment type
-        file_config = EXPERIMENT_FILES[exp_type]
-        geo_file = exp_dir / file_config["geo"]
-        pro_file = exp_dir / file_config["pro"]
+    Args:
+        exp_dir: Path to the experiment directory
+        resume: Skip stages recorded as done in the manifest
+        getdp: GetDPCLI instance used to run gmsh and getDP; a default one is
+            created if not given
 
-        if not geo_file.exists() or not pro_file.exists():
-            print(
-                f"Skipping {exp_dir.name}: Missing required files ({file_config['geo']} or {file_config['pro']})"
-            )
-            continue
+    Returns:
+        dict: Result record (see process_sample)
+    """
+    exp_type = get_experiment_type(exp_dir)
+    if exp_type is None:
+        print(f"Skipping {exp_dir.name}: Unknown experiment type")
+        return {
+            "sample": exp_dir.name,
+            "experiment_type": None,
+            "status": "skipped",
+            "error": "Unknown experiment type",
+        }
+    return process_sample(
+        SampleJob(exp_dir, exp_type, mesh_parameters=mesh_parameters(exp_dir)),
+        resume,
+        getdp,
+    )
+
+
+def process_sample(
+    job: SampleJob, resume: bool = True, getdp: Optional[GetDPCLI] = None
+) -> Dict[str, Any]:
+    """
+    Mesh, solve and post-process a single rendered sample.
+
+    Progress is recorded per stage in the directory's manifest.json (see
+    SampleManifest). With resume=True, stages that already completed for the
+    same inputs are skipped, so an interrupted campaign continues where it
+    stopped, and quarantined samples (see run_pipeline) are skipped too.
+
+    Args:
+        job: The sample and its experiment type
+        resume: Skip stages recorded as done in the manifest
+        getdp: GetDPCLI instance used to run gmsh and getDP; a default one is
+            created if not given
+
+    Returns:
+        dict: Result record with the sample name, experiment type, status
+            ("ok", "skipped", "failed" or "quarantined"), the mesh content hash if meshed,
+            an error message if any, the manifest's stage entries, and the
+            seconds ("timings") and resource usage ("metrics", see
+            stage_metrics) of each stage that ran. A fused solve and
+            post-processing is counted under "solved".
+    """
+    if getdp is None:
+        getdp = GetDPCLI()
+
+    exp_dir = Path(job.exp_dir)
+    exp_type = job.experiment_type
+    result = {"sample": exp_dir.name, "experiment_type": exp_type, "status": "skipped"}
+
+    if exp_type is None:
+        print(f"Skipping {exp_dir.name}: Unknown experiment type")
+        result["error"] = "Unknown experiment type"
+        return result
+
+    if exp_type not in EXPERIMENT_FILES:
+        print(f"Skipping {exp_dir.name}: Unsupported experiment type '{exp_type}'")
+        result["error"] = f"Unsupported experiment type '{exp_type}'"
+        return result
+
+    # Get the appropriate file names for this experiment type
+    file_config = EXPERIMENT_FILES[exp_type]
+    geo_file = exp_dir / file_config["geo"]
+    pro_file = exp_dir / file_config["pro"]
+
+    if not geo_file.exists() or not pro_file.exists():
+        print(
+            f"Skipping {exp_dir.name}: Missing required files ({file_config['geo']} or {file_config['pro']})"
+        )
+        result["error"] = "Missing required files"
+        return result
+
+    if resume:
+        record = read_quarantine(exp_dir)
+        if record is not None:
+            print(f"Skipping {exp_dir.name}: Quarantined")
+            result["status"] = "quarantined"
+            result["error"] = record["errors"][-1] if record["errors"] else None
+            return result
+    else:
+        (exp_dir / QUARANTINE_NAME).unlink(missing_ok=True)
+
+    print(f"Processing {exp_type} experiment in {exp_dir.name}")
+    result["status"] = "failed"
+
+    manifest = SampleManifest(exp_dir)
+    timings: Dict[str, float] = {}
+    metrics: Dict[str, Dict[str, Any]] = {}
+    result["stages"] = manifest.stages
+    result["timings"] = timings
+    result["metrics"] = metrics
+    # Usage left over from work outside this sample is not attributed to it
+    getdp.monitor.drain()
+
+    def measure(stage: str, started: float, *output_stages: str):
+        outputs = [
+            exp_dir / name
+            for name_stage in (stage,) + output_stages
+            for name in manifest.stages.get(name_stage, {}).get("outputs", [])
+        ]
+        metrics[stage] = stage_metrics(
+            getdp.monitor.drain(), time.perf_counter() - started, outputs
+        )
+        timings[stage] = metrics[stage]["wall_seconds"]
+
+    def done(stage: str, input_hash: str) -> bool:
+        if resume and manifest.is_done(stage, input_hash):
+            print(f"  {stage}: up to date")
+            return True
+        return False
 
-        print(f"Processing {exp_type} experiment in {exp_dir.name}")
+    # Keep the record of the rendered inputs current. Edits only invalidate
+    # the stages whose own input hashes change (e.g. a .pro edit keeps the mesh).
+    inputs = rendered_inputs(exp_dir, file_config["geo"], file_config["pro"])
+    rendered_hash = hash_files(inputs)
+    if not manifest.is_done("rendered", rendered_hash):
+        manifest.complete("rendered", rendered_hash, inputs, invalidate_later=False)
 
-        # Generate mesh with gmsh
+    # Generate mesh with gmsh
+    mesh_hash = getdp.mesh_key(geo_file, parameters=job.mesh_parameters)
+    mesh_file = geo_file.with_suffix(".msh")
+    if not done("meshed", mesh_hash):
         print("  Generating mesh...")
+        started = time.perf_counter()
         try:
-            mesh_file = getdp.generate_mesh(geo_file)
+            mesh_file = getdp.generate_mesh(geo_file, parameters=job.mesh_parameters)
+            manifest.complete("meshed", mesh_hash, [mesh_file])
+            measure("meshed", started)
             print("  Mesh generated successfully")
-        except subprocess.CalledProcessError as e:
+        except Exception as e:
             print(f"  Error generating mesh: {e}")
-            continue
+            manifest.fail("meshed", mesh_hash, str(e))
+            measure("meshed", started)
+            result["error"] = f"mesh: {e}"
+            return result
+    result["mesh_ref"] = mesh_hash
 
-        # Run solver and post-processing
-        try:
-            print("  Running solver...")
-            getdp.run_solver(pro_file)
+    # Run solver and post-processing
+    solve_hash = chain_hash(
+        mesh_hash, hash_files([pro_file] + geo_dependencies(pro_file))
+    )
+    post_hash = chain_hash(solve_hash, POST_OPERATIONS)
+    stage, stage_hash = "solved", solve_hash
+    started = time.perf_counter()
+    try:
+        if not done("solved", solve_hash):
+            # Solve and post-process in one getdp process
+            print("  Running solver and post-processing...")
+            before = snapshot_files(exp_dir)
+            post_files = getdp.run_solve_and_post(
+                pro_file, post_operations=POST_OPERATIONS
+            )
+            written = changed_files(exp_dir, before)
+            solution = [f"{pro_file.stem}.pre", f"{pro_file.stem}.res"]
+            manifest.complete(
+                "solved", solve_hash, [name for name in solution if name in written]
+            )
+            manifest.complete(
+                "post_processed",
+                post_hash,
+                [name for name in written if name not in solution],
+                details={"operations": _names(post_files)},
+            )
+            measure("solved", started, "post_processed")
+            print("  Post-processing completed")
+        elif not done("post_processed", post_hash):
+            stage, stage_hash = "post_processed", post_hash
             print("  Running post-processing...")
+            before = snapshot_files(exp_dir)
+            getdp.run_post(pro_file, POST_OPERATIONS)
+            post_files = getdp.post_outputs(pro_file, POST_OPERATIONS)
+            manifest.complete(
+                "post_processed",
+                post_hash,
+                changed_files(exp_dir, before),
+                details={"operations": _names(post_files)},
+            )
+            measure("post_processed", started)
+            print("  Post-processing completed")
+    except subprocess.SubprocessError as e:
+        # Errors, and runs killed after the GetDPCLI's timeout
+        print(f"  Error running getDP: {e}")
+        manifest.fail(stage, stage_hash, str(e))
+        measure(stage, started)
+        result["error"] = f"getdp: {e}"
+        return result
 
-            getdp.run_post_vtk(pro_file, mesh_file, "Map")
-            getdp.run_post_vtk(pro_file, mesh_file, "Cut")
+    # Convert .pos files to VTK format
+    if not done("converted", post_hash):
+        started = time.perf_counter()
+        try:
+            pos_files = sorted(exp_dir.glob("*.pos"))
+            # Only .pos files newer than their VTK file are converted
+            getdp.convert_pos_files(pos_files, mesh_file, force=not resume)
+            manifest.complete(
+                "converted", post_hash, [p.with_suffix(".vtk") for p in pos_files]
+            )
+            measure("converted", started)
+        except Exception as e:
+            print(f"  Error converting .pos files: {e}")
+            manifest.fail("converted", post_hash, str(e))
+            measure("converted", started)
+            result["error"] = f"convert: {e}"
+            return result
 
-            print("  Post-processing completed")
-        except subprocess.CalledProcessError as e:
-            print(f"  Error running getDP: {e}")
-            continue
+    vtk_files = list(exp_dir.glob("*.vtk"))
+    if vtk_files:
+        print(f"  Generated VTK files: {[f.name for f in vtk_files]}")
+
+    result["status"] = "ok"
+    return result
+
+
+# Per-process GetDPCLI used by pool workers. Each worker is a separate process,
+# so the in-process gmsh state used for meshing and .pos conversion is isolated.
+_worker_getdp: Optional[GetDPCLI] = None
+
+
+def _make_getdp(
+    getdp_path: str,
+    gmsh_path: str,
+    mesh_cache_dir: Optional[str],
+    mesh_cache_max_bytes: int,
+    timeout: Optional[float] = None,
+    memory_limit: Optional[int] = None,
+) -> GetDPCLI:
+    mesh_cache = (
+        MeshCache(mesh_cache_dir, mesh_cache_max_bytes)
+        if mesh_cache_dir is not None
+        else None
+    )
+    return GetDPCLI(
+        getdp_path,
+        gmsh_path,
+        mesh_cache=mesh_cache,
+        timeout=timeout,
+        memory_limit=memory_limit,
+    )
+
+
+def _init_worker(*getdp_args):
+    global _worker_getdp
+    _worker_getdp = _make_getdp(*getdp_args)
+
+
+def _failed_result(exp_dir: Path, error: Exception) -> Dict[str, Any]:
+    return {
+        "sample": exp_dir.name,
+        "experiment_type": None,
+        "status": "failed",
+        "error": repr(error),
+    }
+
+
+def _run_in_worker(task: Callable, exp_dir: Path, *args) -> Dict[str, Any]:
+    try:
+        return task(exp_dir, *args, getdp=_worker_getdp)
+    except Exception as e:
+        return _failed_result(exp_dir, e)
+
+
+def _run_job(job: SampleJob, resume: bool, getdp: GetDPCLI) -> Dict[str, Any]:
+    # Errors outside the stages process_sample guards (e.g. a missing getdp
+    # executable) fail the sample instead of the whole run
+    try:
+        return process_sample(job, resume, getdp)
+    except Exception as e:
+        result = _failed_result(Path(job.exp_dir), e)
+        result["experiment_type"] = job.experiment_type
+        return result
+
+
+def _run_job_in_worker(job: SampleJob, resume: bool) -> Dict[str, Any]:
+    return _run_job(job, resume, _worker_getdp)
+
+
+def _derive_task(
+    exp_dir: Path, source_dir: Path, factor: float, resume: bool, getdp: GetDPCLI
+) -> Dict[str, Any]:
+    exp_type = get_experiment_type(exp_dir)
+    result = derive_scaled_experiment(
+        exp_dir,
+        source_dir,
+        factor,
+        EXPERIMENT_FILES[exp_type],
+        getdp,
+        POST_OPERATIONS,
+        resume=resume,
+    )
+    result["experiment_type"] = exp_type
+    return result
+
+
+def _run_tasks(
+    task: Callable,
+    task_args: List[Tuple],
+    n_workers: int,
+    getdp_args: Tuple,
+) -> List[Dict[str, Any]]:
+    """
+    Run task(exp_dir, *args, getdp=...) for every args tuple in task_args.
+
+    With n_workers > 1 the calls are distributed over a process pool whose
+    workers each own a GetDPCLI (and thus their own gmsh state).
+    """
+    n_workers = min(n_workers, max(len(task_args), 1))
+    results = []
 
-        vtk_files = list(exp_dir.glob("*.vtk"))
-        if vtk_files:
-            print(f"  Generated VTK files: {[f.name for f in vtk_files]}")
+    if n_workers == 1:
+        getdp = _make_getdp(*getdp_args)
+        for args in task_args:
+            try:
+                results.append(task(*args, getdp=getdp))
+            except Exception as e:
+                # Recorded like a failure in a pool worker (see _run_in_worker)
+                results.append(_failed_result(args[0], e))
+        return results
 
+    print(f"Processing {len(task_args)} experiments with {n_workers} workers")
+    # "spawn" gives every worker a fresh interpreter, so no gmsh state is
+    # inherited from the parent process.
+    with ProcessPoolExecutor(
+        max_workers=n_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=getdp_args,
+    ) as executor:
+        futures = {
+            executor.submit(_run_in_worker, task, *args): args[0] for args in task_args
+        }
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                # The worker process itself died (e.g. a crash inside gmsh)
+                results.append(_failed_result(futures[future], e))
 
-def load_vtk_results(experiment_dir: str):
+    return results
+
+
+def _read_params(exp_dir: Path) -> Dict[str, Any]:
+    try:
+        with open(exp_dir / "config.json", "r") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _print_summary(results: List[Dict[str, Any]]):
+    n_ok = sum(r["status"] == "ok" for r in results)
+    n_failed = sum(r["status"] == "failed" for r in results)
+    n_skipped = sum(r["status"] == "skipped" for r in results)
+    n_quarantined = sum(r["status"] == "quarantined" for r in results)
+    print(
+        f"Finished: {n_ok} succeeded, {n_failed} failed, {n_skipped} skipped, "
+        f"{n_quarantined} quarantined"
+    )
+    for r in results:
+        if r["status"] in ("failed", "quarantined"):
+            print(f"  {r['sample']} ({r['status']}): {r.get('error')}")
+
+
+def _add_to_dataset(
+    dataset: DatasetWriter, job: SampleJob, result: Dict[str, Any]
+) -> None:
+    exp_dir = Path(job.exp_dir)
+    fields = load_sample_fields(exp_dir) if result["status"] == "ok" else {}
+    dataset.add(
+        result["sample"],
+        job.experiment_type,
+        result["status"],
+        job.params,
+        fields,
+        result.get("mesh_ref", ""),
+    )
+
+
+def _native(value: Any) -> Any:
+    # numpy scalars -> Python scalars, so parameters stay JSON serializable
+    return value.item() if hasattr(value, "item") else value
+
+
+def iter_sample_jobs(
+    experiment_type: str,
+    chunks: Iterable[Optional[List[Path]]],
+    sampled_params: Dict[str, Any],
+) -> Iterator[SampleJob]:
     """
-    Load VTK files for a specific experiment using PyVista.
+    Turn the chunks of experiment directories yielded while rendering (see
+    experiment_registry.iter_experiment) into SampleJobs.
+
+    Directories are matched to sampled_params by position, so the runner has
+    to report its directories in the order of the contexts.
 
     Args:
-        experiment_dir: Name of the experiment directory
+        experiment_type: Type of the rendered experiment
+        chunks: Lists of rendered experiment directories
+        sampled_params: Parameter name -> sampled values, as rendered
+
+    Yields:
+        SampleJob: One job per rendered directory, as soon as its chunk is rendered
+    """
+    start = 0
+    for chunk in chunks:
+        if chunk is None:
+            raise ValueError(
+                f"Runner of '{experiment_type}' does not report its experiment directories"
+            )
+        for i, exp_dir in enumerate(chunk):
+            params = {
+                name: _native(values[start + i])
+                for name, values in sampled_params.items()
+            }
+            yield SampleJob(Path(exp_dir), experiment_type, params)
+        start += len(chunk)
+
+
+def run_pipeline(
+    jobs: Iterable[SampleJob],
+    getdp_path: str = "getdp",
+    gmsh_path: str = "gmsh",
+    n_workers: int = 1,
+    mesh_cache_dir: Optional[str] = None,
+    mesh_cache_max_bytes: int = 10 * 1024**3,
+    resume: bool = True,
+    dataset: Optional[DatasetWriter] = None,
+    index: Optional[CampaignIndex] = None,
+    metrics: Optional[MetricsWriter] = None,
+    max_pending: Optional[int] = None,
+    timeout: Optional[float] = None,
+    memory_limit: Optional[int] = None,
+    max_attempts: int = 2,
+    cost_model: Optional[CostModel] = None,
+    window: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Mesh, solve, post-process and extract samples as they arrive.
+
+    Unlike run_all_experiments_and_save_results, which scans an output
+    directory once rendering has finished, jobs are consumed lazily: a sample
+    is submitted as soon as the jobs iterable yields it, e.g. while later
+    chunks are still being rendered. Its experiment type and parameters are
+    taken from the job instead of being recovered from its directory.
+
+    Buffered samples are dispatched longest first, as predicted by the cost
+    model, so that expensive samples do not end up running alone at the end.
+    A sample that fails is retried (resuming from its last completed stage)
+    until it has failed max_attempts times; it is then quarantined: its
+    directory gets a quarantine.json and later runs with resume=True skip it.
+
+    Args:
+        jobs: Samples to process
+        getdp_path: Path to the getdp executable
+        gmsh_path: Path to the gmsh executable
+        n_workers: Number of worker processes; 0 or a negative value for
+            os.cpu_count()
+        mesh_cache_dir: Directory of a MeshCache shared by all workers
+        mesh_cache_max_bytes: Size limit of the mesh cache
+        resume: Skip the stages each sample's manifest.json records as done
+        dataset: If given, every finished sample is added to this dataset
+        index: If given, samples are registered in this campaign index when
+            submitted and their results recorded when finished
+        metrics: If given, the stage metrics of every finished sample are
+            written to it
+        max_pending: Maximum number of submitted but unfinished samples, which
+            bounds how far rendering runs ahead of solving. Defaults to
+            2 * n_workers.
+        timeout: Seconds after which a getdp run is killed and the sample fails
+        memory_limit: Address space limit of every getdp run in bytes
+        max_attempts: Number of times a failing sample is run before it is
+            quarantined
+        cost_model: Predicts the run time of samples; defaults to a CostModel
+            fitted on the history in index
+        window: Number of samples read ahead and ordered by predicted cost.
+            Defaults to 4 * max_pending.
 
     Returns:
-        dict: Dictionary mapping VTK file names to PyVista mesh objects
+        list: One result record per job, in order of completion (see
+            process_sample). Failed attempts that were retried are not included.
     """
-    exp_path = Path("out") / experiment_dir
+    if n_workers <= 0:
+        n_workers = os.cpu_count() or 1
+    if max_pending is None:
+        max_pending = 2 * n_workers
+    if window is None:
+        window = 4 * max_pending
+    if cost_model is None:
+        cost_model = CostModel(index)
 
-    vtk_results = {}
+    getdp_args = (
+        getdp_path,
+        gmsh_path,
+        mesh_cache_dir,
+        mesh_cache_max_bytes,
+        timeout,
+        memory_limit,
+    )
+    results = []
+    # Errors of the failed attempts of each sample
+    failures: Dict[str, List[str]] = {}
 
-    # Load VTK files directly from experiment directory
-    for vtk_file in exp_path.glob("*.vtk"):
-        try:
-            mesh = GetDPCLI.load_vtk_file(vtk_file)
-            if mesh is not None:
-                vtk_results[vtk_file.name] = mesh
-                print(f"Loaded VTK file: {vtk_file.name}")
-        except Exception as e:
-            print(f"Error loading {vtk_file}: {e}")
+    def submitted(job: SampleJob):
+        if index is not None:
+            index.add_sample(
+                Path(job.exp_dir).name, job.experiment_type, job.exp_dir, job.params
+            )
+
+    queue = JobQueue(jobs, cost_model, window, on_read=submitted)
+
+    def job_resume(job: SampleJob) -> bool:
+        # Retries keep the stages the failed attempt completed
+        return resume or Path(job.exp_dir).name in failures
+
+    def finish(job: SampleJob, result: Dict[str, Any]):
+        if index is not None:
+            index.record_result(result)
+        if metrics is not None:
+            metrics.add(result)
+        timings = result.get("timings", {})
+        if "solved" in timings:
+            nodes = result.get("metrics", {}).get("meshed", {}).get("nodes")
+            cost_model.add(
+                job.experiment_type, job.params, sum(timings.values()), nodes
+            )
+
+        sample = result["sample"]
+        if result["status"] == "failed":
+            errors = failures.setdefault(sample, [])
+            errors.append(result.get("error"))
+            if len(errors) < max_attempts:
+                print(
+                    f"  {sample}: failed ({result.get('error')}), "
+                    f"retrying ({len(errors) + 1}/{max_attempts})"
+                )
+                queue.push(job)
+                return
+            quarantine(job.exp_dir, errors)
+            result["status"] = "quarantined"
+            if index is not None:
+                index.record_result(result)
+
+        results.append(result)
+        if dataset is not None:
+            _add_to_dataset(dataset, job, result)
+        print(f"  [{len(results)}] {sample}: {result['status']}")
+
+    if n_workers == 1:
+        getdp = _make_getdp(*getdp_args)
+        while (job := queue.pop()) is not None:
+            finish(job, _run_job(job, job_resume(job), getdp))
+        _print_summary(results)
+        return results
+
+    print(f"Processing samples with {n_workers} workers")
+    with ProcessPoolExecutor(
+        max_workers=n_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=getdp_args,
+    ) as executor:
+        pending = {}
+
+        def collect(return_when: str):
+            done, _ = wait(pending, return_when=return_when)
+            for future in done:
+                job = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # The worker process itself died (e.g. a crash inside gmsh)
+                    result = _failed_result(Path(job.exp_dir), e)
+                    result["experiment_type"] = job.experiment_type
+                finish(job, result)
 
-    return vtk_results
+        while True:
+            while len(pending) < max_pending:
+                job = queue.pop()
+                if job is None:
+                    break
+                future = executor.submit(_run_job_in_worker, job, job_resume(job))
+                pending[future] = job
+            if not pending:
+                break
+            # Finished samples may queue retries, so refill after each one
+            collect(FIRST_COMPLETED)
+
+    _print_summary(results)
+    return results
+
+
+def run_all_experiments_and_save_results(
+    out_dir: str = "out",
+    getdp_path: str = "getdp",
+    gmsh_path: str = "gmsh",
+    n_workers: int = 1,
+    mesh_cache_dir: Optional[str] = None,
+    mesh_cache_max_bytes: int = 10 * 1024**3,
+    linear_superposition: bool = False,
+    resume: bool = True,
+    dataset_dir: Optional[str] = None,
+    dataset_chunk_size: int = 256,
+    index_path: Optional[str] = None,
+    metrics_path: Optional[str] = None,
+    timeout: Optional[float] = None,
+    memory_limit: Optional[int] = None,
+    max_attempts: int = 2,
+) -> List[Dict[str, Any]]:
+    """
+    Run all experiments in out_dir, generate mesh with gmsh, process .pos files
+    to VTK files for PyVista visualization, and optionally collect all samples
+    into one consolidated dataset of numpy arrays.
+
+    Args:
+        out_dir: Directory containing one sub-directory per experiment
+        getdp_path: Path to the getdp executable
+        gmsh_path: Path to the gmsh executable
+        n_workers: Number of worker processes. With n_workers > 1 the experiment
+            directories are distributed over a process pool; each worker owns
+            its own gmsh state. Use 0 or a negative value for os.cpu_count().
+        mesh_cache_dir: Directory of a MeshCache shared by all workers. Samples
+            whose rendered geometry is identical then reuse one mesh.
+        mesh_cache_max_bytes: Size limit of the mesh cache
+        linear_superposition: Solve only one sample per group of samples that
+            differ only in LINEAR_PARAMETERS, and derive the others by scaling
+            its solution. Derived samples get a provenance.json.
+        resume: Skip the stages each sample's manifest.json records as done
+            for unchanged inputs. Set to False to redo every stage.
+        dataset_dir: If given, write the parameters, status, mesh references
+            and solution fields of all samples to this directory as a chunked
+            dataset (see src.experiments.dataset.Dataset)
+        dataset_chunk_size: Number of samples per dataset chunk
+        index_path: Campaign index the samples and their results are recorded
+            in (see CampaignIndex); defaults to out_dir/campaign.sqlite
+        metrics_path: File the stage metrics are appended to (see
+            MetricsWriter); defaults to out_dir/metrics.jsonl. A summary with
+            percentiles per stage is printed at the end.
+        timeout: Seconds after which a getdp run is killed and the sample fails
+        memory_limit: Address space limit of every getdp run in bytes
+        max_attempts: Number of times a failing sample is run before it is
+            quarantined (see run_pipeline)
+
+    Returns:
+        list: One result record per experiment directory (see process_sample)
+    """
+    out_path = Path(out_dir)
+    exp_dirs = sorted(d for d in out_path.iterdir() if d.is_dir())
+
+    if n_workers <= 0:
+        n_workers = os.cpu_count() or 1
+
+    getdp_args = (
+        getdp_path,
+        gmsh_path,
+        mesh_cache_dir,
+        mesh_cache_max_bytes,
+        timeout,
+        memory_limit,
+    )
+
+    derived = []
+    if linear_superposition:
+        # Solve one sample per group of identical non-linear parameters and
+        # derive the others by scaling its solution
+        samples = [(exp_dir, get_experiment_type(exp_dir)) for exp_dir in exp_dirs]
+        exp_dirs, derived = group_linear_samples(samples, LINEAR_PARAMETERS)
+        if derived:
+            print(
+                f"Linear superposition: solving {len(exp_dirs)} samples, "
+                f"deriving {len(derived)} by scaling"
+            )
+
+    def jobs(dirs: List[Path]) -> List[SampleJob]:
+        return [
+            SampleJob(
+                exp_dir,
+                get_experiment_type(exp_dir),
+                _read_params(exp_dir),
+                mesh_parameters(exp_dir),
+            )
+            for exp_dir in dirs
+        ]
+
+    with CampaignIndex(index_path or out_path / INDEX_NAME) as index, MetricsWriter(
+        metrics_path or out_path / METRICS_NAME
+    ) as metrics:
+        pipeline_kwargs = {
+            "getdp_path": getdp_path,
+            "gmsh_path": gmsh_path,
+            "n_workers": n_workers,
+            "mesh_cache_dir": mesh_cache_dir,
+            "mesh_cache_max_bytes": mesh_cache_max_bytes,
+            "resume": resume,
+            "index": index,
+            "metrics": metrics,
+            "timeout": timeout,
+            "memory_limit": memory_limit,
+            "max_attempts": max_attempts,
+            # Order all samples by their predicted cost
+            "window": max(len(exp_dirs), 1),
+        }
+        results = run_pipeline(jobs(exp_dirs), **pipeline_kwargs)
+
+        if derived:
+            solved = {r["sample"] for r in results if r["status"] == "ok"}
+            derivable = [d + (resume,) for d in derived if d[1].name in solved]
+            # Samples whose source failed are solved on their own instead
+            fallback = [d[0] for d in derived if d[1].name not in solved]
+            derived_results = _run_tasks(_derive_task, derivable, n_workers, getdp_args)
+            for r in derived_results:
+                exp_dir = out_path / r["sample"]
+                index.add_sample(
+                    r["sample"], r["experiment_type"], exp_dir, _read_params(exp_dir)
+                )
+                index.record_result(r)
+                metrics.add(r)
+            results += derived_results
+            results += run_pipeline(jobs(fallback), **pipeline_kwargs)
+            _print_summary(results)
+
+        if metrics.values:
+            print(metrics.report())
+
+    if dataset_dir is not None:
+        build_dataset(dataset_dir, out_path, results, dataset_chunk_size)
+
+    return results
+
+
+def load_vtk_results(
+    experiment_dir: str,
+    out_dir: str = "out",
+    results: Optional[CampaignResults] = None,
+) -> SampleResults:
+    """
+    Access the result files of a specific experiment: its GetDP solutions
+    (e.g. "microstrip.res") and VTK files.
+
+    Nothing is read up front: each mesh is loaded when it is first accessed
+    (see CampaignResults, which also lists samples and loads single arrays). Calls for the same out_dir share one CampaignResults,
+    and with it the cache of loaded meshes.
+
+    Args:
+        experiment_dir: Name of the experiment directory
+        out_dir: Directory containing the experiment directories
+        results: CampaignResults to load through instead of the shared one
+            of out_dir
+
+    Returns:
+        SampleResults: Mapping of result file names to PyVista meshes
+    """
+    if results is None:
+        results = shared_results(out_dir)
+    return results[experiment_dir]
 
 
 if __name__ == "__main__":
@@ -1,10 +1,27 @@
 import numpy as np
 from dataclasses import asdict
+from typing import Optional
 from .base import Sampler
 from .uniform import Uniform
 from .normal import Normal
 from .loguniform import LogUniform
 from .uniform_discrete import UniformDiscrete
+from .design import (
+    DesignSampler,
+    load_design_offset,
+    sample_design,
+    save_design_offset,
+    unit_to_params,
+)
+from .sobol import Sobol
+from .halton import Halton
+from .latin_hypercube import LatinHypercube
+from .streams import (
+    describe_params,
+    record_campaign_run,
+    sample_params,
+    start_campaign_run,
+)
 
 
 SAMPLER_MAP = {
@@ -14,12 +31,31 @@ SAMPLER_MAP = {
     "uniform_discrete": UniformDiscrete,
 }
 
+# Joint designs over all parameters of an experiment (the "design" entry of an
+# experiment config)
+DESIGN_MAP = {
+    "sobol": Sobol,
+    "halton": Halton,
+    "lhs": LatinHypercube,
+}
+
 
 def get_sampler(sampler_name: str) -> Sampler:
+    if sampler_name in DESIGN_MAP:
+        raise ValueError(
+            f"'{sampler_name}' is a joint design; set it as the experiment's "
+            "design instead of a parameter's sampler"
+        )
     return SAMPLER_MAP[sampler_name]
 
 
-def sample_param(param_cfg, n_samples: int) -> np.ndarray:
+def get_design(design_name: str) -> DesignSampler:
+    return DESIGN_MAP[design_name]
+
+
+def sample_param(
+    param_cfg, n_samples: int, rng: Optional[np.random.Generator] = None
+) -> np.ndarray:
     sampler_name = param_cfg.sampler
     sampler = SAMPLER_MAP[sampler_name](**asdict(param_cfg))
-    return sampler.sample(n_samples)
+    return sampler.sample(n_samples, rng)
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
+from typing import Optional
 
 import numpy as np
 
@@ -9,5 +10,21 @@ class Sampler(ABC):
     sampler: str
 
     @abstractmethod
-    def sample(self, n_samples: int) -> np.ndarray:
-        pass
+    def sample(
+        self, n_samples: int, rng: Optional[np.random.Generator] = None
+    ) -> np.ndarray:
+        """
+        Draw n_samples values.
+
+        Args:
+            n_samples: Number of values
+            rng: Random generator to draw from; a freshly seeded one if None
+        """
+
+    @abstractmethod
+    def ppf(self, u: np.ndarray) -> np.ndarray:
+        """Map points u in (0, 1) through the inverse CDF of the distribution."""
+
+
+def resolve_rng(rng: Optional[np.random.Generator]) -> np.random.Generator:
+    return rng if rng is not None else np.random.default_rng()
@@ -0,0 +1,144 @@
+import json
+import os
+import tempfile
+from abc import abstractmethod
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from .base import Sampler
+
+# Keeps design points strictly inside (0, 1), where every inverse CDF is finite
+_EPS = 2.0**-53
+
+
+@dataclass
+class DesignSampler(Sampler):
+    """
+    Joint sampler producing a space-filling design in the unit hypercube.
+
+    Unlike the marginal samplers, a design sampler draws all parameters of an
+    experiment together. Each column is then mapped through the inverse CDF
+    of the parameter's own sampler (see sample_design). It has no values or
+    distribution of its own, so it cannot be a parameter's sampler.
+    """
+
+    seed: int = 0
+
+    @abstractmethod
+    def sample_unit(self, n_samples: int, dim: int, offset: int = 0) -> np.ndarray:
+        """
+        Points n = offset, ..., offset + n_samples - 1 of the design.
+
+        Returns:
+            (n_samples, dim) array in (0, 1)
+        """
+
+    def sample(
+        self, n_samples: int, rng: Optional[np.random.Generator] = None
+    ) -> np.ndarray:
+        raise TypeError(
+            f"'{self.sampler}' is a joint design over all parameters; use it as "
+            "the experiment's design, not as a parameter's sampler"
+        )
+
+    def ppf(self, u: np.ndarray) -> np.ndarray:
+        raise TypeError(f"'{self.sampler}' is a joint design and has no inverse CDF")
+
+
+def sample_design(
+    design: DesignSampler,
+    params: Dict[str, Sampler],
+    n_samples: int,
+    offset: int = 0,
+) -> Dict[str, np.ndarray]:
+    """
+    Sample all parameters jointly from a design.
+
+    Args:
+        design: Design sampler
+        params: Parameter name -> marginal sampler; the order of the mapping
+            assigns the design dimensions
+        n_samples: Number of points
+        offset: Index of the first point, to continue an earlier design
+
+    Returns:
+        dict: Parameter name -> sampled values
+    """
+    return unit_to_params(design.sample_unit(n_samples, len(params), offset), params)
+
+
+def unit_to_params(
+    unit: np.ndarray, params: Dict[str, Sampler]
+) -> Dict[str, np.ndarray]:
+    """Map (n, len(params)) unit-hypercube points through the marginals' inverse CDFs."""
+    unit = np.clip(unit, _EPS, 1 - _EPS)
+    return {
+        name: sampler.ppf(unit[:, j])
+        for j, (name, sampler) in enumerate(params.items())
+    }
+
+
+def _design_signature(
+    design: DesignSampler, params: Dict[str, Sampler]
+) -> Dict[str, Any]:
+    return {
+        "design": asdict(design),
+        "parameters": {name: asdict(sampler) for name, sampler in params.items()},
+    }
+
+
+def load_design_offset(
+    state_file: Path, key: str, design: DesignSampler, params: Dict[str, Sampler]
+) -> int:
+    """
+    Number of design points already drawn for key in an earlier run.
+
+    The stored offset is only used if the design and the parameter samplers
+    are unchanged; otherwise the design starts again from 0.
+    """
+    try:
+        with open(state_file, "r") as f:
+            entry = json.load(f).get(key)
+    except (OSError, json.JSONDecodeError):
+        return 0
+    if not entry:
+        return 0
+    if entry.get("signature") != _design_signature(design, params):
+        print(f"Design for '{key}' changed; starting a new sequence")
+        return 0
+    return int(entry.get("next_index", 0))
+
+
+def save_design_offset(
+    state_file: Path,
+    key: str,
+    design: DesignSampler,
+    params: Dict[str, Sampler],
+    next_index: int,
+):
+    """Record how many design points have been drawn for key."""
+    state_file = Path(state_file)
+    state: Dict[str, Any] = {}
+    try:
+        with open(state_file, "r") as f:
+            state = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        pass
+
+    state[key] = {
+        "signature": _design_signature(design, params),
+        "next_index": next_index,
+    }
+
+    state_file.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=state_file.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(state, f, indent=2, default=str)
+        os.replace(tmp_name, state_file)
+    finally:
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
@@ -0,0 +1,52 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from .design import DesignSampler
+
+
+def first_primes(n: int) -> np.ndarray:
+    """The first n prime numbers."""
+    primes = []
+    candidate = 2
+    while len(primes) < n:
+        if all(candidate % p for p in primes if p * p <= candidate):
+            primes.append(candidate)
+        candidate += 1
+    return np.array(primes, dtype=np.int64)
+
+
+def radical_inverse(index: np.ndarray, base: int) -> np.ndarray:
+    """Van der Corput radical inverse of integer indices in the given base."""
+    index = np.asarray(index, dtype=np.int64).copy()
+    result = np.zeros(len(index))
+    scale = 1.0 / base
+    while np.any(index > 0):
+        result += (index % base) * scale
+        index //= base
+        scale /= base
+    return result
+
+
+@dataclass
+class Halton(DesignSampler):
+    """
+    Halton sequence with the first primes as bases.
+
+    The sequence starts at index 1, skipping the point at the origin. With
+    scramble=True each dimension is shifted by a random amount (modulo 1)
+    drawn from seed. Point n depends only on n, so a design can be extended
+    with offset.
+    """
+
+    scramble: bool = True
+
+    def sample_unit(self, n_samples: int, dim: int, offset: int = 0) -> np.ndarray:
+        index = np.arange(offset + 1, offset + n_samples + 1)
+        points = np.column_stack(
+            [radical_inverse(index, base) for base in first_primes(dim)]
+        ).reshape(n_samples, dim)
+        if self.scramble:
+            rng = np.random.default_rng(self.seed)
+            points = (points + rng.random(dim)) % 1.0
+        return points
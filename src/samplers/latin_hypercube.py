@@ -0,0 +1,22 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from .design import DesignSampler
+
+
+@dataclass
+class LatinHypercube(DesignSampler):
+    """
+    Latin hypercube design: every parameter range is split into n_samples
+    equal strata and each stratum is sampled exactly once.
+
+    A Latin hypercube is not a sequence, so extending a design with offset
+    draws a new, independent Latin hypercube for the added points (seeded by
+    seed and offset). Each batch is stratified on its own.
+    """
+
+    def sample_unit(self, n_samples: int, dim: int, offset: int = 0) -> np.ndarray:
+        rng = np.random.default_rng([self.seed, offset])
+        strata = rng.permuted(np.tile(np.arange(n_samples), (dim, 1)), axis=1).T
+        return (strata + rng.random((n_samples, dim))) / n_samples
@@ -1,8 +1,9 @@
 from dataclasses import dataclass
+from typing import Optional
 
 import numpy as np
 
-from .base import Sampler
+from .base import Sampler, resolve_rng
 
 
 @dataclass
@@ -10,5 +11,13 @@ class LogUniform(Sampler):
     min: float
     max: float
 
-    def sample(self, n_samples: int) -> np.ndarray:
-        return np.exp(np.random.uniform(np.log(self.min), np.log(self.max), n_samples))
+    def sample(
+        self, n_samples: int, rng: Optional[np.random.Generator] = None
+    ) -> np.ndarray:
+        return np.exp(
+            resolve_rng(rng).uniform(np.log(self.min), np.log(self.max), n_samples)
+        )
+
+    def ppf(self, u: np.ndarray) -> np.ndarray:
+        log_min, log_max = np.log(self.min), np.log(self.max)
+        return np.exp(log_min + np.asarray(u) * (log_max - log_min))
@@ -1,8 +1,68 @@
 from dataclasses import dataclass
+from typing import Optional
 
 import numpy as np
 
-from .base import Sampler
+from .base import Sampler, resolve_rng
+
+# Coefficients of Acklam's rational approximation of the standard normal
+# inverse CDF (relative error below 1.2e-9)
+_A = [
+    -39.69683028665376,
+    220.9460984245205,
+    -275.9285104469687,
+    138.3577518672690,
+    -30.66479806614716,
+    2.506628277459239,
+]
+_B = [
+    -54.47609879822406,
+    161.5858368580409,
+    -155.6989798598866,
+    66.80131188771972,
+    -13.28068155288572,
+]
+_C = [
+    -7.784894002430293e-03,
+    -3.223964580411365e-01,
+    -2.400758277161838,
+    -2.549732539343734,
+    4.374664141464968,
+    2.938163982698783,
+]
+_D = [
+    7.784695709041462e-03,
+    3.224671290700398e-01,
+    2.445134137142996,
+    3.754408661907416,
+]
+_P_LOW = 0.02425
+
+
+def standard_normal_ppf(u: np.ndarray) -> np.ndarray:
+    """Inverse CDF of the standard normal distribution, vectorized."""
+    u = np.asarray(u, dtype=np.float64)
+    x = np.empty_like(u)
+
+    low = u < _P_LOW
+    high = u > 1 - _P_LOW
+    mid = ~(low | high)
+
+    q = u[mid] - 0.5
+    r = q * q
+    x[mid] = (
+        (((((_A[0] * r + _A[1]) * r + _A[2]) * r + _A[3]) * r + _A[4]) * r + _A[5])
+        * q
+        / (((((_B[0] * r + _B[1]) * r + _B[2]) * r + _B[3]) * r + _B[4]) * r + 1)
+    )
+
+    for mask, sign, p in ((low, 1.0, u[low]), (high, -1.0, 1 - u[high])):
+        q = np.sqrt(-2 * np.log(p))
+        x[mask] = sign * (
+            (((((_C[0] * q + _C[1]) * q + _C[2]) * q + _C[3]) * q + _C[4]) * q + _C[5])
+            / ((((_D[0] * q + _D[1]) * q + _D[2]) * q + _D[3]) * q + 1)
+        )
+    return x
 
 
 @dataclass
@@ -10,5 +70,10 @@ class Normal(Sampler):
     mean: float
     std: float
 
-    def sample(self, n_samples: int) -> np.ndarray:
-        return np.random.normal(self.mean, self.std, n_samples)
+    def sample(
+        self, n_samples: int, rng: Optional[np.random.Generator] = None
+    ) -> np.ndarray:
+        return resolve_rng(rng).normal(self.mean, self.std, n_samples)
+
+    def ppf(self, u: np.ndarray) -> np.ndarray:
+        return self.mean + self.std * standard_normal_ppf(u)
@@ -0,0 +1,90 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from .design import DesignSampler
+
+N_BITS = 32
+
+# Primitive polynomials and initial direction numbers of dimensions 2-21 from
+# Joe & Kuo (2008), new-joe-kuo-6.21201: (degree s, coefficients a, m_1..m_s).
+# Dimension 1 is the van der Corput sequence in base 2.
+JOE_KUO_DIRECTIONS = [
+    (1, 0, [1]),
+    (2, 1, [1, 3]),
+    (3, 1, [1, 3, 1]),
+    (3, 2, [1, 1, 1]),
+    (4, 1, [1, 1, 3, 3]),
+    (4, 4, [1, 3, 5, 13]),
+    (5, 2, [1, 1, 5, 5, 17]),
+    (5, 4, [1, 1, 5, 5, 5]),
+    (5, 7, [1, 1, 7, 11, 19]),
+    (5, 11, [1, 1, 5, 1, 1]),
+    (5, 13, [1, 1, 1, 3, 11]),
+    (5, 14, [1, 3, 5, 5, 31]),
+    (6, 1, [1, 3, 3, 9, 7, 49]),
+    (6, 13, [1, 1, 1, 15, 21, 21]),
+    (6, 16, [1, 3, 1, 13, 27, 49]),
+    (6, 19, [1, 1, 1, 15, 7, 5]),
+    (6, 22, [1, 3, 1, 15, 13, 25]),
+    (6, 25, [1, 1, 5, 5, 19, 61]),
+    (7, 1, [1, 3, 7, 11, 23, 15, 103]),
+    (7, 4, [1, 3, 7, 13, 13, 15, 69]),
+]
+MAX_DIM = len(JOE_KUO_DIRECTIONS) + 1
+
+
+def direction_numbers(dim: int) -> np.ndarray:
+    """
+    Direction numbers V[d, k] = v_{d,k+1} * 2^32 of the first dim dimensions.
+
+    Returns:
+        (dim, N_BITS) uint64 array
+    """
+    if dim > MAX_DIM:
+        raise ValueError(f"Sobol sequence supports at most {MAX_DIM} dimensions")
+
+    v = np.zeros((dim, N_BITS), dtype=np.uint64)
+    v[0] = [1 << (N_BITS - 1 - k) for k in range(N_BITS)]
+    for d in range(1, dim):
+        s, a, m = JOE_KUO_DIRECTIONS[d - 1]
+        directions = [m[k] << (N_BITS - 1 - k) for k in range(s)]
+        for k in range(s, N_BITS):
+            value = directions[k - s] ^ (directions[k - s] >> s)
+            for i in range(1, s):
+                if (a >> (s - 1 - i)) & 1:
+                    value ^= directions[k - i]
+            directions.append(value)
+        v[d] = directions
+    return v
+
+
+@dataclass
+class Sobol(DesignSampler):
+    """
+    Sobol low-discrepancy sequence (Joe-Kuo direction numbers).
+
+    With scramble=True the sequence gets a random digital shift drawn from
+    seed, which keeps its stratification properties. Point n depends only on
+    n, so a design can be extended with offset. Balance is best for sample
+    counts that are powers of two.
+    """
+
+    scramble: bool = True
+
+    def sample_unit(self, n_samples: int, dim: int, offset: int = 0) -> np.ndarray:
+        v = direction_numbers(dim)
+        index = np.arange(offset, offset + n_samples, dtype=np.uint64)
+        gray = index ^ (index >> np.uint64(1))
+
+        x = np.zeros((n_samples, dim), dtype=np.uint64)
+        for k in range(N_BITS):
+            bit = ((gray >> np.uint64(k)) & np.uint64(1)).astype(bool)
+            x[bit] ^= v[:, k]
+
+        if self.scramble:
+            rng = np.random.default_rng(self.seed)
+            x ^= rng.integers(0, 1 << N_BITS, size=dim, dtype=np.uint64)
+
+        # Centre of the 2^-32 cell, so no point is exactly 0
+        return (x.astype(np.float64) + 0.5) / 2.0**N_BITS
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from .base import Sampler
+
+CAMPAIGN_FILE = "campaign.json"
+
+# Samples drawn per independent stream
+DEFAULT_SHARD_SIZE = 1 << 16
+
+
+def stream_key(name: str) -> int:
+    """Stable 32-bit key of a name, used in SeedSequence spawn keys."""
+    return int.from_bytes(hashlib.sha256(name.encode()).digest()[:4], "little")
+
+
+def shard_generator(
+    entropy: int, run: int, experiment: str, shard: int, parameter: str
+) -> np.random.Generator:
+    """
+    Generator of one parameter of one shard.
+
+    The stream is identified by (entropy, run, experiment, shard, parameter)
+    alone, so any shard can be regenerated bit-for-bit on its own, in any
+    process, and adding or reordering parameters does not change the others.
+    """
+    seed = np.random.SeedSequence(
+        entropy,
+        spawn_key=(run, stream_key(experiment), shard, stream_key(parameter)),
+    )
+    return np.random.default_rng(seed)
+
+
+def sample_shard(
+    params: Dict[str, Sampler],
+    entropy: int,
+    run: int,
+    experiment: str,
+    shard: int,
+    n_samples: int,
+) -> Dict[str, np.ndarray]:
+    """Draw n_samples values of every parameter for one shard."""
+    return {
+        name: sampler.sample(
+            n_samples, shard_generator(entropy, run, experiment, shard, name)
+        )
+        for name, sampler in params.items()
+    }
+
+
+def sample_params(
+    params: Dict[str, Sampler],
+    n_samples: int,
+    entropy: int,
+    run: int,
+    experiment: str,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    n_workers: int = 1,
+) -> Dict[str, np.ndarray]:
+    """
+    Draw n_samples values of every parameter from independent shard streams.
+
+    Sample i belongs to shard i // shard_size. With n_workers > 1 shards are
+    drawn in parallel worker processes; the result is identical.
+
+    Returns:
+        dict: Parameter name -> array of n_samples values
+    """
+    shards = [
+        (params, entropy, run, experiment, shard, min(shard_size, n_samples - start))
+        for shard, start in enumerate(range(0, n_samples, shard_size))
+    ]
+    if n_workers > 1 and len(shards) > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            parts = list(executor.map(sample_shard, *zip(*shards)))
+    else:
+        parts = [sample_shard(*shard) for shard in shards]
+
+    return {
+        name: np.concatenate([part[name] for part in parts]) if parts else np.empty(0)
+        for name in params
+    }
+
+
+def load_campaign(output_dir: Path) -> Dict[str, Any]:
+    try:
+        with open(Path(output_dir) / CAMPAIGN_FILE, "r") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def start_campaign_run(output_dir: Path, seed: Optional[int] = None) -> Tuple[int, int]:
+    """
+    Register a new sampling run of the campaign in output_dir.
+
+    The campaign entropy is the configured seed, or the entropy recorded by
+    an earlier run, or fresh entropy. Every run gets its own index, so a
+    rerun draws new samples instead of repeating earlier ones.
+
+    Returns:
+        tuple: (entropy, run index)
+    """
+    campaign = load_campaign(output_dir)
+    if seed is not None:
+        if "entropy" in campaign and campaign["entropy"] != seed:
+            print(
+                f"Campaign seed changed from {campaign['entropy']} to {seed}; "
+                "earlier runs keep their recorded entropy"
+            )
+        entropy = seed
+    elif "entropy" in campaign:
+        entropy = campaign["entropy"]
+    else:
+        entropy = np.random.SeedSequence().entropy
+
+    run = len(campaign.get("runs", []))
+    return entropy, run
+
+
+def record_campaign_run(
+    output_dir: Path,
+    entropy: int,
+    run: int,
+    experiments: Dict[str, Dict[str, Any]],
+):
+    """
+    Append a run to campaign.json.
+
+    Args:
+        output_dir: Campaign output directory
+        entropy: SeedSequence entropy the run drew from
+        run: Run index
+        experiments: Experiment type -> {"n_samples", "shard_size", "parameters"}
+    """
+    output_dir = Path(output_dir)
+    campaign = load_campaign(output_dir)
+    campaign.setdefault("entropy", entropy)
+    campaign.setdefault("runs", []).append(
+        {"run": run, "entropy": entropy, "experiments": experiments}
+    )
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=output_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(campaign, f, indent=2, default=str)
+        os.replace(tmp_name, output_dir / CAMPAIGN_FILE)
+    finally:
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+
+
+def describe_params(params: Dict[str, Sampler]) -> Dict[str, Any]:
+    """Sampler settings of the parameters, as recorded in campaign.json."""
+    return {name: asdict(sampler) for name, sampler in params.items()}
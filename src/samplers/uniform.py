@@ -1,8 +1,9 @@
 from dataclasses import dataclass
+from typing import Optional
 
 import numpy as np
 
-from .base import Sampler
+from .base import Sampler, resolve_rng
 
 
 @dataclass
@@ -10,5 +11,10 @@ class Uniform(Sampler):
     min: float
     max: float
 
-    def sample(self, n_samples: int) -> np.ndarray:
-        return np.random.uniform(self.min, self.max, n_samples)
+    def sample(
+        self, n_samples: int, rng: Optional[np.random.Generator] = None
+    ) -> np.ndarray:
+        return resolve_rng(rng).uniform(self.min, self.max, n_samples)
+
+    def ppf(self, u: np.ndarray) -> np.ndarray:
+        return self.min + np.asarray(u) * (self.max - self.min)
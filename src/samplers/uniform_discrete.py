@@ -1,9 +1,9 @@
 from dataclasses import dataclass
-import random
+from typing import Optional
 
 import numpy as np
 
-from .base import Sampler
+from .base import Sampler, resolve_rng
 
 
 @dataclass
@@ -12,10 +12,23 @@ class UniformDiscrete(Sampler):
     min: int | None = None
     max: int | None = None
 
-    def sample(self, n_samples: int) -> np.ndarray:
+    def sample(
+        self, n_samples: int, rng: Optional[np.random.Generator] = None
+    ) -> np.ndarray:
         if self.values is not None:
-            return np.array([random.choice(self.values) for _ in range(n_samples)])
+            return resolve_rng(rng).choice(np.asarray(self.values), n_samples)
         elif self.min is not None and self.max is not None:
-            return np.random.randint(self.min, self.max + 1, n_samples)
+            return resolve_rng(rng).integers(self.min, self.max + 1, n_samples)
+        else:
+            raise ValueError("Either values or min and max must be provided")
+
+    def ppf(self, u: np.ndarray) -> np.ndarray:
+        u = np.asarray(u)
+        if self.values is not None:
+            index = np.minimum((u * len(self.values)).astype(int), len(self.values) - 1)
+            return np.asarray(self.values)[index]
+        elif self.min is not None and self.max is not None:
+            n_values = self.max - self.min + 1
+            return self.min + np.minimum((u * n_values).astype(int), n_values - 1)
         else:
             raise ValueError("Either values or min and max must be provided")